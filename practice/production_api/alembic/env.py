@@ -11,6 +11,7 @@ from alembic import context
 # Import models
 from app.db.session import Base
 from app.models import User, Joke
+from app.models.joke import FTS_TABLE
 from app.core.config import settings
 
 # Alembic Config object
@@ -26,6 +27,25 @@ if config.config_file_name is not None:
 # Target metadata
 target_metadata = Base.metadata
 
+# Search objects created by hand-written DDL: the SQLite FTS5 table (and the
+# shadow tables FTS5 creates for it) and the Postgres expression index, which
+# SQLite cannot reflect. Autogenerate would otherwise try to drop them.
+SEARCH_INDEX = "ix_jokes_search"
+
+
+def include_name(name, type_, parent_names) -> bool:
+    """Keep search DDL out of autogenerate comparisons"""
+    if type_ == "table":
+        return not (name or "").startswith(FTS_TABLE)
+    if type_ == "index":
+        return name != SEARCH_INDEX
+    return True
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    """Keep search DDL out of autogenerate comparisons"""
+    return include_name(name, type_, {})
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
@@ -35,6 +55,8 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -42,7 +64,12 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
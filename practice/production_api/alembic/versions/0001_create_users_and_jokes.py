@@ -0,0 +1,61 @@
+"""Create users and jokes tables
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 20:20:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("full_name", sa.String(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("is_superuser", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_created_at_id", "users", ["created_at", "id"])
+
+    op.create_table(
+        "jokes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("setup", sa.Text(), nullable=False),
+        sa.Column("punchline", sa.Text(), nullable=False),
+        sa.Column("joke_type", sa.String(), nullable=True),
+        sa.Column("source", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_jokes_id", "jokes", ["id"])
+    op.create_index("ix_jokes_created_at_id", "jokes", ["created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jokes_created_at_id", table_name="jokes")
+    op.drop_index("ix_jokes_id", table_name="jokes")
+    op.drop_table("jokes")
+
+    op.drop_index("ix_users_created_at_id", table_name="users")
+    op.drop_index("ix_users_username", table_name="users")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_index("ix_users_id", table_name="users")
+    op.drop_table("users")
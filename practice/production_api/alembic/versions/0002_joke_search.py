@@ -0,0 +1,66 @@
+"""Add full-text search index on jokes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 21:40:00
+
+On Postgres this is a GIN index over the jokes' tsvector, built
+concurrently so writes are not blocked. On SQLite it is an external-content
+FTS5 table kept in sync by triggers and filled from the existing rows.
+Both must stay in step with app/models/joke.py.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+SEARCH_DOCUMENT = "to_tsvector('english', setup || ' ' || punchline)"
+
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE jokes_fts USING fts5("
+    "setup, punchline, content='jokes', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER jokes_fts_insert AFTER INSERT ON jokes BEGIN "
+    "INSERT INTO jokes_fts(rowid, setup, punchline) VALUES (new.id, new.setup, new.punchline); END",
+    "CREATE TRIGGER jokes_fts_delete AFTER DELETE ON jokes BEGIN "
+    "INSERT INTO jokes_fts(jokes_fts, rowid, setup, punchline) "
+    "VALUES ('delete', old.id, old.setup, old.punchline); END",
+    "CREATE TRIGGER jokes_fts_update AFTER UPDATE ON jokes BEGIN "
+    "INSERT INTO jokes_fts(jokes_fts, rowid, setup, punchline) "
+    "VALUES ('delete', old.id, old.setup, old.punchline); "
+    "INSERT INTO jokes_fts(rowid, setup, punchline) VALUES (new.id, new.setup, new.punchline); END",
+    "INSERT INTO jokes_fts(jokes_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "ix_jokes_search",
+                "jokes",
+                [sa.text(SEARCH_DOCUMENT)],
+                postgresql_using="gin",
+                postgresql_concurrently=True,
+            )
+    elif dialect == "sqlite":
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        with op.get_context().autocommit_block():
+            op.drop_index("ix_jokes_search", table_name="jokes", postgresql_concurrently=True)
+    elif dialect == "sqlite":
+        for trigger in ("jokes_fts_insert", "jokes_fts_delete", "jokes_fts_update"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS jokes_fts")
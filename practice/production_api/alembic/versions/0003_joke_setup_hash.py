@@ -0,0 +1,53 @@
+"""Add indexed setup hash to jokes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 22:30:00
+
+The joke warmer looks up repeats by setup. setup is unbounded text, so it
+is matched through an indexed SHA-256 of it instead of a table scan.
+
+"""
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 1000
+
+
+def upgrade() -> None:
+    op.add_column("jokes", sa.Column("setup_hash", sa.String(length=64), nullable=True))
+
+    jokes = sa.table("jokes", sa.column("id", sa.Integer), sa.column("setup", sa.Text),
+                     sa.column("setup_hash", sa.String))
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(jokes.c.id, jokes.c.setup)
+            .where(jokes.c.id > last_id)
+            .order_by(jokes.c.id)
+            .limit(BACKFILL_BATCH)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            jokes.update().where(jokes.c.id == sa.bindparam("row_id")).values(setup_hash=sa.bindparam("hash")),
+            [{"row_id": row.id, "hash": hashlib.sha256(row.setup.encode("utf-8")).hexdigest()} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    op.create_index("ix_jokes_setup_hash", "jokes", ["setup_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jokes_setup_hash", table_name="jokes")
+    op.drop_column("jokes", "setup_hash")
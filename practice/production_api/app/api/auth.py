@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
 from app.schemas.user import UserCreate, UserResponse, LoginRequest, Token
 from app.services.user_service import UserService
-from app.core.security import create_access_token, create_refresh_token
+from app.core.security import create_access_token, create_refresh_token, get_current_user
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -1,13 +1,11 @@
 """
 Health check and monitoring endpoints
 """
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
+from fastapi import APIRouter, Depends, Response, status
 
-from app.db.session import get_db
-from app.schemas.common import HealthCheck
+from app.schemas.common import HealthCheck, ReadinessCheck
 from app.core.config import settings
+from app.core.health import HealthProber, get_prober, result_payload
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -16,30 +14,57 @@ router = APIRouter(tags=["Health"])
 
 
 @router.get("/health", response_model=HealthCheck)
-async def health_check(db: AsyncSession = Depends(get_db)):
+async def health_check(prober: HealthProber = Depends(get_prober)):
     """
     Health check endpoint
     
-    Returns the status of the application and its dependencies
-    """
-    # Check database connection
-    db_status = "ok"
-    try:
-        await db.execute(text("SELECT 1"))
-    except Exception as e:
-        logger.error("Database health check failed", error=str(e))
-        db_status = "error"
-    
-    # Check Redis (if configured)
-    redis_status = "ok"
-    # In production, add actual Redis health check here
+    Returns the status of the application and its dependencies, as last
+    checked by the background prober
+    """
+    results = await prober.results()
+    db_status = results["database"].status
     
     return {
         "status": "healthy" if db_status == "ok" else "unhealthy",
         "version": settings.APP_VERSION,
         "environment": settings.ENVIRONMENT,
         "database": db_status,
-        "redis": redis_status,
+        "redis": results["redis"].status,
+    }
+
+
+@router.get("/livez")
+async def liveness():
+    """
+    Liveness probe
+    
+    Only shows that the process is serving requests; dependencies are not
+    checked, so an outage does not get healthy pods restarted
+    """
+    return {"status": "alive"}
+
+
+@router.get("/readyz", response_model=ReadinessCheck)
+async def readiness(
+    response: Response,
+    prober: HealthProber = Depends(get_prober)
+):
+    """
+    Readiness probe
+    
+    Serves the cached dependency checks and current pool counters. Returns
+    503 while the database or read replica is unreachable or the application
+    is shutting down.
+    """
+    results = await prober.results()
+    ready = prober.is_ready(results)
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    
+    return {
+        "status": "ready" if ready else "unavailable",
+        "checks": {name: result_payload(result) for name, result in results.items()},
+        "pool": prober.pool_stats(),
     }
 
 
@@ -54,5 +79,6 @@ async def root():
         "message": f"Welcome to {settings.APP_NAME}",
         "version": settings.APP_VERSION,
         "docs": "/docs",
-        "health": "/health"
+        "health": "/health",
+        "readiness": "/readyz",
     }
@@ -2,24 +2,47 @@
 Joke API endpoints
 Handles joke fetching and management
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+import httpx
+from redis import asyncio as aioredis
 
-from app.db.session import get_db
-from app.schemas.joke import JokeSimpleResponse, JokeResponse
+from app.db.session import get_db, get_read_db
+from app.db.redis import get_redis
+from app.core.http_client import get_http_client
+from app.schemas.joke import JokeSimpleResponse, JokeResponse, JokeSearchPage, JokeSearchResult
+from app.schemas.common import BatchResponse, PaginatedResponse
+from app.core.responses import batch_response, row_response, rows_response
+from app.core.conditional import (
+    CACHE_PUBLIC_IMMUTABLE,
+    CACHE_PUBLIC_SHORT,
+    ValidatorCache,
+    is_conditional,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+    validator_headers,
+)
+from app.core.config import settings
 from app.services.joke_service import JokeService
+from app.api.params import batch_ids
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/jokes", tags=["Jokes"])
 
+# Jokes never change once stored, so their validators can be cached per worker
+joke_validators: ValidatorCache[int] = ValidatorCache(settings.JOKE_VALIDATOR_CACHE_SIZE)
+
 
 @router.get("/random", response_model=JokeSimpleResponse)
 async def get_random_joke(
     use_cache: bool = Query(True, description="Use cached jokes if available"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    redis: Optional[aioredis.Redis] = Depends(get_redis),
+    http_client: httpx.AsyncClient = Depends(get_http_client)
 ):
     """
     Get a random joke
@@ -28,41 +51,138 @@ async def get_random_joke(
     
     Returns a random joke with setup and punchline
     """
-    joke = await JokeService.get_joke(db, use_cache=use_cache)
+    joke = await JokeService.get_joke(
+        db, use_cache=use_cache, redis=redis, http_client=http_client
+    )
     logger.info("Random joke served")
     return joke
 
 
-@router.get("/", response_model=List[JokeResponse])
+@router.get("/", response_model=Union[List[JokeResponse], PaginatedResponse])
 async def list_jokes(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Keyset cursor; pass empty for the first page"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     List all cached jokes with pagination
     
     - **skip**: Number of records to skip (default: 0)
     - **limit**: Maximum number of records to return (default: 100, max: 100)
+    - **cursor**: If given, returns a cursor page with `next_cursor` instead of a plain list
+    
+    Supports If-None-Match; the ETag is derived from the rows on the page,
+    so it changes whenever the page would.
+    """
+    if cursor is not None:
+        jokes, next_cursor = await JokeService.get_jokes_page(db, cursor=cursor, limit=limit)
+    else:
+        jokes, next_cursor = await JokeService.get_jokes(db, skip=skip, limit=limit), None
+    
+    # Jokes never change once stored, so IDs and creation times identify the page
+    etag = make_etag(
+        "jokes", skip, limit, cursor, next_cursor,
+        *(f"{joke.id}@{joke.created_at.isoformat()}" for joke in jokes),
+    )
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, cache_control=CACHE_PUBLIC_SHORT)
+    headers = validator_headers(etag, cache_control=CACHE_PUBLIC_SHORT)
+    
+    if cursor is not None:
+        return rows_response(JokeResponse, jokes, headers=headers, page=PaginatedResponse(
+            items=[],
+            limit=limit,
+            has_more=next_cursor is not None,
+            next_cursor=next_cursor,
+        ).model_dump(exclude={"items"}))
+    
+    # Rows come straight from the database; skip response_model re-validation
+    return rows_response(JokeResponse, jokes, headers=headers)
+
+
+@router.get("/search", response_model=JokeSearchPage)
+async def search_jokes(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to search for"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Full-text search over cached jokes
+    
+    - **q**: Words that must all appear in the setup or punchline (stemmed, case-insensitive)
+    - **skip**: Number of results to skip (default: 0)
+    - **limit**: Maximum number of results to return (default: 20, max: 100)
+    
+    Returns the best matches first; each item carries its `rank`. When more
+    jokes match than SEARCH_RANK_WINDOW, only the newest of them are ranked and
+    paged through, and `truncated` is true: narrow the query to see the rest.
+    """
+    jokes, has_more, truncated = await JokeService.search_jokes(db, q, skip=skip, limit=limit)
+    return rows_response(JokeSearchResult, jokes, page=JokeSearchPage(
+        items=[],
+        skip=skip,
+        limit=limit,
+        has_more=has_more,
+        truncated=truncated,
+    ).model_dump(exclude={"items"}))
+
+
+@router.get("/batch", response_model=BatchResponse)
+async def get_jokes_batch(
+    ids: List[int] = Depends(batch_ids),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get several jokes by ID in one request
+    
+    - **ids**: Joke IDs, comma-separated (`?ids=3,1,2`) or repeated; at most `BATCH_MAX_IDS`
+    
+    Returns `items` in the order requested, with `null` for IDs that were not
+    found, and the not-found IDs in `missing`.
     """
-    jokes = await JokeService.get_jokes(db, skip=skip, limit=limit)
-    return jokes
+    jokes = await JokeService.get_jokes_by_ids(db, ids)
+    return batch_response(JokeResponse, ids, jokes)
 
 
 @router.get("/{joke_id}", response_model=JokeResponse)
 async def get_joke_by_id(
     joke_id: int,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get a specific joke by ID
     
     - **joke_id**: The ID of the joke to retrieve
+    
+    Supports If-None-Match and If-Modified-Since. Revalidating a joke whose
+    validators are cached needs no database query, and jokes themselves are
+    served from the service cache.
     """
-    joke = await JokeService.get_joke_by_id(db, joke_id)
+    if is_conditional(request):
+        validators = joke_validators.get(joke_id)
+        if validators is None:
+            created_at = await JokeService.get_joke_created_at(db, joke_id)
+            if created_at is not None:
+                validators = (make_etag("joke", joke_id, created_at), created_at)
+                joke_validators.set(joke_id, *validators)
+        if validators is not None and is_not_modified(request, *validators):
+            return not_modified_response(*validators, cache_control=CACHE_PUBLIC_IMMUTABLE)
+    
+    joke = await JokeService.get_joke_response(db, joke_id)
     if not joke:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Joke not found"
         )
-    return joke
+    
+    etag = make_etag("joke", joke.id, joke.created_at)
+    joke_validators.set(joke.id, etag, joke.created_at)
+    return row_response(
+        JokeResponse,
+        joke,
+        headers=validator_headers(etag, joke.created_at, CACHE_PUBLIC_IMMUTABLE),
+    )
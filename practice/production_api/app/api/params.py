@@ -0,0 +1,43 @@
+"""
+Shared query parameters for API endpoints
+"""
+from typing import List
+from fastapi import HTTPException, Query, status
+
+from app.core.config import settings
+
+
+def batch_ids(
+    ids: List[str] = Query(..., description="IDs to look up, comma-separated or repeated")
+) -> List[int]:
+    """
+    Dependency parsing the ``ids`` parameter of batch lookup endpoints
+    
+    Accepts ``?ids=3,1,2`` as well as ``?ids=3&ids=1``. Order and duplicates
+    are kept so results can be returned in input order.
+    
+    Returns:
+        Requested IDs
+        
+    Raises:
+        HTTPException: If an ID is not an integer, or none or too many are given
+    """
+    try:
+        parsed = [int(part) for value in ids for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="ids must be integers"
+        )
+    
+    if not parsed:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="At least one id is required"
+        )
+    if len(parsed) > settings.BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {settings.BATCH_MAX_IDS} ids per request"
+        )
+    return parsed
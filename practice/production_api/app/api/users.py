@@ -2,13 +2,25 @@
 User management API endpoints
 Handles user CRUD operations
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
-from app.schemas.user import UserResponse, UserUpdate
+from app.db.session import get_db, get_read_db
+from app.models.user import User
+from app.schemas.user import UserResponse, UserUpdate, UserImportReport
+from app.schemas.common import BatchResponse, PaginatedResponse
+from app.core.responses import batch_response, row_response, rows_response
+from app.core.conditional import (
+    CACHE_PRIVATE_REVALIDATE,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+    validator_headers,
+)
 from app.services.user_service import UserService
+from app.services.user_import import IMPORT_FORMATS, UserImportService
+from app.api.params import batch_ids
 from app.core.security import get_current_user
 from app.core.logging import get_logger
 
@@ -17,17 +29,36 @@ logger = get_logger(__name__)
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
+async def get_current_superuser(
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """
+    Dependency to require an active superuser
+    
+    Raises:
+        HTTPException: If the user does not exist or is not a superuser
+    """
+    user = await UserService.get_user_by_id(db, current_user["user_id"])
+    if not user or not user.is_active or not user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return user
+
+
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get current authenticated user information
     
     Requires authentication token
     """
-    user = await UserService.get_user_by_id(db, current_user["user_id"])
+    user = await UserService.get_user_profile(db, current_user["user_id"])
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -36,31 +67,63 @@ async def get_current_user_info(
     return user
 
 
+@router.get("/batch", response_model=BatchResponse)
+async def get_users_batch(
+    ids: List[int] = Depends(batch_ids),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get several users by ID in one request
+    
+    - **ids**: User IDs, comma-separated (`?ids=3,1,2`) or repeated; at most `BATCH_MAX_IDS`
+    
+    Returns `items` in the order requested, with `null` for IDs that were not
+    found, and the not-found IDs in `missing`. Requires authentication
+    """
+    users = await UserService.get_users_by_ids(db, ids)
+    return batch_response(UserResponse, ids, users)
+
+
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get user by ID
     
-    Requires authentication
+    Requires authentication. Supports If-None-Match and If-Modified-Since.
+    Users are served from the service cache, which update and delete
+    invalidate.
     """
-    user = await UserService.get_user_by_id(db, user_id)
+    user = await UserService.get_user_profile(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return user
+    
+    modified_at = user.updated_at or user.created_at
+    etag = make_etag("user", user.id, modified_at)
+    if is_not_modified(request, etag, modified_at):
+        return not_modified_response(etag, modified_at, CACHE_PRIVATE_REVALIDATE)
+    
+    return row_response(
+        UserResponse,
+        user,
+        headers=validator_headers(etag, modified_at, CACHE_PRIVATE_REVALIDATE),
+    )
 
 
-@router.get("/", response_model=List[UserResponse])
+@router.get("/", response_model=Union[List[UserResponse], PaginatedResponse])
 async def list_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Keyset cursor; pass empty for the first page"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -68,11 +131,22 @@ async def list_users(
     
     - **skip**: Number of records to skip (default: 0)
     - **limit**: Maximum number of records to return (default: 100, max: 100)
+    - **cursor**: If given, returns a cursor page with `next_cursor` instead of a plain list
     
     Requires authentication
     """
+    if cursor is not None:
+        users, next_cursor = await UserService.get_users_page(db, cursor=cursor, limit=limit)
+        return rows_response(UserResponse, users, page=PaginatedResponse(
+            items=[],
+            limit=limit,
+            has_more=next_cursor is not None,
+            next_cursor=next_cursor,
+        ).model_dump(exclude={"items"}))
+    
+    # Rows come straight from the database; skip response_model re-validation
     users = await UserService.get_users(db, skip=skip, limit=limit)
-    return users
+    return rows_response(UserResponse, users)
 
 
 @router.put("/me", response_model=UserResponse)
@@ -104,3 +178,43 @@ async def delete_current_user(
     await UserService.delete_user(db, current_user["user_id"])
     logger.info("User deleted account", user_id=current_user["user_id"])
     return None
+
+
+@router.post("/import", response_model=UserImportReport)
+async def import_users(
+    request: Request,
+    format: Optional[str] = Query(None, description="ndjson or csv; defaults from Content-Type"),
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(get_current_superuser)
+):
+    """
+    Bulk import users from an NDJSON or CSV upload
+    
+    Each row needs email and username, plus either password or an existing
+    bcrypt hashed_password. The body is streamed, so uploads of any size run
+    in constant memory. Rows whose email or username already exist are
+    skipped; every skipped or invalid row is listed in the report.
+    
+    Requires superuser privileges
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+    if format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format, expected one of: {', '.join(IMPORT_FORMATS)}"
+        )
+    
+    lines = UserImportService.iter_lines(request.stream())
+    report = await UserImportService.import_users(
+        db, UserImportService.iter_rows(lines, format)
+    )
+    logger.info(
+        "Bulk user import finished",
+        admin_id=admin.id,
+        created=report.created,
+        skipped=report.skipped,
+        failed=report.failed,
+    )
+    return report
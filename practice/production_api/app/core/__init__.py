@@ -1,9 +1,11 @@
 """Core utilities initialization"""
 from app.core.config import settings, get_settings
-from app.core.logging import setup_logging, get_logger
+from app.core.logging import setup_logging, stop_logging, get_logger
 from app.core.security import (
     verify_password,
     get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
     create_access_token,
     create_refresh_token,
     decode_token,
@@ -14,9 +16,12 @@ __all__ = [
     "settings",
     "get_settings",
     "setup_logging",
+    "stop_logging",
     "get_logger",
     "verify_password",
     "get_password_hash",
+    "verify_password_async",
+    "get_password_hash_async",
     "create_access_token",
     "create_refresh_token",
     "decode_token",
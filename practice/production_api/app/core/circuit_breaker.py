@@ -0,0 +1,138 @@
+"""
+Circuit breaker for calls to external services
+Fails fast while a dependency is down instead of waiting on every call
+
+Breaker state is per process; each uvicorn worker trips independently.
+"""
+import time
+from typing import Awaitable, Callable, Optional, Tuple, Type, TypeVar
+
+from app.core.logging import get_logger
+from app.core.metrics import (
+    CIRCUIT_BREAKER_REJECTED,
+    CIRCUIT_BREAKER_STATE,
+    CIRCUIT_BREAKER_TRANSITIONS,
+)
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+# Values exported by the circuit_breaker_state gauge
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a call while the breaker is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit breaker {name!r} is open")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    every call fails fast with CircuitOpenError. Once ``reset_timeout``
+    seconds have passed it is half-open: a single probe call is let through
+    (others still fail fast), and its outcome closes the breaker or opens it
+    for another ``reset_timeout``.
+
+    Only exceptions in ``failure_exceptions`` count as failures; anything
+    else (including cancellation) passes through without changing state.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        failure_exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failure_exceptions = failure_exceptions
+        self.reset()
+
+    def reset(self) -> None:
+        """Close the breaker and forget past failures"""
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._state = CLOSED
+        CIRCUIT_BREAKER_STATE.labels(name=self.name).set(STATE_VALUES[CLOSED])
+
+    @property
+    def state(self) -> str:
+        """Current state; an open breaker turns half-open once reset_timeout has passed"""
+        if self._state == OPEN and self.retry_after() == 0:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker lets a probe through (0 unless open)"""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Make a call through the breaker
+
+        Args:
+            fn: Starts the call
+
+        Returns:
+            The call's result
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or half-open with a probe in flight
+            Exception: Whatever the call raised
+        """
+        state = self.state
+        if state == OPEN or (state == HALF_OPEN and self._probing):
+            CIRCUIT_BREAKER_REJECTED.labels(name=self.name).inc()
+            raise CircuitOpenError(self.name, self.retry_after())
+
+        probe = state == HALF_OPEN
+        self._probing = probe
+        try:
+            result = await fn()
+        except self.failure_exceptions:
+            self._record_failure(probe)
+            raise
+        finally:
+            if probe:
+                self._probing = False
+
+        self._record_success(probe)
+        return result
+
+    def _record_failure(self, probe: bool) -> None:
+        self._failures += 1
+        if probe or (self._state == CLOSED and self._failures >= self.failure_threshold):
+            self._opened_at = time.monotonic()
+            self._transition(OPEN)
+
+    def _record_success(self, probe: bool) -> None:
+        if probe:
+            self._opened_at = None
+            self._transition(CLOSED)
+        if self._state == CLOSED:
+            self._failures = 0
+
+    def _transition(self, state: str) -> None:
+        logger.warning(
+            "Circuit breaker state changed",
+            breaker=self.name, from_state=self._state, to_state=state, failures=self._failures,
+        )
+        self._state = state
+        CIRCUIT_BREAKER_STATE.labels(name=self.name).set(STATE_VALUES[state])
+        CIRCUIT_BREAKER_TRANSITIONS.labels(name=self.name, state=state).inc()
@@ -0,0 +1,167 @@
+"""
+Conditional GET support
+Strong ETags, Last-Modified and 304 Not Modified responses
+
+Validators are derived from row metadata (ID and modification time), so a
+conditional request can be answered from a cheap metadata lookup, or for
+immutable rows from an in-process cache, without loading and serializing
+the full row.
+"""
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+from fastapi import Request, Response, status
+
+K = TypeVar("K", bound=Hashable)
+
+# Cache-Control policies per route
+CACHE_PUBLIC_IMMUTABLE = "public, max-age=86400, immutable"
+CACHE_PUBLIC_SHORT = "public, max-age=60"
+CACHE_PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a strong ETag from the values that identify a representation
+
+    Args:
+        *parts: Values such as the resource type, ID and modification time
+
+    Returns:
+        Quoted ETag string
+    """
+    raw = "|".join(
+        _utc(part).replace(tzinfo=None).isoformat() if isinstance(part, datetime) else str(part)
+        for part in parts
+    ).encode("utf-8")
+    return '"' + hashlib.blake2b(raw, digest_size=12).hexdigest() + '"'
+
+
+def _utc(value: datetime) -> datetime:
+    """Convert to aware UTC (naive values from SQLite are taken as UTC)"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    """Format a datetime as an HTTP date"""
+    return format_datetime(_utc(value), usegmt=True)
+
+
+def is_not_modified(
+    request: Request,
+    etag: str,
+    last_modified: Optional[datetime] = None
+) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since against current validators
+
+    If-None-Match takes precedence; If-Modified-Since is only used when the
+    request has no If-None-Match (RFC 9110, section 13.2.2).
+
+    Args:
+        request: Incoming request
+        etag: Current ETag of the resource
+        last_modified: Current modification time, if known
+
+    Returns:
+        True if the client's copy is current and a 304 should be sent
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison: W/"x" matches "x"
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have one second resolution
+    return _utc(last_modified).replace(microsecond=0) <= _utc(since)
+
+
+def is_conditional(request: Request) -> bool:
+    """Whether the request carries a validator worth checking first"""
+    headers = request.headers
+    return "if-none-match" in headers or "if-modified-since" in headers
+
+
+def validator_headers(
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: Optional[str] = None
+) -> Dict[str, str]:
+    """
+    Build the validator and caching headers for a response
+
+    Args:
+        etag: ETag of the representation
+        last_modified: Modification time, if known
+        cache_control: Cache-Control policy for the route
+
+    Returns:
+        Header dictionary
+    """
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if cache_control is not None:
+        headers["Cache-Control"] = cache_control
+    return headers
+
+
+def not_modified_response(
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: Optional[str] = None
+) -> Response:
+    """Build an empty 304 response carrying the current validators"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=validator_headers(etag, last_modified, cache_control),
+    )
+
+
+class ValidatorCache(Generic[K]):
+    """
+    Bounded LRU cache of (ETag, Last-Modified) pairs
+
+    Only safe for resources that never change once created, since entries
+    are not invalidated across workers.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[K, Tuple[str, Optional[datetime]]]" = OrderedDict()
+
+    def get(self, key: K) -> Optional[Tuple[str, Optional[datetime]]]:
+        """Get cached validators, or None on a miss"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: K, etag: str, last_modified: Optional[datetime] = None) -> None:
+        """Cache validators for a resource"""
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (etag, last_modified)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached validators"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
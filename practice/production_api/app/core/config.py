@@ -7,6 +7,11 @@ from pydantic import AnyHttpUrl, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 
+# asyncpg and Postgres accept at most this many bind parameters per statement
+MAX_BIND_PARAMETERS = 32767
+# Columns UserImportService.insert_batch sets for each user
+USER_IMPORT_COLUMNS = 7
+
 
 class Settings(BaseSettings):
     """Application settings with environment variable support"""
@@ -28,12 +33,24 @@ class Settings(BaseSettings):
     DB_ECHO: bool = False
     DB_POOL_SIZE: int = 20
     DB_MAX_OVERFLOW: int = 10
+    DB_CREATE_ALL: bool = False  # Create missing tables on startup; Alembic migrations own the schema
+    DATABASE_READ_URL: Optional[str] = None  # Read replica for read-only endpoints
+    READ_YOUR_WRITES_SECONDS: float = 5.0  # Reads stay on the primary this long after a client's write
     
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    TOKEN_CACHE_SIZE: int = 10000  # 0 disables the verified token cache
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" or "process"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    
+    # Bulk user import
+    USER_IMPORT_BATCH_SIZE: int = 500
+    USER_IMPORT_HASH_WORKERS: int = 4
+    USER_IMPORT_MAX_ERRORS: int = 1000
     
     # CORS Settings
     ALLOWED_ORIGINS: List[str] = ["http://localhost:3000"]
@@ -50,17 +67,56 @@ class Settings(BaseSettings):
     # Redis Configuration
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_CACHE_TTL: int = 300
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+    JOKE_POOL_SIZE: int = 100
+    JOKE_VALIDATOR_CACHE_SIZE: int = 10000  # ETags of immutable jokes kept in-process
+    
+    # Service-layer cache (in-process LRU over Redis)
+    SERVICE_CACHE_ENABLED: bool = True
+    SERVICE_CACHE_TTL: float = 300.0  # Redis tier
+    SERVICE_CACHE_LOCAL_TTL: float = 5.0  # In-process tier; bounds staleness in other workers after a write
+    SERVICE_CACHE_LOCAL_SIZE: int = 10000  # Entries per cache per worker; 0 disables the in-process tier
+    SERVICE_CACHE_EARLY_REFRESH_BETA: float = 1.0  # Probabilistic early refresh; 0 disables
+    
+    # Batch lookups (GET /users/batch, /jokes/batch)
+    BATCH_MAX_IDS: int = 500
+    
+    # Full-text search (GET /jokes/search)
+    SEARCH_RANK_WINDOW: int = 500  # Most matches ranked per query (the newest); more sets truncated
     
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"
+    LOG_ASYNC: bool = True  # Render and write logs on a background thread
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_BATCH_SIZE: int = 100
+    LOG_REQUEST_SAMPLE_RATE: float = 1.0
+    LOG_SAMPLED_PATHS: List[str] = []  # Empty samples request lines on all paths
     
     # External APIs
     JOKE_API_URL: str = "https://official-joke-api.appspot.com"
     API_TIMEOUT: int = 10
+    JOKE_API_TIMEOUT: float = 2.0  # Deadline per joke API request; slower answers count as failures
+    JOKE_API_BREAKER_FAILURES: int = 5  # Consecutive failures that open the circuit breaker
+    JOKE_API_BREAKER_RESET: float = 30.0  # Seconds open before a background probe is allowed
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2_ENABLED: bool = False
     
     # Rate Limiting
+    RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" (per worker) or "redis" (shared)
+    RATE_LIMIT_EXEMPT_PATHS: List[str] = ["/health", "/livez", "/readyz", "/metrics"]
+    
+    # Reverse proxies whose X-Forwarded-For / X-Real-IP headers are trusted (IPs or CIDRs)
+    TRUSTED_PROXIES: List[str] = []
+    
+    # Health Probes
+    HEALTH_PROBE_INTERVAL: float = 5.0  # Seconds between background dependency checks
+    HEALTH_PROBE_TIMEOUT: float = 2.0
+    HEALTH_REQUIRE_REDIS: bool = False  # Redis errors fail readiness (otherwise degraded)
     
     # Sentry (Error Tracking)
     SENTRY_DSN: Optional[str] = None
@@ -68,6 +124,32 @@ class Settings(BaseSettings):
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/2"
+    CELERY_TASK_ALWAYS_EAGER: bool = False  # Run tasks inline (tests)
+    
+    # Joke cache warmer (requires a Celery worker with beat)
+    JOKE_WARMER_ENABLED: bool = False
+    JOKE_WARMER_TARGET: int = 50  # Fresh jokes kept ready for use_cache=false
+    JOKE_WARMER_INTERVAL: float = 60.0
+    JOKE_WARMER_JITTER: float = 15.0
+    JOKE_WARMER_MAX_FETCHES: int = 20
+    JOKE_FRESH_TTL: int = 3600
+    JOKE_API_RATE_LIMIT: float = 2.0  # Upstream requests per second
+    
+    @field_validator("JOKE_API_RATE_LIMIT")
+    @classmethod
+    def check_joke_api_rate_limit(cls, v):
+        if v <= 0:
+            raise ValueError("JOKE_API_RATE_LIMIT must be greater than 0")
+        return v
+    
+    @field_validator("USER_IMPORT_BATCH_SIZE")
+    @classmethod
+    def check_user_import_batch_size(cls, v):
+        # Each user in a batch is one row of bind parameters in a single INSERT
+        most = MAX_BIND_PARAMETERS // USER_IMPORT_COLUMNS
+        if not 1 <= v <= most:
+            raise ValueError(f"USER_IMPORT_BATCH_SIZE must be between 1 and {most}")
+        return v
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,219 @@
+"""
+Background dependency health prober
+Checks the database (and read replica, if any) and Redis on an interval so health endpoints can serve
+the cached result instead of opening a connection per probe request
+"""
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+from redis import asyncio as aioredis
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import DEPENDENCY_UP
+from app.db.redis import get_redis
+from app.db.session import engine, read_engine, replica_enabled
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CheckResult:
+    """Outcome of a single dependency check"""
+    status: str  # "ok", "error" or "disabled"
+    latency_ms: float
+    checked_at: float  # Unix timestamp
+    error: Optional[str] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.status != "error"
+
+
+class HealthProber:
+    """
+    Periodically checks dependencies and caches the results
+
+    Probe requests only read the cache. If the background task is not running
+    (or has fallen behind), a request refreshes stale results itself, with
+    concurrent requests sharing a single check.
+    """
+
+    def __init__(
+        self,
+        db_engine: AsyncEngine,
+        redis_getter: Callable[[], Optional[aioredis.Redis]],
+        interval: float = settings.HEALTH_PROBE_INTERVAL,
+        timeout: float = settings.HEALTH_PROBE_TIMEOUT,
+        replica_engine: Optional[AsyncEngine] = None,
+    ):
+        self.engine = db_engine
+        self.replica_engine = replica_engine
+        self.redis_getter = redis_getter
+        self.interval = interval
+        self.timeout = timeout
+        self.draining = False
+        self._results: Dict[str, CheckResult] = {}
+        self._probed_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def max_age(self) -> float:
+        """Age after which cached results are refreshed on demand"""
+        return 2 * self.interval + self.timeout
+
+    async def check_database(self) -> str:
+        async with self.engine.connect() as conn:
+            await conn.exec_driver_sql("SELECT 1")
+        return "ok"
+
+    async def check_replica(self) -> str:
+        async with self.replica_engine.connect() as conn:
+            await conn.exec_driver_sql("SELECT 1")
+        return "ok"
+
+    async def check_redis(self) -> str:
+        redis = self.redis_getter()
+        if redis is None:
+            return "disabled"
+        await redis.ping()
+        return "ok"
+
+    async def _run_check(self, name: str, check: Callable[[], Awaitable[str]]) -> CheckResult:
+        start = time.perf_counter()
+        try:
+            status = await asyncio.wait_for(check(), timeout=self.timeout)
+            error = None
+        except Exception as e:
+            status = "error"
+            error = str(e) or type(e).__name__
+        result = CheckResult(
+            status=status,
+            latency_ms=round((time.perf_counter() - start) * 1000, 2),
+            checked_at=time.time(),
+            error=error,
+        )
+
+        previous = self._results.get(name)
+        if not result.healthy and (previous is None or previous.healthy):
+            logger.error("Health check failed", dependency=name, error=error)
+        elif result.healthy and previous is not None and not previous.healthy:
+            logger.info("Health check recovered", dependency=name)
+        DEPENDENCY_UP.labels(dependency=name).set(1 if result.status == "ok" else 0)
+        return result
+
+    async def probe(self) -> Dict[str, CheckResult]:
+        """
+        Check all dependencies concurrently and cache the results
+
+        Returns:
+            Results by dependency name
+        """
+        checks = {"database": self.check_database, "redis": self.check_redis}
+        if self.replica_engine is not None:
+            checks["replica"] = self.check_replica
+        results = await asyncio.gather(*(self._run_check(name, check) for name, check in checks.items()))
+        self._results = dict(zip(checks, results))
+        self._probed_at = time.monotonic()
+        return self._results
+
+    async def results(self) -> Dict[str, CheckResult]:
+        """
+        Get cached results, refreshing them first if they are stale
+
+        Returns:
+            Results by dependency name
+        """
+        if self._is_stale():
+            async with self._lock:
+                if self._is_stale():
+                    await self.probe()
+        return self._results
+
+    def _is_stale(self) -> bool:
+        return self._probed_at is None or time.monotonic() - self._probed_at > self.max_age
+
+    def is_ready(self, results: Dict[str, CheckResult]) -> bool:
+        """
+        Decide readiness from check results
+
+        The database is required, and so is the read replica when one is
+        configured (read endpoints use it). Redis failures only degrade the
+        service (caching and rate limiting fail open) unless
+        HEALTH_REQUIRE_REDIS is set.
+        """
+        if self.draining:
+            return False
+        if not results["database"].healthy:
+            return False
+        if "replica" in results and not results["replica"].healthy:
+            return False
+        return results["redis"].healthy or not settings.HEALTH_REQUIRE_REDIS
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Read connection pool counters (no I/O)
+
+        Returns:
+            Counters supported by the engine's pool class
+        """
+        pool = self.engine.pool
+        stats: Dict[str, Any] = {"pool": type(pool).__name__}
+        for name, method in (
+            ("size", "size"),
+            ("checked_in", "checkedin"),
+            ("checked_out", "checkedout"),
+            ("overflow", "overflow"),
+        ):
+            if hasattr(pool, method):
+                stats[name] = getattr(pool, method)()
+        return stats
+
+    async def _loop(self) -> None:
+        while True:
+            async with self._lock:
+                await self.probe()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start probing in the background"""
+        self.draining = False
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+            logger.info("Health prober started", interval=self.interval)
+
+    async def stop(self) -> None:
+        """Stop probing and report not ready from now on"""
+        self.draining = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Shared prober for the application's engines and Redis client
+prober = HealthProber(engine, get_redis, replica_engine=read_engine if replica_enabled() else None)
+
+
+def get_prober() -> HealthProber:
+    """
+    Dependency function to get the shared health prober
+
+    Returns:
+        Health prober
+    """
+    return prober
+
+
+def result_payload(result: CheckResult) -> Dict[str, Any]:
+    """Render a check result for a JSON response"""
+    payload = asdict(result)
+    if payload["error"] is None:
+        del payload["error"]
+    return payload
@@ -0,0 +1,83 @@
+"""
+Shared HTTP client for outbound requests
+Keeps a single pooled httpx client alive for the lifetime of the application
+"""
+from typing import Optional
+import httpx
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Shared client, created on application startup
+http_client: Optional[httpx.AsyncClient] = None
+
+
+def create_http_client(**kwargs) -> httpx.AsyncClient:
+    """
+    Create a pooled HTTP client from settings
+    
+    Args:
+        **kwargs: Overrides passed to httpx.AsyncClient (e.g. transport)
+        
+    Returns:
+        Configured httpx.AsyncClient
+    """
+    http2 = settings.HTTP2_ENABLED
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("h2 package not available, falling back to HTTP/1.1")
+            http2 = False
+    
+    options = {
+        "timeout": httpx.Timeout(settings.API_TIMEOUT),
+        "limits": httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "http2": http2,
+    }
+    options.update(kwargs)
+    return httpx.AsyncClient(**options)
+
+
+async def init_http_client(client: Optional[httpx.AsyncClient] = None) -> None:
+    """
+    Create the shared HTTP client
+    
+    Args:
+        client: Optional pre-built client to use instead (e.g. for tests)
+    """
+    global http_client
+    http_client = client or create_http_client()
+    logger.info("HTTP client initialized")
+
+
+async def close_http_client() -> None:
+    """
+    Close the shared HTTP client and its pooled connections
+    Should be called on application shutdown
+    """
+    global http_client
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+        logger.info("HTTP client closed")
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Dependency function to get the shared HTTP client
+    The client is created on first use if the lifespan handler has not run
+    
+    Returns:
+        Shared httpx.AsyncClient
+    """
+    global http_client
+    if http_client is None:
+        http_client = create_http_client()
+    return http_client
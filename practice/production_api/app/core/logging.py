@@ -1,56 +1,321 @@
 """
 Structured logging configuration for production
 Uses structlog for structured logging with JSON output for better log aggregation
+
+Application log calls skip the stdlib LogRecord machinery: structlog builds
+the event dict and hands it straight to the output pipeline. With LOG_ASYNC
+enabled the event is only enqueued; a background thread renders events and
+writes them to stdout in batches, dropping new events when the bounded queue
+is full. Records from plain stdlib loggers go through the same pipeline.
+Forked children (Celery prefork, gunicorn workers) start their own writer,
+and once stop_logging() has run events are written synchronously.
 """
+import atexit
 import logging
+import os
+import queue
+import random
 import sys
-from typing import Any
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO
 import structlog
 from app.core.config import settings
+from app.core.metrics import LOG_RECORDS_DROPPED
+
+# Sentinel telling the writer thread to stop
+_STOP = object()
+
+
+class DroppingQueueHandler(logging.Handler):
+    """
+    Logging handler that hands records to a bounded queue
+
+    Records are not formatted here; rendering happens on the writer thread.
+    """
+
+    def __init__(self, record_queue: queue.Queue):
+        super().__init__()
+        self.queue = record_queue
+        self.dropped = 0
+
+    def enqueue(self, item: Any) -> None:
+        """Queue a LogRecord or structlog event dict, dropping it if the queue is full"""
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.enqueue(record)
+
 
+class BatchLogWriter(threading.Thread):
+    """Background thread that renders queued records and writes them in batches"""
+
+    def __init__(
+        self,
+        record_queue: queue.Queue,
+        formatter: logging.Formatter,
+        stream: TextIO,
+        batch_size: int,
+        renderer: Optional[Callable[..., str]] = None,
+    ):
+        super().__init__(name="log-writer", daemon=True)
+        self.queue = record_queue
+        self.formatter = formatter
+        self.stream = stream
+        self.batch_size = batch_size
+        self.renderer = renderer or structlog.processors.JSONRenderer()
+
+    def run(self) -> None:
+        while True:
+            records = [self.queue.get()]
+            while len(records) < self.batch_size:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self.write(record for record in records if record is not _STOP)
+            if _STOP in records:
+                return
+
+    def write(self, records: Iterable[Any]) -> None:
+        """Render records and write them to the stream in one call"""
+        lines = []
+        for record in records:
+            try:
+                if isinstance(record, dict):
+                    lines.append(_render_event(self.renderer, record))
+                else:
+                    lines.append(self.formatter.format(record))
+            except Exception:
+                lines.append(f"Failed to format log record: {record!r}")
+
+        if lines:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+
+    def drain(self) -> None:
+        """Write records queued after the thread stopped, in the calling thread"""
+        records = []
+        while True:
+            try:
+                records.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        self.write(record for record in records if record is not _STOP)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Flush remaining records and stop the thread"""
+        self.queue.put(_STOP)
+        self.join(timeout)
+
+
+class EventLogger:
+    """
+    structlog logger that passes processed event dicts to the active handler
+
+    Every log method does the same thing; the level is already in the event dict.
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name
+
+    def msg(self, event_dict: Dict[str, Any]) -> None:
+        _emit_event(event_dict)
+
+    debug = info = warning = warn = error = critical = exception = fatal = log = msg
+
+
+# Active handler and writer (the writer only exists if LOG_ASYNC is enabled)
+_writer: Optional[BatchLogWriter] = None
+_handler: Optional[logging.Handler] = None
+_renderer: Callable[..., str] = structlog.processors.JSONRenderer()
+
+
+def _render_event(renderer: Callable[..., str], event_dict: Dict[str, Any]) -> str:
+    return renderer(None, event_dict.get("level", ""), event_dict)
+
+
+def _emit_event(event_dict: Dict[str, Any]) -> None:
+    """Enqueue an event for the writer thread, or render and write it inline"""
+    handler = _handler
+    if isinstance(handler, DroppingQueueHandler):
+        handler.enqueue(event_dict)
+    elif isinstance(handler, logging.StreamHandler):
+        line = _render_event(_renderer, event_dict)
+        handler.acquire()
+        try:
+            handler.stream.write(line + handler.terminator)
+            handler.flush()
+        finally:
+            handler.release()
+
+
+def _hand_off(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Any:
+    """Final processor: pass the event dict itself to EventLogger"""
+    return (event_dict,), {}
+
+
+def _shared_processors() -> List[Any]:
+    """Processors run in the calling thread before an event is handed off"""
+    return [
+        structlog.contextvars.merge_contextvars,
+        structlog.stdlib.add_logger_name,
+        structlog.stdlib.add_log_level,
+        structlog.processors.TimeStamper(fmt="iso"),
+        structlog.processors.StackInfoRenderer(),
+        structlog.processors.format_exc_info,
+        structlog.processors.UnicodeDecoder(),
+    ]
+
+
+def setup_logging(stream: Optional[TextIO] = None) -> None:
+    """
+    Configure structured logging for the application
+
+    Args:
+        stream: Output stream (defaults to stdout)
+    """
+    global _writer, _handler, _renderer
+
+    stream = stream or sys.stdout
 
-def setup_logging() -> None:
-    """Configure structured logging for the application"""
-    
     # Determine log level
     log_level = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
-    
-    # Configure standard library logging
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=log_level,
+
+    renderer = (
+        structlog.processors.JSONRenderer() if settings.LOG_FORMAT == "json"
+        else structlog.dev.ConsoleRenderer()
     )
-    
-    # Configure structlog
-    structlog.configure(
-        processors=[
-            structlog.contextvars.merge_contextvars,
-            structlog.stdlib.filter_by_level,
+    formatter = structlog.stdlib.ProcessorFormatter(
+        processor=renderer,
+        # Records from plain stdlib loggers (uvicorn, httpx, ...)
+        foreign_pre_chain=[
             structlog.stdlib.add_logger_name,
             structlog.stdlib.add_log_level,
-            structlog.stdlib.PositionalArgumentsFormatter(),
             structlog.processors.TimeStamper(fmt="iso"),
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer() if settings.LOG_FORMAT == "json" 
-            else structlog.dev.ConsoleRenderer(),
         ],
-        wrapper_class=structlog.stdlib.BoundLogger,
+    )
+
+    # Replace a previously installed handler (setup_logging may run twice)
+    stop_logging()
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+    _renderer = renderer
+    if settings.LOG_ASYNC:
+        record_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+        _handler = DroppingQueueHandler(record_queue)
+        _writer = BatchLogWriter(
+            record_queue, formatter, stream, settings.LOG_BATCH_SIZE, renderer
+        )
+        _writer.start()
+    else:
+        _handler = logging.StreamHandler(stream)
+        _handler.setFormatter(formatter)
+
+    # Configure standard library logging
+    root_logger = logging.getLogger()
+    root_logger.addHandler(_handler)
+    root_logger.setLevel(log_level)
+
+    # Configure structlog; events bypass stdlib logging and go to _emit_event
+    structlog.configure(
+        processors=[*_shared_processors(), _hand_off],
+        wrapper_class=structlog.make_filtering_bound_logger(log_level),
         context_class=dict,
-        logger_factory=structlog.stdlib.LoggerFactory(),
+        logger_factory=EventLogger,
         cache_logger_on_first_use=True,
     )
 
 
+def stop_logging() -> None:
+    """
+    Flush and stop the writer thread
+    Should be called on application shutdown
+
+    Logging keeps working afterwards: the queue handler is replaced by a
+    synchronous handler on the same stream, so late shutdown and atexit
+    events are written inline instead of being dropped.
+    """
+    global _writer, _handler
+
+    writer = _writer
+    if writer is None:
+        return
+    _writer = None
+    writer.stop()
+
+    fallback = logging.StreamHandler(writer.stream)
+    fallback.setFormatter(writer.formatter)
+    root_logger = logging.getLogger()
+    root_logger.removeHandler(_handler)
+    root_logger.addHandler(fallback)
+    _handler = fallback
+    # Records queued while the writer was stopping
+    writer.drain()
+
+
+atexit.register(stop_logging)
+
+
+def _restart_writer_after_fork() -> None:
+    """
+    Give a forked child its own queue and writer thread
+
+    Threads do not survive fork, so without this a child that inherited the
+    queue handler would enqueue events that are never written. Records still
+    queued at fork time are left to the parent's writer.
+    """
+    global _writer
+
+    writer = _writer
+    if writer is None or not isinstance(_handler, DroppingQueueHandler):
+        return
+    record_queue: queue.Queue = queue.Queue(maxsize=writer.queue.maxsize)
+    _handler.queue = record_queue
+    _writer = BatchLogWriter(
+        record_queue, writer.formatter, writer.stream, writer.batch_size, writer.renderer
+    )
+    _writer.start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_writer_after_fork)
+
+
+def should_log_request(path: str) -> bool:
+    """
+    Decide whether to emit request start/completion lines for a path
+
+    Paths listed in LOG_SAMPLED_PATHS (all paths if the list is empty) are
+    logged with probability LOG_REQUEST_SAMPLE_RATE.
+
+    Args:
+        path: Request path
+
+    Returns:
+        True if the request should be logged
+    """
+    rate = settings.LOG_REQUEST_SAMPLE_RATE
+    if rate >= 1.0:
+        return True
+    if settings.LOG_SAMPLED_PATHS and path not in settings.LOG_SAMPLED_PATHS:
+        return True
+    return random.random() < rate
+
+
 def get_logger(name: str) -> Any:
     """
     Get a structured logger instance
-    
+
     Args:
         name: Logger name (usually __name__)
-        
+
     Returns:
         Configured structlog logger
     """
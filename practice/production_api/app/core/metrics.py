@@ -0,0 +1,255 @@
+"""
+Prometheus metrics shared across the application
+Metrics degrade to no-ops when prometheus_client is not installed
+
+With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR to an empty
+directory before starting the server so /metrics aggregates all workers.
+Live gauges of a worker are dropped when it shuts down, or, if it died
+without shutting down, when the next worker starts.
+"""
+import os
+import re
+from typing import Any, List, Optional, Tuple
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+    )
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+    class _NoopMetric:
+        """Stand-in metric used when prometheus_client is unavailable"""
+
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            pass
+
+        def labels(self, *args: Any, **kwargs: Any) -> "_NoopMetric":
+            return self
+
+        def inc(self, amount: float = 1) -> None:
+            pass
+
+        def dec(self, amount: float = 1) -> None:
+            pass
+
+        def set(self, value: float) -> None:
+            pass
+
+        def observe(self, amount: float) -> None:
+            pass
+
+    Counter = Gauge = Histogram = _NoopMetric
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render metrics in the Prometheus text format
+    
+    In multiprocess mode the samples of all worker processes are merged.
+    
+    Returns:
+        Tuple of (payload, content type)
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+# Per-process files of "live*" gauges, e.g. gauge_livesum_1234.db
+_LIVE_GAUGE_FILE = re.compile(r"^gauge_live[a-z]+_(\d+)\.db$")
+
+
+def _multiprocess_dir() -> Optional[str]:
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR") if PROMETHEUS_AVAILABLE else None
+
+
+def mark_process_dead(pid: Optional[int] = None) -> None:
+    """
+    Drop a worker's live gauges from the multiprocess aggregate
+    
+    Counters and histograms of the worker are kept. No-op outside
+    multiprocess mode.
+    
+    Args:
+        pid: Worker process ID (default: the current process)
+    """
+    if _multiprocess_dir():
+        from prometheus_client import multiprocess
+        
+        multiprocess.mark_process_dead(pid if pid is not None else os.getpid())
+
+
+def mark_dead_workers() -> List[int]:
+    """
+    Drop the live gauges of workers that exited without shutting down
+    
+    Returns:
+        Process IDs that were marked dead
+    """
+    path = _multiprocess_dir()
+    if not path:
+        return []
+    
+    pids = set()
+    for name in os.listdir(path):
+        match = _LIVE_GAUGE_FILE.match(name)
+        if match:
+            pids.add(int(match.group(1)))
+    
+    dead = []
+    for pid in sorted(pids):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            dead.append(pid)
+        except PermissionError:
+            # Exists, but belongs to another user
+            continue
+    for pid in dead:
+        mark_process_dead(pid)
+    return dead
+
+
+# HTTP requests (endpoint is the route template to keep cardinality bounded)
+REQUEST_COUNT = Counter(
+    "http_requests_total",
+    "Total HTTP requests",
+    ["method", "endpoint", "status"],
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request duration",
+    ["method", "endpoint"],
+)
+
+# Database connection pool
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Database connections currently checked out of the pool",
+    multiprocess_mode="livesum",
+)
+DB_CONNECTION_HOLD_DURATION = Histogram(
+    "db_connection_hold_duration_seconds",
+    "Time a database connection stays checked out of the pool",
+)
+DB_READ_SESSIONS = Counter(
+    "db_read_sessions_total",
+    "Read-only sessions by the engine they were routed to",
+    ["target"],
+)
+
+# Request-scoped DataLoader batching
+DATALOADER_LOADS = Counter(
+    "dataloader_loads_total",
+    "Keys requested from DataLoaders (before batching and de-duplication)",
+    ["loader"],
+)
+DATALOADER_BATCH_KEYS = Histogram(
+    "dataloader_batch_keys",
+    "Distinct keys resolved per DataLoader batch",
+    ["loader"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+
+# Dependency health (updated by the background prober)
+DEPENDENCY_UP = Gauge(
+    "dependency_up",
+    "Whether the last background check of a dependency succeeded",
+    ["dependency"],
+    multiprocess_mode="liveall",
+)
+
+# External APIs
+EXTERNAL_API_DURATION = Histogram(
+    "external_api_request_duration_seconds",
+    "Outbound request duration to external APIs",
+    ["service", "outcome"],
+)
+
+# Circuit breakers (state: 0 closed, 1 half-open, 2 open)
+CIRCUIT_BREAKER_STATE = Gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+    ["name"],
+    multiprocess_mode="liveall",
+)
+CIRCUIT_BREAKER_TRANSITIONS = Counter(
+    "circuit_breaker_transitions_total",
+    "Circuit breaker state changes by the state entered",
+    ["name", "state"],
+)
+CIRCUIT_BREAKER_REJECTED = Counter(
+    "circuit_breaker_rejected_total",
+    "Calls failed fast by an open circuit breaker",
+    ["name"],
+)
+
+# Service-layer cache (tier: local in-process LRU, or Redis)
+SERVICE_CACHE_REQUESTS = Counter(
+    "service_cache_requests_total",
+    "Service cache lookups by tier and result",
+    ["cache", "tier", "result"],
+)
+SERVICE_CACHE_EARLY_REFRESHES = Counter(
+    "service_cache_early_refreshes_total",
+    "Cache hits treated as misses to refresh an entry before it expires",
+    ["cache", "tier"],
+)
+
+# Single-flight coalescing
+SINGLEFLIGHT_CALLS = Counter(
+    "singleflight_calls_total",
+    "Coalesced calls by role (leader starts the call, followers share its result)",
+    ["name", "role"],
+)
+
+# Rate limiting
+RATE_LIMIT_REJECTED = Counter(
+    "rate_limit_rejected_total",
+    "Requests rejected with 429 by the rate limiter",
+)
+
+# Logging pipeline
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total",
+    "Log records dropped because the log queue was full",
+)
+
+# Password hashing executor
+PASSWORD_HASH_PENDING = Gauge(
+    "password_hash_pending",
+    "Password hashing operations queued or running on the executor",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total",
+    "Password hashing operations rejected because the queue was full",
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "Time spent waiting for and running password hashing operations",
+    ["operation"],
+)
+
+# JWT verification cache
+TOKEN_CACHE_REQUESTS = Counter(
+    "token_cache_requests_total",
+    "Verified token cache lookups",
+    ["result"],
+)
+TOKEN_CACHE_SIZE = Gauge(
+    "token_cache_size",
+    "Verified token payloads currently cached",
+    multiprocess_mode="livesum",
+)
@@ -0,0 +1,78 @@
+"""
+Client address resolution behind trusted reverse proxies
+
+Behind nginx every connection comes from the proxy, so the peer address
+alone would put all clients in one rate limit bucket. When the peer is one
+of TRUSTED_PROXIES, the client is taken from X-Forwarded-For (rightmost
+address that is not a trusted proxy) or, failing that, X-Real-IP. Headers
+from untrusted peers are ignored, since any client can send them.
+"""
+import ipaddress
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple, Union
+
+from starlette.types import Scope
+
+from app.core.config import settings
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+@lru_cache(maxsize=8)
+def _parse_networks(proxies: Tuple[str, ...]) -> Tuple[Network, ...]:
+    return tuple(ipaddress.ip_network(proxy.strip(), strict=False) for proxy in proxies)
+
+
+def is_trusted_proxy(address: Optional[str], proxies: Optional[Sequence[str]] = None) -> bool:
+    """
+    Check whether an address belongs to a trusted proxy
+
+    Args:
+        address: IP address (anything else is not trusted)
+        proxies: Addresses or CIDR networks (default: TRUSTED_PROXIES)
+
+    Returns:
+        True if the address is in one of the networks
+    """
+    networks = _parse_networks(tuple(settings.TRUSTED_PROXIES if proxies is None else proxies))
+    if not address or not networks:
+        return False
+    try:
+        ip = ipaddress.ip_address(address.strip())
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def client_ip(scope: Scope) -> str:
+    """
+    Get the address of the client that sent a request
+
+    Args:
+        scope: ASGI connection scope
+
+    Returns:
+        Client IP address, or "unknown" if the server did not report a peer
+    """
+    client = scope.get("client")
+    peer = client[0] if client else None
+    if not is_trusted_proxy(peer):
+        return peer or "unknown"
+
+    hops = []
+    real_ip = None
+    for name, value in scope.get("headers", []):
+        if name == b"x-forwarded-for":
+            # Repeated headers form one comma-separated list, in order
+            hops.extend(hop.strip() for hop in value.decode("latin-1").split(","))
+        elif name == b"x-real-ip":
+            real_ip = value.decode("latin-1").strip()
+
+    hops = [hop for hop in hops if hop]
+    if hops:
+        for hop in reversed(hops):
+            if not is_trusted_proxy(hop):
+                return hop
+        # Every hop is a trusted proxy: the leftmost one is the origin
+        return hops[0]
+    return real_ip or peer
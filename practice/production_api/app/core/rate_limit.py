@@ -0,0 +1,186 @@
+"""
+Request rate limiting
+Sliding-window counters keyed by user ID or client IP
+
+Each window of ``window`` seconds has its own counter. A request is allowed
+while ``previous * (1 - elapsed) + current`` stays within the limit, where
+``elapsed`` is the fraction of the current window that has passed. This
+smooths the burst a plain fixed window allows at window boundaries while
+needing only two counters per key.
+"""
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Union
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.redis import get_redis
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of a rate limit check"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int
+
+
+def _evaluate(limit: int, window: int, now: float, previous: int, current: int) -> RateLimitResult:
+    """Weigh the previous window's count; current includes this request"""
+    elapsed = (now % window) / window
+    count = previous * (1 - elapsed) + current
+    allowed = count <= limit
+    retry_after = 0 if allowed else max(1, math.ceil(window - now % window))
+    return RateLimitResult(
+        allowed=allowed,
+        limit=limit,
+        remaining=max(0, int(limit - count)),
+        retry_after=retry_after,
+    )
+
+
+class MemoryRateLimiter:
+    """
+    In-process sliding-window limiter
+
+    State lives in this process only, so with several uvicorn workers each
+    one enforces the limit separately. Use the Redis backend for WORKERS > 1.
+    """
+
+    def __init__(self, limit: int, window: int = 60):
+        self.limit = limit
+        self.window = window
+        # key -> [window index, previous count, current count]
+        self._counters: Dict[str, List[int]] = {}
+        self._pruned_window = 0
+
+    def _prune(self, window_index: int) -> None:
+        """Drop keys that have not been seen for two windows (once per window)"""
+        if window_index == self._pruned_window:
+            return
+        self._pruned_window = window_index
+        stale = [key for key, entry in self._counters.items() if entry[0] < window_index - 1]
+        for key in stale:
+            del self._counters[key]
+
+    async def hit(self, key: str) -> RateLimitResult:
+        """
+        Count a request for a key
+
+        Args:
+            key: Client key (user or IP)
+
+        Returns:
+            Rate limit result
+        """
+        now = time.time()
+        window_index = int(now // self.window)
+        self._prune(window_index)
+
+        entry = self._counters.get(key)
+        if entry is None:
+            entry = self._counters[key] = [window_index, 0, 0]
+        elif entry[0] != window_index:
+            # Roll the window; a gap of more than one window resets both counts
+            entry[1] = entry[2] if entry[0] == window_index - 1 else 0
+            entry[2] = 0
+            entry[0] = window_index
+
+        entry[2] += 1
+        return _evaluate(self.limit, self.window, now, entry[1], entry[2])
+
+    def reset(self) -> None:
+        """Forget all counters"""
+        self._counters.clear()
+
+
+class RedisRateLimiter:
+    """
+    Sliding-window limiter with counters in Redis, shared by all workers
+
+    Each check is one pipelined round trip (INCR + EXPIRE + GET). If Redis
+    is unavailable the request is allowed rather than failing the API.
+    """
+
+    KEY_PREFIX = "ratelimit"
+
+    def __init__(
+        self,
+        limit: int,
+        get_client: Callable[[], Optional[aioredis.Redis]],
+        window: int = 60,
+    ):
+        self.limit = limit
+        self.window = window
+        self.get_client = get_client
+
+    async def hit(self, key: str) -> RateLimitResult:
+        """
+        Count a request for a key
+
+        Args:
+            key: Client key (user or IP)
+
+        Returns:
+            Rate limit result
+        """
+        now = time.time()
+        window_index = int(now // self.window)
+        allow = RateLimitResult(allowed=True, limit=self.limit, remaining=self.limit, retry_after=0)
+
+        redis = self.get_client()
+        if redis is None:
+            return allow
+
+        current_key = f"{self.KEY_PREFIX}:{key}:{window_index}"
+        previous_key = f"{self.KEY_PREFIX}:{key}:{window_index - 1}"
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.incr(current_key)
+                pipe.expire(current_key, self.window * 2)
+                pipe.get(previous_key)
+                current, _, previous = await pipe.execute()
+        except RedisError as e:
+            logger.warning("Rate limiter unavailable", error=str(e))
+            return allow
+
+        return _evaluate(self.limit, self.window, now, int(previous or 0), int(current))
+
+
+RateLimiter = Union[MemoryRateLimiter, RedisRateLimiter]
+
+# Shared limiter, created on first use from settings
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Get the shared rate limiter for the configured backend
+
+    Returns:
+        MemoryRateLimiter or RedisRateLimiter
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        if settings.RATE_LIMIT_BACKEND == "redis":
+            _rate_limiter = RedisRateLimiter(settings.RATE_LIMIT_PER_MINUTE, get_redis)
+        else:
+            if settings.WORKERS > 1 and not settings.RELOAD:
+                logger.warning(
+                    "In-memory rate limiter is per worker; use RATE_LIMIT_BACKEND=redis",
+                    workers=settings.WORKERS,
+                )
+            _rate_limiter = MemoryRateLimiter(settings.RATE_LIMIT_PER_MINUTE)
+    return _rate_limiter
+
+
+def reset_rate_limiter() -> None:
+    """Drop the shared limiter so the next request starts from empty counters"""
+    global _rate_limiter
+    _rate_limiter = None
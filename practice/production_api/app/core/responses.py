@@ -0,0 +1,126 @@
+"""
+Response classes and serialization helpers
+Uses orjson when installed, falling back to the standard JSON response
+
+List endpoints return ORM rows the application just loaded itself. Running
+those through ``response_model`` validates every row again and encodes the
+result twice; ``rows_response`` instead copies the schema's fields straight
+from the loaded rows and encodes them once.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Type
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+    ORJSON_AVAILABLE = True
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+    ORJSONResponse = None
+    ORJSON_AVAILABLE = False
+
+# Default response class for the application
+DefaultResponse = ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
+
+
+def _row_to_dict(row: Any, fields: Iterable[str]) -> Dict[str, Any]:
+    # Read loaded column values from the instance dict to skip the
+    # instrumented attribute lookup; anything not loaded goes through getattr
+    state = getattr(row, "__dict__", {})
+    return {field: state[field] if field in state else getattr(row, field) for field in fields}
+
+
+def dump_rows(schema: Type[BaseModel], rows: Iterable[Any], **extra: Any) -> bytes:
+    """
+    Serialize trusted ORM rows as JSON without validating them
+
+    Only the fields declared on ``schema`` are emitted. Output matches what
+    ``response_model=List[schema]`` would produce for the same rows.
+
+    Args:
+        schema: Response schema listing the fields to emit
+        rows: ORM rows loaded by the application (None is emitted as null)
+        **extra: If given, the rows are wrapped as {"items": [...], **extra}
+
+    Returns:
+        JSON document as bytes
+    """
+    fields = tuple(schema.model_fields)
+    items = [None if row is None else _row_to_dict(row, fields) for row in rows]
+    content: Any = {"items": items, **extra} if extra else items
+    return _dumps(content)
+
+
+def _dumps(content: Any) -> bytes:
+    if ORJSON_AVAILABLE:
+        # OPT_UTC_Z renders UTC datetimes with "Z", like Pydantic does
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return TypeAdapter(Any).dump_json(content)
+
+
+def row_response(
+    schema: Type[BaseModel],
+    row: Any,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Build a JSON response from a single trusted ORM row
+
+    Args:
+        schema: Response schema listing the fields to emit
+        row: ORM row loaded by the application
+        headers: Extra response headers
+
+    Returns:
+        JSON response
+    """
+    body = _dumps(_row_to_dict(row, tuple(schema.model_fields)))
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def rows_response(
+    schema: Type[BaseModel],
+    rows: List[Any],
+    page: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Build a JSON response from trusted ORM rows
+
+    Returning a Response from an endpoint skips FastAPI's response_model
+    validation, so keep ``response_model`` on the route for the OpenAPI schema.
+
+    Args:
+        schema: Response schema listing the fields to emit
+        rows: ORM rows loaded by the application
+        page: Pagination fields; if given, the rows are returned as a
+            PaginatedResponse-shaped object
+        headers: Extra response headers
+
+    Returns:
+        JSON response
+    """
+    body = dump_rows(schema, rows, **(page or {}))
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def batch_response(
+    schema: Type[BaseModel],
+    ids: List[int],
+    rows: List[Optional[Any]],
+) -> Response:
+    """
+    Build a BatchResponse-shaped JSON response from trusted ORM rows
+
+    Args:
+        schema: Response schema listing the fields to emit
+        ids: Requested IDs
+        rows: Row for each requested ID, None where it was not found
+
+    Returns:
+        JSON response with ``items`` in request order and the ``missing`` IDs
+    """
+    missing = list(dict.fromkeys(row_id for row_id, row in zip(ids, rows) if row is None))
+    body = dump_rows(schema, rows, missing=missing)
+    return Response(content=body, media_type="application/json")
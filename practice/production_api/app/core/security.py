@@ -2,18 +2,41 @@
 Security utilities for authentication and authorization
 Handles JWT token generation, password hashing, and verification
 """
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Optional, Dict, Any, List, Tuple, TypeVar
 from fastapi import HTTPException, status, Depends, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from app.core.config import settings
+from app.core.metrics import (
+    PASSWORD_HASH_DURATION,
+    PASSWORD_HASH_PENDING,
+    PASSWORD_HASH_REJECTED,
+    TOKEN_CACHE_REQUESTS,
+    TOKEN_CACHE_SIZE,
+)
 
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+T = TypeVar("T")
+
+# passlib (bcrypt) and jose (cryptography) are imported on first use rather
+# than at startup; health checks and public endpoints never need them.
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context() -> "CryptContext":
+    """Password hashing context, created on first use"""
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # HTTP Bearer token authentication
 security = HTTPBearer()
@@ -21,12 +44,114 @@ security = HTTPBearer()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Generate password hash"""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+
+def get_password_hashes(passwords: List[str]) -> List[str]:
+    """Generate password hashes for a chunk of passwords in one executor call"""
+    pwd_context = get_pwd_context()
+    return [pwd_context.hash(password) for password in passwords]
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a bounded executor
+    
+    Keeps the event loop free while bcrypt runs and rejects new work with
+    503 once ``max_pending`` operations are queued or running.
+    """
+    
+    def __init__(self, workers: int, max_pending: int, executor_type: str = "thread"):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor_type = executor_type
+        self.pending = 0
+        self._executor: Optional[Executor] = None
+    
+    @property
+    def executor(self) -> Executor:
+        """Executor, created on first use"""
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="password-hash",
+                )
+        return self._executor
+    
+    async def run(self, operation: str, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run a hashing function on the executor
+        
+        Args:
+            operation: Operation name used for metrics
+            func: Picklable function to run
+            *args: Arguments for func
+            
+        Returns:
+            Result of func
+            
+        Raises:
+            HTTPException: If the executor queue is full
+        """
+        if self.pending >= self.max_pending:
+            PASSWORD_HASH_REJECTED.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        
+        self.pending += 1
+        PASSWORD_HASH_PENDING.set(self.pending)
+        start_time = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+            PASSWORD_HASH_PENDING.set(self.pending)
+            PASSWORD_HASH_DURATION.labels(operation=operation).observe(
+                time.perf_counter() - start_time
+            )
+    
+    def shutdown(self) -> None:
+        """Shut down the executor, waiting for running operations"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+# Shared password hasher
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    executor_type=settings.PASSWORD_HASH_EXECUTOR,
+)
+
+# Separate pool for bulk imports, so an import never delays logins
+import_password_hasher = PasswordHasher(
+    workers=settings.USER_IMPORT_HASH_WORKERS,
+    max_pending=settings.USER_IMPORT_HASH_WORKERS * 2,
+    executor_type=settings.PASSWORD_HASH_EXECUTOR,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a plain password against a hashed password off the event loop"""
+    return await password_hasher.run("verify", verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate password hash off the event loop"""
+    return await password_hasher.run("hash", get_password_hash, password)
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -53,6 +178,8 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
         "type": "access"
     })
     
+    from jose import jwt
+    
     encoded_jwt = jwt.encode(
         to_encode, 
         settings.SECRET_KEY, 
@@ -80,6 +207,8 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
         "type": "refresh"
     })
     
+    from jose import jwt
+    
     encoded_jwt = jwt.encode(
         to_encode,
         settings.SECRET_KEY,
@@ -88,10 +217,83 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
     return encoded_jwt
 
 
+class TokenCache:
+    """
+    Bounded LRU cache of verified token payloads
+    
+    Entries are keyed by a SHA-256 digest of the token and expire at the
+    token's ``exp`` claim, so a cached payload is never served for an
+    expired token.
+    """
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+    
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+    
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Get the cached payload for a token, or None on a miss"""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.time():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            TOKEN_CACHE_REQUESTS.labels(result="hit").inc()
+            return dict(entry[1])
+        
+        if entry is not None:
+            del self._entries[key]
+            TOKEN_CACHE_SIZE.set(len(self._entries))
+        self.misses += 1
+        TOKEN_CACHE_REQUESTS.labels(result="miss").inc()
+        return None
+    
+    def set(self, token: str, payload: Dict[str, Any]) -> None:
+        """Cache a verified payload until its expiry"""
+        expires_at = payload.get("exp")
+        if self.max_size <= 0 or not isinstance(expires_at, (int, float)):
+            return
+        
+        key = self._key(token)
+        self._entries[key] = (float(expires_at), dict(payload))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        TOKEN_CACHE_SIZE.set(len(self._entries))
+    
+    def clear(self) -> None:
+        """Remove all cached payloads and reset counters"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        TOKEN_CACHE_SIZE.set(0)
+    
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Shared cache of verified token payloads
+token_cache = TokenCache(max_size=settings.TOKEN_CACHE_SIZE)
+
+
 def decode_token(token: str) -> Dict[str, Any]:
     """
     Decode and validate a JWT token
     
+    Verified payloads are cached until the token expires, so repeated
+    requests with the same token skip signature verification.
+    
     Args:
         token: JWT token string to decode
         
@@ -101,12 +303,19 @@ def decode_token(token: str) -> Dict[str, Any]:
     Raises:
         HTTPException: If token is invalid or expired
     """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    
+    from jose import JWTError, jwt
+    
     try:
         payload = jwt.decode(
             token,
             settings.SECRET_KEY,
             algorithms=[settings.ALGORITHM]
         )
+        token_cache.set(token, payload)
         return payload
     except JWTError as e:
         raise HTTPException(
@@ -116,6 +325,30 @@ def decode_token(token: str) -> Dict[str, Any]:
         )
 
 
+def bearer_user_id(authorization: Optional[str]) -> Optional[Any]:
+    """
+    Get the user ID from an Authorization header without failing
+    
+    Used to identify the caller outside of endpoint dependencies, e.g. for
+    rate limiting. Invalid or missing tokens give None.
+    
+    Args:
+        authorization: Authorization header value
+        
+    Returns:
+        User ID from a valid bearer token, otherwise None
+    """
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return decode_token(token).get("user_id")
+    except HTTPException:
+        return None
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Security(security)
 ) -> Dict[str, Any]:
@@ -0,0 +1,65 @@
+"""
+Single-flight call coalescing
+Concurrent calls with the same key share one in-flight call and its result
+
+Coalescing is per process; each uvicorn worker runs its own flights.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Tuple, TypeVar
+
+from app.core.metrics import SINGLEFLIGHT_CALLS
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesces concurrent calls into one call per key
+
+    The first caller (the leader) starts the call; callers arriving while it
+    is in flight wait for the same result, or the same exception. The call
+    is shielded, so a cancelled caller (e.g. a disconnected client) does not
+    cancel it for the others. Once it finishes, the next caller starts a new
+    call; results are never cached.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[Hashable, "asyncio.Future[T]"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Run ``fn`` unless a call for ``key`` is already in flight
+
+        Args:
+            key: Identifies calls that may share a result
+            fn: Starts the call
+
+        Returns:
+            Tuple of (result, shared), where shared is True if this caller
+            joined another caller's flight
+
+        Raises:
+            Exception: Whatever the shared call raised
+        """
+        flight = self._flights.get(key)
+        if flight is not None:
+            SINGLEFLIGHT_CALLS.labels(name=self.name, role="follower").inc()
+            return await asyncio.shield(flight), True
+
+        SINGLEFLIGHT_CALLS.labels(name=self.name, role="leader").inc()
+        flight = asyncio.ensure_future(fn())
+        self._flights[key] = flight
+        flight.add_done_callback(lambda done: self._land(key, done))
+        return await asyncio.shield(flight), False
+
+    def _land(self, key: Hashable, flight: "asyncio.Future[T]") -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Mark the exception as retrieved in case every caller was cancelled
+        if not flight.cancelled():
+            flight.exception()
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Whether a call for ``key`` is currently running"""
+        return key in self._flights
@@ -1,18 +1,26 @@
 """Database utilities initialization"""
 from app.db.session import (
     get_db,
+    get_read_db,
     init_db,
     close_db,
     Base,
     engine,
     AsyncSessionLocal,
+    read_engine,
 )
+from app.db.redis import get_redis, init_redis, close_redis
 
 __all__ = [
     "get_db",
+    "get_read_db",
     "init_db",
     "close_db",
     "Base",
     "engine",
     "AsyncSessionLocal",
+    "read_engine",
+    "get_redis",
+    "init_redis",
+    "close_redis",
 ]
@@ -0,0 +1,140 @@
+"""
+Request-scoped DataLoader batching for lookups by primary key
+
+Loaders live on the database session (``session.info``), so every session
+handed out by get_db or get_read_db batches its own lookups and nothing is
+shared between requests. Lookups for the same kind of row made in the same
+event-loop tick (e.g. under asyncio.gather) are resolved together with one
+``WHERE id IN (...)`` query, and repeated keys are loaded once.
+"""
+import asyncio
+from typing import (
+    Any, Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Sequence, Type, TypeVar,
+)
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.util import identity_key
+
+from app.core.metrics import DATALOADER_BATCH_KEYS, DATALOADER_LOADS
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+LOADERS_KEY = "dataloaders"
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Collects load() calls made in one event-loop tick into a single batch call
+
+    ``batch_fn`` receives the distinct keys and must return one value per
+    key, in the same order. Batches run one at a time, so a loader can be
+    backed by a single AsyncSession. Results are not cached between ticks.
+    """
+
+    def __init__(self, name: str, batch_fn: Callable[[List[K]], Awaitable[List[V]]]):
+        self.name = name
+        self.batch_fn = batch_fn
+        self._pending: Dict[K, "asyncio.Future[V]"] = {}
+        self._lock = asyncio.Lock()
+
+    async def load(self, key: K) -> V:
+        """
+        Load one key, batched with the other keys requested in this tick
+
+        Args:
+            key: Key to load
+
+        Returns:
+            The value batch_fn returned for the key
+
+        Raises:
+            Exception: Whatever batch_fn raised
+        """
+        DATALOADER_LOADS.labels(loader=self.name).inc()
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                # Runs after the callbacks already queued, i.e. once every
+                # task started in this tick has had a chance to call load()
+                loop.call_soon(lambda: loop.create_task(self._dispatch()))
+            future = self._pending[key] = loop.create_future()
+        # A cancelled caller must not cancel the result for the others
+        return await asyncio.shield(future)
+
+    async def _dispatch(self) -> None:
+        batch, self._pending = self._pending, {}
+        keys = list(batch)
+        DATALOADER_BATCH_KEYS.labels(loader=self.name).observe(len(keys))
+        try:
+            async with self._lock:
+                values = await self.batch_fn(keys)
+        except BaseException as e:
+            for future in batch.values():
+                future.set_exception(e)
+                # Mark as retrieved in case every caller was cancelled
+                future.exception()
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        for key, value in zip(keys, values):
+            batch[key].set_result(value)
+
+
+def session_loader(
+    db: AsyncSession,
+    name: str,
+    batch_fn: Callable[[AsyncSession, List[K]], Awaitable[List[V]]],
+) -> DataLoader[K, V]:
+    """
+    Get the session's loader called ``name``, creating it on first use
+
+    Args:
+        db: Database session the loader belongs to
+        name: Loader name (one loader per name and session)
+        batch_fn: Called as ``batch_fn(db, keys)``
+
+    Returns:
+        DataLoader bound to the session
+    """
+    loaders: Dict[str, DataLoader[Any, Any]] = db.info.setdefault(LOADERS_KEY, {})
+    loader = loaders.get(name)
+    if loader is None:
+        loader = loaders[name] = DataLoader(name, lambda keys: batch_fn(db, keys))
+    return loader
+
+
+async def get_by_ids(db: AsyncSession, model: Type[V], ids: Sequence[Any]) -> List[Optional[V]]:
+    """
+    Get rows by primary key with at most one IN query
+
+    Rows the session already holds are taken from its identity map, which
+    is what a query for them would return anyway.
+
+    Args:
+        db: Database session
+        model: Mapped class with a single-column primary key named ``id``
+        ids: Primary keys (duplicates allowed)
+
+    Returns:
+        The row for each ID, in the same order, None where not found
+    """
+    identity_map = db.sync_session.identity_map
+    rows: Dict[Any, V] = {}
+    for row_id in set(ids):
+        row = identity_map.get(identity_key(model, row_id))
+        if row is None:
+            continue
+        state = inspect(row)
+        if not state.expired and not state.deleted:
+            rows[row_id] = row
+
+    missing = [row_id for row_id in set(ids) if row_id not in rows]
+    if missing:
+        # A plain equality skips the expanding IN parameter for the common single lookup
+        condition = model.id == missing[0] if len(missing) == 1 else model.id.in_(missing)
+        result = await db.execute(select(model).where(condition))
+        rows.update((row.id, row) for row in result.scalars())
+    return [rows.get(row_id) for row_id in ids]
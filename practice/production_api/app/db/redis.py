@@ -0,0 +1,51 @@
+"""
+Redis connection management
+Provides a shared async Redis client used for caching
+"""
+from typing import Optional
+from redis import asyncio as aioredis
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Shared client, created on application startup
+redis_client: Optional[aioredis.Redis] = None
+
+
+async def init_redis() -> None:
+    """
+    Create the shared Redis client
+    Connections are opened lazily, so an unavailable Redis does not block startup
+    """
+    global redis_client
+    redis_client = aioredis.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    )
+    logger.info("Redis client initialized")
+
+
+async def close_redis() -> None:
+    """
+    Close the shared Redis client
+    Should be called on application shutdown
+    """
+    global redis_client
+    if redis_client is not None:
+        await redis_client.close()
+        redis_client = None
+        logger.info("Redis connections closed")
+
+
+def get_redis() -> Optional[aioredis.Redis]:
+    """
+    Dependency function to get the shared Redis client
+
+    Returns:
+        Redis client, or None if Redis has not been initialized
+    """
+    return redis_client
@@ -2,25 +2,77 @@
 Database session management and configuration
 Handles SQLAlchemy async database connections and session lifecycle
 """
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+import time
+from typing import AsyncGenerator, List, Optional
+from fastapi import Depends, Request
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session, declarative_base
 from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.metrics import DB_CONNECTION_HOLD_DURATION, DB_POOL_CHECKED_OUT, DB_READ_SESSIONS
+from app.core.proxy import client_ip
+from app.core.security import bearer_user_id
+from app.db.redis import get_redis
 
 logger = get_logger(__name__)
 
+
+def _create_engine(url: str) -> AsyncEngine:
+    """Create an async engine; pool sizing only applies to pooled server databases"""
+    options = {
+        "echo": settings.DB_ECHO,
+        "pool_pre_ping": True,  # Verify connections before using
+    }
+    if settings.ENVIRONMENT == "test":
+        options["poolclass"] = NullPool
+    elif not url.startswith("sqlite"):
+        options["pool_size"] = settings.DB_POOL_SIZE
+        options["max_overflow"] = settings.DB_MAX_OVERFLOW
+    return create_async_engine(url, **options)
+
+
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DB_ECHO,
-    pool_size=settings.DB_POOL_SIZE,
-    max_overflow=settings.DB_MAX_OVERFLOW,
-    pool_pre_ping=True,  # Verify connections before using
-    poolclass=NullPool if settings.ENVIRONMENT == "test" else None,
-)
+engine = _create_engine(settings.DATABASE_URL)
+
+# Read replica engine; without DATABASE_READ_URL reads use the primary
+read_engine: AsyncEngine = engine
+if settings.DATABASE_READ_URL:
+    read_engine = _create_engine(settings.DATABASE_READ_URL)
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    """Track connections taken from the pool"""
+    connection_record.info["checkout_time"] = time.perf_counter()
+    DB_POOL_CHECKED_OUT.inc()
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    """Track connections returned to the pool"""
+    checkout_time = connection_record.info.pop("checkout_time", None)
+    if checkout_time is not None:
+        DB_POOL_CHECKED_OUT.dec()
+        DB_CONNECTION_HOLD_DURATION.observe(time.perf_counter() - checkout_time)
+
+
+for _engine in {engine, read_engine}:
+    event.listen(_engine.sync_engine, "checkout", _on_checkout)
+    event.listen(_engine.sync_engine, "checkin", _on_checkin)
+
+
+class ReadOnlySession(Session):
+    """Session class for read-only dependencies; refuses to flush changes"""
+
+
+@event.listens_for(ReadOnlySession, "before_flush")
+def _refuse_flush(session, flush_context, instances):
+    raise InvalidRequestError("Cannot write through a read-only session; use get_db")
+
 
 # Create async session maker
 AsyncSessionLocal = async_sessionmaker(
@@ -31,14 +83,103 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# Read-only session makers for the replica and, after recent writes, the primary
+AsyncReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    sync_session_class=ReadOnlySession,
+    expire_on_commit=False,
+    autoflush=False,
+)
+AsyncPrimaryReadSessionLocal = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    sync_session_class=ReadOnlySession,
+    expire_on_commit=False,
+    autoflush=False,
+)
+
 # Base class for models
 Base = declarative_base()
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+# Redis key prefix marking clients that wrote within READ_YOUR_WRITES_SECONDS
+RECENT_WRITE_PREFIX = "db:recent-write:"
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def replica_enabled() -> bool:
+    """Whether read-only sessions go to a separate read replica"""
+    return read_engine is not engine
+
+
+def _writer_keys(request: Request) -> List[str]:
+    """Identify the client by user (bearer token) and by client address"""
+    keys = [f"{RECENT_WRITE_PREFIX}ip:{client_ip(request.scope)}"]
+    user_id = bearer_user_id(request.headers.get("authorization"))
+    if user_id is not None:
+        keys.append(f"{RECENT_WRITE_PREFIX}user:{user_id}")
+    return keys
+
+
+async def mark_recent_write(request: Request, redis: Optional[aioredis.Redis]) -> None:
+    """
+    Remember that a client just wrote, so its reads stay on the primary
+    
+    The token's user is marked, or the client address for anonymous writes
+    such as registration and login.
+    
+    Args:
+        request: Request that committed a write
+        redis: Redis client
+    """
+    if not replica_enabled() or redis is None or settings.READ_YOUR_WRITES_SECONDS <= 0:
+        return
+    keys = _writer_keys(request)
+    try:
+        await redis.set(keys[-1], 1, px=int(settings.READ_YOUR_WRITES_SECONDS * 1000))
+    except RedisError as e:
+        logger.warning("Failed to record recent write", error=str(e))
+
+
+async def wrote_recently(request: Request, redis: Optional[aioredis.Redis]) -> bool:
+    """
+    Check whether a client wrote within READ_YOUR_WRITES_SECONDS
+    
+    Without Redis this cannot be known, so it answers True and reads stay
+    on the primary.
+    
+    Args:
+        request: Incoming request
+        redis: Redis client
+        
+    Returns:
+        True if the client's reads should go to the primary
+    """
+    if settings.READ_YOUR_WRITES_SECONDS <= 0:
+        return False
+    if redis is None:
+        return True
+    try:
+        return await redis.exists(*_writer_keys(request)) > 0
+    except RedisError as e:
+        logger.warning("Failed to check recent writes", error=str(e))
+        return True
+
+
+async def get_db(
+    request: Request,
+    redis: Optional[aioredis.Redis] = Depends(get_redis)
+) -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency function to get database session
     
+    The session is committed when the request succeeds. With a read replica
+    configured, clients making non-GET requests are marked so their next
+    reads see their own writes. Lookups by ID made through the session are
+    batched per event-loop tick (see app/db/loader.py).
+    
     Yields:
         AsyncSession: Database session
         
@@ -58,6 +199,40 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             raise
         finally:
             await session.close()
+    
+    if request.method not in SAFE_METHODS:
+        await mark_recent_write(request, redis)
+
+
+async def get_read_db(
+    request: Request,
+    redis: Optional[aioredis.Redis] = Depends(get_redis)
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function to get a read-only database session
+    
+    Nothing is committed; the transaction is rolled back when the request
+    ends and any attempt to flush changes raises. Sessions use the read
+    replica (DATABASE_READ_URL) unless the client wrote within
+    READ_YOUR_WRITES_SECONDS, in which case they use the primary.
+    
+    Yields:
+        AsyncSession: Read-only database session
+    """
+    target = "replica" if replica_enabled() else "primary"
+    if target == "replica" and await wrote_recently(request, redis):
+        target = "primary"
+    DB_READ_SESSIONS.labels(target=target).inc()
+    session_maker = AsyncReadSessionLocal if target == "replica" else AsyncPrimaryReadSessionLocal
+    
+    async with session_maker() as session:
+        try:
+            yield session
+        except Exception as e:
+            logger.error("Database session error", error=str(e))
+            raise
+        finally:
+            await session.rollback()
 
 
 async def init_db() -> None:
@@ -76,4 +251,6 @@ async def close_db() -> None:
     Should be called on application shutdown
     """
     await engine.dispose()
+    if replica_enabled():
+        await read_engine.dispose()
     logger.info("Database connections closed")
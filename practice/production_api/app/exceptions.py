@@ -2,8 +2,10 @@
 Custom exception handlers for better error responses
 """
 from fastapi import Request, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
+from pydantic_core import PydanticUndefinedType
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.logging import get_logger
@@ -16,17 +18,19 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     Handle Pydantic validation errors
     Returns detailed validation error messages
     """
+    # Errors for missing parameters carry PydanticUndefined as their input
+    errors = jsonable_encoder(exc.errors(), custom_encoder={PydanticUndefinedType: lambda _: None})
     logger.warning(
         "Validation error",
         path=request.url.path,
-        errors=exc.errors(),
+        errors=errors,
     )
     
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
             "detail": "Validation error",
-            "errors": exc.errors(),
+            "errors": errors,
             "request_id": getattr(request.state, "request_id", None)
         }
     )
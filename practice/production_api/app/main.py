@@ -3,16 +3,22 @@ Main FastAPI application
 Production-ready REST API with authentication, logging, and error handling
 """
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import settings
-from app.core.logging import setup_logging, get_logger
+from app.core.logging import setup_logging, stop_logging, get_logger
+from app.core.metrics import PROMETHEUS_AVAILABLE, mark_dead_workers, mark_process_dead, render_metrics
+from app.core.responses import DefaultResponse
 from app.db.session import init_db, close_db
+from app.db.redis import init_redis, close_redis
+from app.core.http_client import init_http_client, close_http_client
+from app.core.health import prober
+from app.core.security import import_password_hasher, password_hasher
 from app.api import api_router
-from app.middleware import RequestLoggingMiddleware, ErrorHandlingMiddleware
+from app.middleware import RateLimitMiddleware, RequestLoggingMiddleware
 from app.exceptions import (
     validation_exception_handler,
     database_exception_handler,
@@ -38,13 +44,27 @@ async def lifespan(app: FastAPI):
         environment=settings.ENVIRONMENT,
     )
     
-    # Initialize database
-    try:
-        await init_db()
-        logger.info("Database initialized successfully")
-    except Exception as e:
-        logger.error("Failed to initialize database", error=str(e))
-        raise
+    # Drop gauges left behind by workers that crashed (multiprocess metrics only)
+    mark_dead_workers()
+    
+    # Create tables only when asked; migrations own the schema, and every
+    # worker running DDL checks slows down scale-out
+    if settings.DB_CREATE_ALL:
+        try:
+            await init_db()
+            logger.info("Database initialized successfully")
+        except Exception as e:
+            logger.error("Failed to initialize database", error=str(e))
+            raise
+    
+    # Initialize Redis client (connects lazily)
+    await init_redis()
+    
+    # Initialize pooled HTTP client for external APIs
+    await init_http_client()
+    
+    # Check dependencies in the background for the health endpoints
+    prober.start()
     
     # Initialize Sentry if configured
     if settings.SENTRY_DSN:
@@ -63,8 +83,15 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down application")
+    await prober.stop()
+    await close_http_client()
+    password_hasher.shutdown()
+    import_password_hasher.shutdown()
+    await close_redis()
     await close_db()
+    mark_process_dead()
     logger.info("Application shutdown complete")
+    stop_logging()
 
 
 # Create FastAPI application
@@ -77,8 +104,12 @@ app = FastAPI(
     openapi_url="/openapi.json",
     lifespan=lifespan,
     debug=settings.DEBUG,
+    default_response_class=DefaultResponse,
 )
 
+# Add rate limiting (inside CORS so 429 responses carry CORS headers)
+app.add_middleware(RateLimitMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -88,9 +119,8 @@ app.add_middleware(
     allow_headers=settings.ALLOWED_HEADERS,
 )
 
-# Add custom middleware
+# Add custom middleware (request ID, logging and 500 fallback)
 app.add_middleware(RequestLoggingMiddleware)
-app.add_middleware(ErrorHandlingMiddleware)
 
 # Add exception handlers
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
@@ -101,28 +131,15 @@ app.add_exception_handler(Exception, general_exception_handler)
 app.include_router(api_router)
 
 # Metrics endpoint (Prometheus)
-try:
-    from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
-    from fastapi import Response
-    
-    REQUEST_COUNT = Counter(
-        'http_requests_total', 
-        'Total HTTP requests',
-        ['method', 'endpoint', 'status']
-    )
-    REQUEST_DURATION = Histogram(
-        'http_request_duration_seconds',
-        'HTTP request duration',
-        ['method', 'endpoint']
-    )
-    
+if PROMETHEUS_AVAILABLE:
     @app.get("/metrics")
     async def metrics():
         """Prometheus metrics endpoint"""
-        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+        payload, content_type = render_metrics()
+        return Response(payload, media_type=content_type)
     
     logger.info("Metrics endpoint enabled at /metrics")
-except ImportError:
+else:
     logger.warning("Prometheus client not available, metrics endpoint disabled")
 
 
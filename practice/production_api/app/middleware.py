@@ -1,86 +1,191 @@
 """
 Custom middleware for request/response processing
 Includes logging, error handling, and request tracking
+
+Implemented as a pure ASGI middleware rather than BaseHTTPMiddleware so each
+request runs in the caller's task without extra memory streams, and streaming
+responses are passed through untouched.
 """
+import json
 import time
 import uuid
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
 import structlog
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.core.logging import get_logger
+from app.core.config import settings
+from app.core.logging import get_logger, should_log_request
+from app.core.metrics import RATE_LIMIT_REJECTED, REQUEST_COUNT, REQUEST_DURATION
+from app.core.proxy import client_ip
+from app.core.rate_limit import get_rate_limiter
+from app.core.security import bearer_user_id
 
 logger = get_logger(__name__)
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to log all HTTP requests and responses"""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+class RequestLoggingMiddleware:
+    """Middleware to log all HTTP requests and handle unhandled exceptions"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Generate request ID
         request_id = str(uuid.uuid4())
-        
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
+
         # Add request ID to logging context
         structlog.contextvars.clear_contextvars()
         structlog.contextvars.bind_contextvars(request_id=request_id)
-        
-        # Log request
-        start_time = time.time()
-        logger.info(
-            "Request started",
-            method=request.method,
-            path=request.url.path,
-            client_ip=request.client.host if request.client else None,
-        )
-        
-        # Add request ID to headers
-        request.state.request_id = request_id
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Calculate duration
-        duration = time.time() - start_time
-        
-        # Log response
-        logger.info(
-            "Request completed",
-            method=request.method,
-            path=request.url.path,
-            status_code=response.status_code,
-            duration=f"{duration:.3f}s",
-        )
-        
-        # Add request ID to response headers
-        response.headers["X-Request-ID"] = request_id
-        
-        return response
-
-
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
-    """Middleware to handle unhandled exceptions"""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+
+        # Expose request ID as request.state.request_id
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        # Log request (start/completion lines may be sampled on busy routes)
+        start_time = time.perf_counter()
+        log_request = should_log_request(path)
+        if log_request:
+            logger.info(
+                "Request started",
+                method=method,
+                path=path,
+                client_ip=client[0] if client else None,
+            )
+
+        status_code = 500
+        response_started = False
+        request_id_header = (b"x-request-id", request_id.encode("latin-1"))
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+                # Add request ID to response headers
+                message["headers"] = [*message.get("headers", []), request_id_header]
+            await send(message)
+
         try:
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send_wrapper)
         except Exception as exc:
             logger.error(
                 "Unhandled exception",
                 error=str(exc),
                 error_type=type(exc).__name__,
-                path=request.url.path,
-                method=request.method,
+                path=path,
+                method=method,
             )
-            
+            if response_started:
+                raise
+
             # Return generic error response
-            from fastapi.responses import JSONResponse
-            return JSONResponse(
-                status_code=500,
-                content={
-                    "detail": "Internal server error",
-                    "request_id": getattr(request.state, "request_id", None)
-                }
-            )
+            body = json.dumps({
+                "detail": "Internal server error",
+                "request_id": request_id,
+            }).encode("utf-8")
+            await send_wrapper({
+                "type": "http.response.start",
+                "status": 500,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                ],
+            })
+            await send_wrapper({"type": "http.response.body", "body": body})
+        finally:
+            # Calculate duration
+            duration = time.perf_counter() - start_time
+
+            # Log response (server errors are always logged)
+            if log_request or status_code >= 500:
+                logger.info(
+                    "Request completed",
+                    method=method,
+                    path=path,
+                    status_code=status_code,
+                    duration=f"{duration:.3f}s",
+                )
+
+            # Record metrics by route template, not raw path
+            route = scope.get("route")
+            endpoint = route.path if route is not None else "unmatched"
+            REQUEST_COUNT.labels(method=method, endpoint=endpoint, status=status_code).inc()
+            REQUEST_DURATION.labels(method=method, endpoint=endpoint).observe(duration)
+
+
+class RateLimitMiddleware:
+    """
+    Middleware enforcing RATE_LIMIT_PER_MINUTE per user or client IP
+
+    Runs before routing, so rejected requests never reach a dependency and
+    never open a database session. Authenticated requests are keyed by the
+    token's user ID (verified through the token cache), everything else by
+    client IP.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    @staticmethod
+    def client_key(scope: Scope) -> str:
+        """
+        Build the rate limit key for a request
+
+        Args:
+            scope: ASGI connection scope
+
+        Returns:
+            "user:<id>" for a valid bearer token, otherwise "ip:<address>"
+            (the forwarded client address behind a trusted proxy)
+        """
+        for name, value in scope.get("headers", []):
+            if name == b"authorization":
+                user_id = bearer_user_id(value.decode("latin-1"))
+                if user_id is not None:
+                    return f"user:{user_id}"
+                break
+
+        return f"ip:{client_ip(scope)}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or scope["path"] in settings.RATE_LIMIT_EXEMPT_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        result = await get_rate_limiter().hit(self.client_key(scope))
+        limit_headers = [
+            (b"x-ratelimit-limit", str(result.limit).encode("latin-1")),
+            (b"x-ratelimit-remaining", str(result.remaining).encode("latin-1")),
+        ]
+
+        if not result.allowed:
+            RATE_LIMIT_REJECTED.inc()
+            body = json.dumps({"detail": "Rate limit exceeded"}).encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                    (b"retry-after", str(result.retry_after).encode("latin-1")),
+                    *limit_headers,
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *limit_headers]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,23 +1,88 @@
 """
 Joke model for storing fetched jokes
 """
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Text
+import hashlib
+from datetime import datetime, timezone
+from sqlalchemy import DDL, Column, Index, Integer, String, DateTime, Text, event, literal_column, text
 from sqlalchemy.sql import func
 from app.db.session import Base
 
+# Text search configuration used by the Postgres index and queries
+SEARCH_CONFIG = "english"
+
+# SQLite keeps a full-text index in an FTS5 table synced by triggers
+FTS_TABLE = "jokes_fts"
+SQLITE_FTS_DDL = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    "setup, punchline, content='jokes', content_rowid='id', tokenize='porter unicode61')",
+    f"CREATE TRIGGER jokes_fts_insert AFTER INSERT ON jokes BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, setup, punchline) VALUES (new.id, new.setup, new.punchline); END",
+    f"CREATE TRIGGER jokes_fts_delete AFTER DELETE ON jokes BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, setup, punchline) "
+    f"VALUES ('delete', old.id, old.setup, old.punchline); END",
+    f"CREATE TRIGGER jokes_fts_update AFTER UPDATE ON jokes BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, setup, punchline) "
+    f"VALUES ('delete', old.id, old.setup, old.punchline); "
+    f"INSERT INTO {FTS_TABLE}(rowid, setup, punchline) VALUES (new.id, new.setup, new.punchline); END",
+]
+
+
+def hash_setup(setup: str) -> str:
+    """Hex SHA-256 of a joke's setup, used to find repeats through an index"""
+    return hashlib.sha256(setup.encode("utf-8")).hexdigest()
+
 
 class Joke(Base):
     """Joke model for caching jokes"""
     
     __tablename__ = "jokes"
+    __table_args__ = (
+        # Supports keyset pagination ordered by (created_at, id)
+        Index("ix_jokes_created_at_id", "created_at", "id"),
+        # Full-text search on Postgres; must match search_document()
+        Index(
+            "ix_jokes_search",
+            text(f"to_tsvector('{SEARCH_CONFIG}', setup || ' ' || punchline)"),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     setup = Column(Text, nullable=False)
     punchline = Column(Text, nullable=False)
+    # setup is unbounded text, so repeats are looked up by its hash
+    setup_hash = Column(
+        String(64),
+        index=True,
+        default=lambda context: hash_setup(context.get_current_parameters()["setup"]),
+    )
     joke_type = Column(String, nullable=True)
     source = Column(String, default="official-joke-api")
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Also set client-side so keyset cursors round-trip the exact stored value
+    created_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+    )
     
     def __repr__(self):
         return f"<Joke(id={self.id}, type={self.joke_type})>"
+
+
+def search_document():
+    """
+    The tsvector Postgres searches, matching the ix_jokes_search expression
+
+    The configuration and separator are inlined rather than bound so the
+    planner can match the expression against the index.
+    """
+    columns = Joke.__table__.c
+    document = columns.setup + literal_column("' '") + columns.punchline
+    return func.to_tsvector(literal_column(f"'{SEARCH_CONFIG}'"), document)
+
+
+for _statement in SQLITE_FTS_DDL:
+    event.listen(Joke.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    Joke.__table__, "before_drop", DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}").execute_if(dialect="sqlite")
+)
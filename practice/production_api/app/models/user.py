@@ -1,8 +1,8 @@
 """
 User model for authentication and user management
 """
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from datetime import datetime, timezone
+from sqlalchemy import Column, Index, Integer, String, Boolean, DateTime
 from sqlalchemy.sql import func
 from app.db.session import Base
 
@@ -11,6 +11,10 @@ class User(Base):
     """User model for authentication"""
     
     __tablename__ = "users"
+    __table_args__ = (
+        # Supports keyset pagination ordered by (created_at, id)
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -19,8 +23,14 @@ class User(Base):
     full_name = Column(String)
     is_active = Column(Boolean, default=True)
     is_superuser = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Also set client-side so keyset cursors round-trip the exact stored value
+    created_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+    )
+    # Client-side for microsecond precision; it is the source of the user's ETag
+    updated_at = Column(DateTime(timezone=True), onupdate=lambda: datetime.now(timezone.utc))
     
     def __repr__(self):
         return f"<User(id={self.id}, username={self.username}, email={self.email})>"
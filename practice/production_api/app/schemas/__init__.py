@@ -5,6 +5,9 @@ from app.schemas.user import (
     UserUpdate,
     UserInDB,
     UserResponse,
+    UserImportRow,
+    UserImportError,
+    UserImportReport,
     Token,
     TokenData,
     LoginRequest,
@@ -29,6 +32,9 @@ __all__ = [
     "UserUpdate",
     "UserInDB",
     "UserResponse",
+    "UserImportRow",
+    "UserImportError",
+    "UserImportReport",
     "Token",
     "TokenData",
     "LoginRequest",
@@ -1,7 +1,7 @@
 """
 Common schemas for API responses and error handling
 """
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, List
 from pydantic import BaseModel
 
 
@@ -14,6 +14,13 @@ class HealthCheck(BaseModel):
     redis: str = "ok"
 
 
+class ReadinessCheck(BaseModel):
+    """Schema for readiness probe response"""
+    status: str
+    checks: Dict[str, Dict[str, Any]]
+    pool: Dict[str, Any]
+
+
 class ErrorResponse(BaseModel):
     """Schema for error responses"""
     detail: str
@@ -36,7 +43,14 @@ class PaginationParams(BaseModel):
 class PaginatedResponse(BaseModel):
     """Schema for paginated responses"""
     items: list
-    total: int
-    skip: int
+    total: Optional[int] = None
+    skip: int = 0
     limit: int
     has_more: bool
+    next_cursor: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    """Schema for batch lookups: one item per requested ID, in request order"""
+    items: list  # null where the ID was not found
+    missing: List[int]
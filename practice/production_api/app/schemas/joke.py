@@ -5,6 +5,8 @@ from typing import Optional
 from datetime import datetime
 from pydantic import BaseModel, Field, ConfigDict
 
+from app.schemas.common import PaginatedResponse
+
 
 class JokeBase(BaseModel):
     """Base joke schema"""
@@ -32,3 +34,13 @@ class JokeSimpleResponse(BaseModel):
     setup: str
     punchline: str
     type: Optional[str] = None
+
+
+class JokeSearchResult(JokeResponse):
+    """Schema for a joke matched by full-text search"""
+    rank: float  # higher is a better match
+
+
+class JokeSearchPage(PaginatedResponse):
+    """Schema for a page of search results"""
+    truncated: bool = False  # more matches than SEARCH_RANK_WINDOW; only the newest were ranked
@@ -2,9 +2,9 @@
 Pydantic schemas for request/response validation
 User-related schemas for authentication and user management
 """
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, model_validator
 
 
 # User Schemas
@@ -48,6 +48,39 @@ class UserResponse(UserBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+# Bulk Import Schemas
+class UserImportRow(UserBase):
+    """
+    One user in a bulk import
+    
+    Either a plain password (hashed during import) or an existing bcrypt
+    hash (e.g. migrated from another system) must be given.
+    """
+    password: Optional[str] = Field(None, min_length=8, max_length=100)
+    hashed_password: Optional[str] = Field(None, pattern=r"^\$2[abxy]?\$\d{2}\$[./A-Za-z0-9]{53}$")
+    
+    @model_validator(mode="after")
+    def check_password(self) -> "UserImportRow":
+        if (self.password is None) == (self.hashed_password is None):
+            raise ValueError("Exactly one of password or hashed_password is required")
+        return self
+
+
+class UserImportError(BaseModel):
+    """A row that was not imported"""
+    row: int
+    error: str
+
+
+class UserImportReport(BaseModel):
+    """Result of a bulk user import"""
+    created: int = 0
+    skipped: int = 0
+    failed: int = 0
+    errors: List[UserImportError] = []
+    errors_truncated: bool = False
+
+
 # Authentication Schemas
 class Token(BaseModel):
     """Schema for authentication token response"""
@@ -1,5 +1,6 @@
 """Services initialization"""
 from app.services.user_service import UserService
 from app.services.joke_service import JokeService
+from app.services.user_import import UserImportService
 
-__all__ = ["UserService", "JokeService"]
+__all__ = ["UserService", "JokeService", "UserImportService"]
@@ -0,0 +1,252 @@
+"""
+Two-tier cache for service-layer lookups
+A bounded in-process TTL LRU in front of Redis, shared by all workers
+
+Entries are Pydantic models, stored in Redis as JSON. Each tier refreshes
+entries probabilistically before they expire (XFetch: the closer to expiry
+and the slower the entry was to load, the likelier a lookup refreshes it),
+and concurrent misses for a key in one worker share a single load, so an
+expiring hot key does not send every request to the next tier at once.
+
+Invalidation drops the key from this worker's LRU and from Redis. Other
+workers keep their in-process copy until its TTL runs out, so ``local_ttl``
+bounds how stale a read can be after a write. Redis entries that no longer
+match the model (e.g. after a deploy changed it) are treated as misses.
+"""
+import functools
+import math
+import random
+import time
+from collections import OrderedDict
+from typing import (
+    Any, Awaitable, Callable, Generic, Hashable, Optional, Tuple, Type, TypeVar,
+)
+from pydantic import BaseModel
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import SERVICE_CACHE_EARLY_REFRESHES, SERVICE_CACHE_REQUESTS
+from app.core.singleflight import SingleFlight
+from app.db.redis import get_redis
+
+logger = get_logger(__name__)
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def should_refresh_early(delta: float, expires_at: float, beta: float) -> bool:
+    """
+    Decide whether a cached entry should be refreshed ahead of its expiry
+
+    Args:
+        delta: Seconds the entry took to load
+        expires_at: Unix time the entry expires
+        beta: Eagerness (0 disables early refresh, >1 refreshes earlier)
+
+    Returns:
+        True if this lookup should reload the entry
+    """
+    # 1 - random() is in (0, 1], so the log is always defined
+    return time.time() - delta * beta * math.log(1.0 - random.random()) >= expires_at
+
+
+class TwoTierCache(Generic[M]):
+    """
+    In-process TTL LRU over Redis for one kind of lookup
+
+    Cached values are shared between callers and must not be mutated.
+    Lookups that find nothing (None) are not cached.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model: Type[M],
+        ttl: float = settings.SERVICE_CACHE_TTL,
+        local_ttl: float = settings.SERVICE_CACHE_LOCAL_TTL,
+        local_max_size: int = settings.SERVICE_CACHE_LOCAL_SIZE,
+        beta: float = settings.SERVICE_CACHE_EARLY_REFRESH_BETA,
+        redis_getter: Callable[[], Optional[aioredis.Redis]] = get_redis,
+    ):
+        self.name = name
+        self.model = model
+        self.ttl = ttl
+        self.local_ttl = min(local_ttl, ttl)
+        self.local_max_size = local_max_size
+        self.beta = beta
+        self.redis_getter = redis_getter
+        self._local: "OrderedDict[Hashable, Tuple[M, float, float]]" = OrderedDict()
+        self._loads: SingleFlight[Optional[M]] = SingleFlight(f"cache:{name}")
+        # Bumped by every invalidation so loads that started before it are not stored
+        self._generation = 0
+
+    @staticmethod
+    def make_key(*key_parts: Any) -> str:
+        """Build the cache key ``cached`` uses for a lookup's arguments"""
+        return ":".join(str(part) for part in key_parts)
+
+    def redis_key(self, key: Hashable) -> str:
+        return f"cache:{self.name}:{key}"
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Optional[M]]]) -> Optional[M]:
+        """
+        Get a value, loading and caching it on a miss
+
+        Args:
+            key: Cache key
+            loader: Loads the value from the source of truth
+
+        Returns:
+            Cached or freshly loaded value (None if the loader found nothing)
+        """
+        if not settings.SERVICE_CACHE_ENABLED:
+            return await loader()
+
+        entry = self._local.get(key)
+        if entry is not None:
+            value, delta, expires_at = entry
+            if time.time() < expires_at and not self._refresh_early("local", delta, expires_at):
+                self._local.move_to_end(key)
+                SERVICE_CACHE_REQUESTS.labels(cache=self.name, tier="local", result="hit").inc()
+                return value
+        SERVICE_CACHE_REQUESTS.labels(cache=self.name, tier="local", result="miss").inc()
+
+        generation = self._generation
+        value, _ = await self._loads.do((key, generation), lambda: self._load(key, loader, generation))
+        return value
+
+    async def _load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Optional[M]]], generation: int
+    ) -> Optional[M]:
+        cached = await self._get_redis(key)
+        if cached is not None:
+            value, delta, expires_at = cached
+            if not self._refresh_early("redis", delta, expires_at):
+                SERVICE_CACHE_REQUESTS.labels(cache=self.name, tier="redis", result="hit").inc()
+                self._set_local(key, value, delta, expires_at, generation)
+                return value
+        SERVICE_CACHE_REQUESTS.labels(cache=self.name, tier="redis", result="miss").inc()
+
+        start = time.perf_counter()
+        value = await loader()
+        delta = time.perf_counter() - start
+        if value is None or generation != self._generation:
+            return value
+
+        expires_at = time.time() + self.ttl
+        await self._set_redis(key, value, delta, expires_at)
+        self._set_local(key, value, delta, expires_at, generation)
+        return value
+
+    def _refresh_early(self, tier: str, delta: float, expires_at: float) -> bool:
+        if self.beta <= 0 or not should_refresh_early(delta, expires_at, self.beta):
+            return False
+        SERVICE_CACHE_EARLY_REFRESHES.labels(cache=self.name, tier=tier).inc()
+        return True
+
+    def _set_local(self, key: Hashable, value: M, delta: float, expires_at: float, generation: int) -> None:
+        if self.local_max_size <= 0 or generation != self._generation:
+            return
+        self._local[key] = (value, delta, min(expires_at, time.time() + self.local_ttl))
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_max_size:
+            self._local.popitem(last=False)
+
+    async def _get_redis(self, key: Hashable) -> Optional[Tuple[M, float, float]]:
+        redis = self.redis_getter()
+        if redis is None:
+            return None
+        try:
+            raw = await redis.hmget(self.redis_key(key), "value", "delta", "expires_at")
+        except RedisError as e:
+            logger.warning("Service cache unavailable", cache=self.name, error=str(e))
+            return None
+        if raw[0] is None:
+            return None
+        try:
+            return self.model.model_validate_json(raw[0]), float(raw[1]), float(raw[2])
+        except (TypeError, ValueError) as e:
+            # Written by a different version of the model (ValidationError is a ValueError)
+            logger.warning("Discarding unreadable service cache entry", cache=self.name, error=str(e))
+            try:
+                await redis.delete(self.redis_key(key))
+            except RedisError:
+                pass
+            return None
+
+    async def _set_redis(self, key: Hashable, value: M, delta: float, expires_at: float) -> None:
+        redis = self.redis_getter()
+        if redis is None:
+            return
+        redis_key = self.redis_key(key)
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.hset(redis_key, mapping={
+                    "value": value.model_dump_json(),
+                    "delta": delta,
+                    "expires_at": expires_at,
+                })
+                pipe.expire(redis_key, math.ceil(self.ttl))
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Failed to store service cache entry", cache=self.name, error=str(e))
+
+    async def invalidate(self, *key_parts: Any) -> None:
+        """
+        Drop a key from this worker's LRU and from Redis
+
+        Call after committing a change to the underlying row.
+
+        Args:
+            *key_parts: The lookup's arguments after the session, as passed to ``cached``
+        """
+        key = self.make_key(*key_parts)
+        self._generation += 1
+        self._local.pop(key, None)
+        redis = self.redis_getter()
+        if redis is None:
+            return
+        try:
+            await redis.delete(self.redis_key(key))
+        except RedisError as e:
+            logger.warning("Failed to invalidate service cache entry", cache=self.name, error=str(e))
+
+    def clear(self) -> None:
+        """Drop all in-process entries (Redis entries expire on their own)"""
+        self._generation += 1
+        self._local.clear()
+
+    def __len__(self) -> int:
+        return len(self._local)
+
+    def cached(
+        self, fn: Callable[..., Awaitable[Optional[M]]]
+    ) -> Callable[..., Awaitable[Optional[M]]]:
+        """
+        Decorate a service lookup ``fn(db, *key_parts)`` to go through this cache
+
+        The database session is not part of the key; the remaining positional
+        arguments are joined with ":" to form it. A load is shared with other
+        callers and outlives a caller that goes away, so it runs on its own
+        short-lived session bound to the caller's engine rather than on the
+        caller's session, which is closed when that caller's request ends.
+        """
+        @functools.wraps(fn)
+        async def wrapper(db: Any, *key_parts: Any) -> Optional[M]:
+            async def load() -> Optional[M]:
+                if not isinstance(db, AsyncSession) or db.bind is None:
+                    return await fn(db, *key_parts)
+                async with AsyncSession(
+                    db.bind,
+                    sync_session_class=type(db.sync_session),
+                    expire_on_commit=False,
+                    autoflush=False,
+                ) as session:
+                    return await fn(session, *key_parts)
+
+            return await self.get(self.make_key(*key_parts), load)
+
+        return wrapper
@@ -0,0 +1,126 @@
+"""
+Redis-backed pool of jokes for the random joke hot path
+The pool is refilled from the database and expires after REDIS_CACHE_TTL
+
+A second list holds fresh jokes fetched by the background warmer. Each is
+served once to use_cache=false requests, in place of an inline API call.
+"""
+from typing import List, Optional
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.models.joke import Joke
+from app.schemas.joke import JokeSimpleResponse
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class JokePool:
+    """Random joke pool stored as a Redis set"""
+
+    KEY = "jokes:pool"
+    FRESH_KEY = "jokes:fresh"
+
+    @staticmethod
+    async def get_random_joke(redis: aioredis.Redis) -> Optional[JokeSimpleResponse]:
+        """
+        Get a random joke from the pool
+
+        Args:
+            redis: Redis client
+
+        Returns:
+            Random joke, or None if the pool is empty or Redis is unavailable
+        """
+        try:
+            raw = await redis.srandmember(JokePool.KEY)
+        except RedisError as e:
+            logger.warning("Joke pool unavailable", error=str(e))
+            return None
+
+        if raw is None:
+            return None
+        return JokeSimpleResponse.model_validate_json(raw)
+
+    @staticmethod
+    async def refill(redis: aioredis.Redis, jokes: List[Joke]) -> bool:
+        """
+        Replace the pool contents with the given jokes
+
+        Args:
+            redis: Redis client
+            jokes: Jokes to load into the pool
+
+        Returns:
+            True if the pool was refilled, False if Redis is unavailable
+        """
+        if not jokes:
+            return False
+
+        members = [
+            JokeSimpleResponse(
+                setup=joke.setup,
+                punchline=joke.punchline,
+                type=joke.joke_type
+            ).model_dump_json()
+            for joke in jokes
+        ]
+
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.delete(JokePool.KEY)
+                pipe.sadd(JokePool.KEY, *members)
+                pipe.expire(JokePool.KEY, settings.REDIS_CACHE_TTL)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Failed to refill joke pool", error=str(e))
+            return False
+
+        logger.info("Joke pool refilled", size=len(members))
+        return True
+
+    @staticmethod
+    async def pop_fresh(redis: aioredis.Redis) -> Optional[JokeSimpleResponse]:
+        """
+        Take one fresh joke off the list
+
+        Args:
+            redis: Redis client
+
+        Returns:
+            Fresh joke, or None if none are left or Redis is unavailable
+        """
+        try:
+            raw = await redis.lpop(JokePool.FRESH_KEY)
+        except RedisError as e:
+            logger.warning("Fresh joke list unavailable", error=str(e))
+            return None
+
+        if raw is None:
+            return None
+        return JokeSimpleResponse.model_validate_json(raw)
+
+    @staticmethod
+    async def fresh_count(redis: aioredis.Redis) -> int:
+        """Number of fresh jokes waiting to be served"""
+        return await redis.llen(JokePool.FRESH_KEY)
+
+    @staticmethod
+    async def push_fresh(redis: aioredis.Redis, jokes: List[JokeSimpleResponse]) -> None:
+        """
+        Append fresh jokes, keeping at most JOKE_WARMER_TARGET
+
+        Args:
+            redis: Redis client
+            jokes: Jokes just fetched from the external API
+        """
+        if not jokes:
+            return
+
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(JokePool.FRESH_KEY, *(joke.model_dump_json() for joke in jokes))
+            pipe.ltrim(JokePool.FRESH_KEY, -settings.JOKE_WARMER_TARGET, -1)
+            pipe.expire(JokePool.FRESH_KEY, settings.JOKE_FRESH_TTL)
+            await pipe.execute()
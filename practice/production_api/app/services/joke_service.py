@@ -2,54 +2,226 @@
 Joke service for fetching and managing jokes
 Implements caching and external API integration
 """
-from typing import Optional, List
+import asyncio
+import math
+import random
+import re
+import time
+from datetime import datetime
+from typing import Optional, List, Sequence, Set, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, literal_column, table
 import httpx
+from redis import asyncio as aioredis
 from fastapi import HTTPException, status
 
-from app.models.joke import Joke
-from app.schemas.joke import JokeCreate, JokeSimpleResponse
+from app.models.joke import FTS_TABLE, SEARCH_CONFIG, Joke, search_document
+from app.schemas.joke import JokeCreate, JokeResponse, JokeSimpleResponse
+from app.services.cache import TwoTierCache
+from app.services.joke_pool import JokePool
+from app.services.pagination import paginate_keyset
 from app.core.config import settings
+from app.core.http_client import get_http_client
+from app.core.metrics import EXTERNAL_API_DURATION
+from app.core.circuit_breaker import CLOSED, CircuitBreaker, CircuitOpenError
+from app.core.singleflight import SingleFlight
+from app.db.loader import get_by_ids, session_loader
+from app.db.session import AsyncSessionLocal
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
 
+# Concurrent upstream fetches in this worker share one request
+joke_api_flights: SingleFlight[JokeSimpleResponse] = SingleFlight("joke_api")
+
+# Stops calling the joke API while it is failing or slower than JOKE_API_TIMEOUT
+joke_api_breaker = CircuitBreaker(
+    "joke_api",
+    failure_threshold=settings.JOKE_API_BREAKER_FAILURES,
+    reset_timeout=settings.JOKE_API_BREAKER_RESET,
+    failure_exceptions=(HTTPException,),
+)
+
+# Stored jokes never change, so both tiers keep them for the full TTL
+joke_cache: TwoTierCache[JokeResponse] = TwoTierCache(
+    "joke", JokeResponse, local_ttl=settings.SERVICE_CACHE_TTL
+)
+
+# Ignored in search queries, as the Postgres "english" configuration does
+SEARCH_STOPWORDS = frozenset(
+    "a an and are as at be but by for from had has have he her his i if in into is it its me my "
+    "no not of on or our she so than that the their them then there these they this to was we "
+    "were what when where which who why will with you your".split()
+)
+
+# Background refresh started while the breaker is open (at most one per worker)
+_refresh_tasks: Set[asyncio.Task] = set()
+
+
 class JokeService:
     """Service for joke-related operations"""
     
     @staticmethod
-    async def fetch_joke_from_api() -> JokeSimpleResponse:
+    async def fetch_joke_from_api(
+        http_client: Optional[httpx.AsyncClient] = None
+    ) -> JokeSimpleResponse:
         """
         Fetch a random joke from external API
         
+        Requests taking longer than JOKE_API_TIMEOUT are abandoned and
+        reported as failures.
+        
+        Args:
+            http_client: HTTP client to use (defaults to the shared pooled client)
+        
         Returns:
             JokeSimpleResponse with joke data
             
         Raises:
             HTTPException: If API request fails
         """
+        client = http_client or get_http_client()
+        start_time = time.perf_counter()
         try:
-            async with httpx.AsyncClient(timeout=settings.API_TIMEOUT) as client:
-                response = await client.get(f"{settings.JOKE_API_URL}/random_joke")
-                response.raise_for_status()
-                
-                joke_data = response.json()
-                logger.info("Joke fetched from API", joke_id=joke_data.get("id"))
-                
-                return JokeSimpleResponse(
-                    setup=joke_data["setup"],
-                    punchline=joke_data["punchline"],
-                    type=joke_data.get("type")
-                )
-        except httpx.HTTPError as e:
-            logger.error("Failed to fetch joke from API", error=str(e))
+            response = await asyncio.wait_for(
+                client.get(f"{settings.JOKE_API_URL}/random_joke"), settings.JOKE_API_TIMEOUT
+            )
+            response.raise_for_status()
+            
+            joke_data = response.json()
+            logger.info("Joke fetched from API", joke_id=joke_data.get("id"))
+            EXTERNAL_API_DURATION.labels(service="joke_api", outcome="success").observe(
+                time.perf_counter() - start_time
+            )
+            
+            return JokeSimpleResponse(
+                setup=joke_data["setup"],
+                punchline=joke_data["punchline"],
+                type=joke_data.get("type")
+            )
+        except (httpx.HTTPError, asyncio.TimeoutError) as e:
+            EXTERNAL_API_DURATION.labels(service="joke_api", outcome="error").observe(
+                time.perf_counter() - start_time
+            )
+            logger.error("Failed to fetch joke from API", error=str(e) or type(e).__name__)
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="Could not fetch joke from external service"
             )
     
+    @staticmethod
+    async def fetch_joke_guarded(
+        http_client: Optional[httpx.AsyncClient] = None
+    ) -> Tuple[JokeSimpleResponse, bool]:
+        """
+        Fetch a random joke through the circuit breaker and single-flight
+        
+        Callers arriving while a fetch is in flight share its joke (or its
+        error) instead of calling upstream themselves.
+        
+        Args:
+            http_client: HTTP client to use (defaults to the shared pooled client)
+        
+        Returns:
+            Tuple of (joke, shared), where shared is True if another caller
+            made the request (and is responsible for saving the joke)
+            
+        Raises:
+            CircuitOpenError: If the breaker is open
+            HTTPException: If API request fails
+        """
+        return await joke_api_flights.do(
+            "random_joke",
+            lambda: joke_api_breaker.call(lambda: JokeService.fetch_joke_from_api(http_client)),
+        )
+    
+    @staticmethod
+    async def refresh_from_api(http_client: Optional[httpx.AsyncClient] = None) -> None:
+        """
+        Fetch a joke and save it with a session of its own
+        
+        Runs in the background while the breaker is open; when the breaker
+        is half-open this is the probe that closes or reopens it. Failures
+        are left to the breaker and never raised.
+        
+        Args:
+            http_client: HTTP client to use (defaults to the shared pooled client)
+        """
+        try:
+            joke, shared = await JokeService.fetch_joke_guarded(http_client)
+        except (CircuitOpenError, HTTPException):
+            return
+        if shared:
+            return
+        
+        try:
+            async with AsyncSessionLocal() as db:
+                await JokeService.save_joke(db, joke)
+        except Exception as e:
+            logger.warning("Failed to cache joke", error=str(e))
+    
+    @staticmethod
+    def refresh_in_background(http_client: Optional[httpx.AsyncClient] = None) -> None:
+        """
+        Start refresh_from_api unless a background refresh is already running
+        
+        Args:
+            http_client: HTTP client to use (defaults to the shared pooled client)
+        """
+        if _refresh_tasks:
+            return
+        task = asyncio.get_running_loop().create_task(JokeService.refresh_from_api(http_client))
+        _refresh_tasks.add(task)
+        task.add_done_callback(_refresh_tasks.discard)
+    
+    @staticmethod
+    async def get_stale_joke(
+        db: AsyncSession,
+        redis: Optional[aioredis.Redis] = None,
+        http_client: Optional[httpx.AsyncClient] = None
+    ) -> JokeSimpleResponse:
+        """
+        Serve a cached joke while the joke API breaker is open
+        
+        Returns right away from the Redis pool or the database cache and
+        refreshes from the API in the background.
+        
+        Args:
+            db: Database session
+            redis: Optional Redis client for the joke pool
+            http_client: Optional HTTP client for the background refresh
+            
+        Returns:
+            JokeSimpleResponse
+            
+        Raises:
+            HTTPException: If nothing is cached yet
+        """
+        JokeService.refresh_in_background(http_client)
+        
+        if redis is not None:
+            pooled_joke = await JokePool.get_random_joke(redis)
+            if pooled_joke:
+                logger.info("Joke API unavailable, returning pooled joke")
+                return pooled_joke
+        
+        cached_joke = await JokeService.get_random_cached_joke(db)
+        if cached_joke:
+            logger.info("Joke API unavailable, returning cached joke", joke_id=cached_joke.id)
+            return JokeSimpleResponse(
+                setup=cached_joke.setup,
+                punchline=cached_joke.punchline,
+                type=cached_joke.joke_type
+            )
+        
+        retry_after = max(1, math.ceil(joke_api_breaker.retry_after()))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Could not fetch joke from external service",
+            headers={"Retry-After": str(retry_after)},
+        )
+    
     @staticmethod
     async def save_joke(db: AsyncSession, joke_data: JokeSimpleResponse) -> Joke:
         """
@@ -76,36 +248,149 @@ class JokeService:
         logger.info("Joke saved to database", joke_id=db_joke.id)
         return db_joke
     
+    @staticmethod
+    async def get_id_range(db: AsyncSession) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Get the smallest and largest cached joke IDs
+        
+        MIN and MAX are separate subqueries so both Postgres and SQLite
+        answer them from the primary key index in constant time.
+        
+        Args:
+            db: Database session
+            
+        Returns:
+            Tuple of (min_id, max_id), both None if cache is empty
+        """
+        result = await db.execute(select(
+            select(func.min(Joke.id)).scalar_subquery(),
+            select(func.max(Joke.id)).scalar_subquery(),
+        ))
+        return tuple(result.one())
+    
     @staticmethod
     async def get_random_cached_joke(db: AsyncSession) -> Optional[Joke]:
         """
         Get a random joke from the database cache
         
+        Picks a random ID in the cached ID range and returns the first joke
+        at or after it, avoiding an ORDER BY random() scan of the table.
+        Jokes that follow a gap in the IDs are slightly more likely to be picked.
+        
         Args:
             db: Database session
             
         Returns:
             Random joke or None if cache is empty
         """
+        min_id, max_id = await JokeService.get_id_range(db)
+        if min_id is None:
+            return None
+        
+        target_id = random.randint(min_id, max_id)
         result = await db.execute(
-            select(Joke).order_by(func.random()).limit(1)
+            select(Joke).where(Joke.id >= target_id).order_by(Joke.id).limit(1)
         )
         return result.scalar_one_or_none()
     
     @staticmethod
-    async def get_joke(db: AsyncSession, use_cache: bool = True) -> JokeSimpleResponse:
+    async def get_random_cached_jokes(db: AsyncSession, limit: int) -> List[Joke]:
+        """
+        Get a random sample of jokes from the database cache
+        
+        Samples random IDs from the cached ID range and loads them with a
+        single primary key lookup. IDs that fall into gaps are skipped, so
+        fewer than ``limit`` jokes may be returned.
+        
+        Args:
+            db: Database session
+            limit: Maximum number of jokes to return
+            
+        Returns:
+            List of random jokes (empty if cache is empty)
+        """
+        min_id, max_id = await JokeService.get_id_range(db)
+        if min_id is None:
+            return []
+        
+        id_range = range(min_id, max_id + 1)
+        if len(id_range) <= limit:
+            result = await db.execute(select(Joke))
+            return result.scalars().all()
+        
+        sample_ids = random.sample(id_range, limit)
+        result = await db.execute(select(Joke).where(Joke.id.in_(sample_ids)))
+        jokes = result.scalars().all()
+        if jokes:
+            return jokes
+        
+        # Very sparse IDs: fall back to a single random joke
+        joke = await JokeService.get_random_cached_joke(db)
+        return [joke] if joke else []
+    
+    @staticmethod
+    async def get_joke(
+        db: AsyncSession,
+        use_cache: bool = True,
+        redis: Optional[aioredis.Redis] = None,
+        http_client: Optional[httpx.AsyncClient] = None
+    ) -> JokeSimpleResponse:
         """
         Get a joke, using cache if available and requested
         
+        The Redis joke pool is read first; on a miss it is refilled from the
+        database. Without Redis the database cache is used directly.
+        
+        Concurrent calls that reach the external API share a single upstream
+        request, so they may receive the same joke; only the first saves it.
+        While the joke API circuit breaker is not closed, a cached joke is
+        returned instead (even for use_cache=false) and the API is retried
+        in the background.
+        
+        With JOKE_WARMER_ENABLED the external API is never called here:
+        use_cache=false takes a joke from the fresh list the background
+        warmer keeps filled, and an empty cache asks the warmer for a refill
+        and returns 503.
+        
         Args:
             db: Database session
             use_cache: Whether to try cache first
+            redis: Optional Redis client for the joke pool
+            http_client: Optional HTTP client for the external API
             
         Returns:
             JokeSimpleResponse
+            
+        Raises:
+            HTTPException: If no joke is available
         """
+        warmer_enabled = settings.JOKE_WARMER_ENABLED
+        if warmer_enabled and not use_cache:
+            fresh_joke = await JokePool.pop_fresh(redis) if redis is not None else None
+            if fresh_joke:
+                logger.info("Returning fresh joke")
+                return fresh_joke
+            # Out of fresh jokes: serve a cached one while the warmer catches up
+            use_cache = True
+        
         # Try cache first if enabled
-        if use_cache:
+        if use_cache and redis is not None:
+            pooled_joke = await JokePool.get_random_joke(redis)
+            if pooled_joke:
+                logger.info("Returning pooled joke")
+                return pooled_joke
+            
+            jokes = await JokeService.get_random_cached_jokes(db, settings.JOKE_POOL_SIZE)
+            if jokes:
+                await JokePool.refill(redis, jokes)
+                cached_joke = random.choice(jokes)
+                logger.info("Returning cached joke", joke_id=cached_joke.id)
+                return JokeSimpleResponse(
+                    setup=cached_joke.setup,
+                    punchline=cached_joke.punchline,
+                    type=cached_joke.joke_type
+                )
+        elif use_cache:
             cached_joke = await JokeService.get_random_cached_joke(db)
             if cached_joke:
                 logger.info("Returning cached joke", joke_id=cached_joke.id)
@@ -115,8 +400,27 @@ class JokeService:
                     type=cached_joke.joke_type
                 )
         
-        # Fetch from API
-        joke = await JokeService.fetch_joke_from_api()
+        if warmer_enabled:
+            # Imported here: the warmer module builds on this service
+            from app.services.joke_warmer import JokeWarmer
+            await JokeWarmer.request_refill(redis)
+            # The cache lookup above already came back empty
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="No jokes cached yet, please retry",
+                headers={"Retry-After": "5"},
+            )
+        
+        # Stale-while-revalidate: don't wait on an upstream that is failing
+        if joke_api_breaker.state != CLOSED:
+            return await JokeService.get_stale_joke(db, redis, http_client)
+        
+        try:
+            joke, shared = await JokeService.fetch_joke_guarded(http_client)
+        except CircuitOpenError:
+            return await JokeService.get_stale_joke(db, redis, http_client)
+        if shared:
+            return joke
         
         # Save to cache (fire and forget)
         try:
@@ -148,11 +452,127 @@ class JokeService:
         )
         return result.scalars().all()
     
+    @staticmethod
+    async def get_jokes_page(
+        db: AsyncSession,
+        cursor: str = "",
+        limit: int = 100
+    ) -> Tuple[List[Joke], Optional[str]]:
+        """
+        Get a page of cached jokes using keyset pagination
+        
+        Args:
+            db: Database session
+            cursor: Cursor from the previous page ("" for the first page)
+            limit: Maximum number of records to return
+            
+        Returns:
+            Tuple of (jokes, next_cursor)
+        """
+        return await paginate_keyset(db, Joke, cursor, limit)
+    
+    @staticmethod
+    async def search_jokes(
+        db: AsyncSession,
+        query: str,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Tuple[list, bool, bool]:
+        """
+        Full-text search over cached jokes, best matches first
+        
+        Every word in ``query`` other than a stopword must match (stemmed,
+        case-insensitive). On Postgres this uses the ix_jokes_search GIN index
+        and ts_rank_cd; on SQLite the jokes_fts FTS5 table and bm25.
+        
+        Ranking costs time for every match, so at most SEARCH_RANK_WINDOW
+        matches are ranked: when a query matches more jokes than that, only the
+        newest SEARCH_RANK_WINDOW are ranked and paged through, and the result
+        is flagged as truncated.
+        
+        Args:
+            db: Database session
+            query: Words to search for; punctuation and operators are ignored
+            skip: Number of results to skip
+            limit: Maximum number of results to return
+            
+        Returns:
+            Tuple of (rows with the Joke columns and ``rank``, has_more, truncated)
+        """
+        words = [word for word in re.findall(r"\w+", query) if word.lower() not in SEARCH_STOPWORDS]
+        if not words:
+            return [], False, False
+        
+        columns = Joke.__table__.c
+        window = settings.SEARCH_RANK_WINDOW
+        if db.get_bind().dialect.name == "postgresql":
+            document = search_document()
+            tsquery = func.plainto_tsquery(literal_column(f"'{SEARCH_CONFIG}'"), " ".join(words))
+            match_id = columns.id
+            rank = func.ts_rank_cd(document, tsquery)
+            matches = select(match_id).where(document.op("@@")(tsquery))
+        else:
+            match_id = literal_column(f"{FTS_TABLE}.rowid")
+            rank = -func.bm25(literal_column(FTS_TABLE))
+            # Quoting each word keeps FTS5 query syntax (AND, NEAR, *, ...) out of user input
+            match = " ".join(f'"{word}"' for word in words)
+            matches = (
+                select(match_id.label("id"))
+                .select_from(table(FTS_TABLE))
+                .where(literal_column(FTS_TABLE).op("MATCH")(match))
+            )
+        
+        # Finding a match past the window is cheap: nothing is ranked or sorted
+        overflow = matches.offset(window).limit(1)
+        candidates = (
+            matches.add_columns(rank.label("rank"))
+            .order_by(match_id.desc())
+            .limit(window)
+            .subquery()
+        )
+        # One extra row tells whether there is a next page without counting matches
+        result = await db.execute(
+            select(*columns, candidates.c.rank, overflow.exists().label("truncated"))
+            .join(candidates, columns.id == candidates.c.id)
+            .order_by(candidates.c.rank.desc(), columns.id.desc())
+            .offset(skip)
+            .limit(limit + 1)
+        )
+        rows = result.all()
+        if rows:
+            truncated = rows[0].truncated
+        elif skip:
+            # Paged past the end: ask separately whether the window cut anything off
+            truncated = (await db.execute(overflow)).first() is not None
+        else:
+            truncated = False
+        return rows[:limit], len(rows) > limit, bool(truncated)
+    
+    @staticmethod
+    async def get_joke_created_at(db: AsyncSession, joke_id: int) -> Optional[datetime]:
+        """
+        Get a joke's creation time without loading the row
+        
+        Jokes never change once stored, so this is all a conditional GET needs.
+        
+        Args:
+            db: Database session
+            joke_id: Joke ID
+            
+        Returns:
+            Creation time, or None if not found
+        """
+        result = await db.execute(select(Joke.created_at).where(Joke.id == joke_id))
+        return result.scalar_one_or_none()
+    
     @staticmethod
     async def get_joke_by_id(db: AsyncSession, joke_id: int) -> Optional[Joke]:
         """
         Get a specific joke by ID
         
+        Lookups made on the same session in the same event-loop tick are
+        resolved together with one query.
+        
         Args:
             db: Database session
             joke_id: Joke ID
@@ -160,5 +580,34 @@ class JokeService:
         Returns:
             Joke or None if not found
         """
-        result = await db.execute(select(Joke).where(Joke.id == joke_id))
-        return result.scalar_one_or_none()
+        return await session_loader(db, "joke", JokeService.get_jokes_by_ids).load(joke_id)
+    
+    @staticmethod
+    async def get_jokes_by_ids(db: AsyncSession, joke_ids: Sequence[int]) -> List[Optional[Joke]]:
+        """
+        Get several jokes by ID with at most one IN query
+        
+        Args:
+            db: Database session
+            joke_ids: Joke IDs (duplicates allowed)
+            
+        Returns:
+            The joke for each ID, in the same order, None where not found
+        """
+        return await get_by_ids(db, Joke, joke_ids)
+    
+    @staticmethod
+    @joke_cache.cached
+    async def get_joke_response(db: AsyncSession, joke_id: int) -> Optional[JokeResponse]:
+        """
+        Get a specific joke by ID through the two-tier cache
+        
+        Args:
+            db: Database session
+            joke_id: Joke ID
+            
+        Returns:
+            Joke or None if not found
+        """
+        joke = await JokeService.get_joke_by_id(db, joke_id)
+        return JokeResponse.model_validate(joke) if joke else None
@@ -0,0 +1,124 @@
+"""
+Background joke cache warmer
+Keeps JOKE_WARMER_TARGET fresh jokes ready in Redis so request handlers
+never have to call the external joke API themselves
+
+The warmer runs as a Celery task (see app.worker). Request handlers only
+ask for a refill; they never wait for it.
+"""
+import asyncio
+from typing import Optional
+import httpx
+from fastapi import HTTPException
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.joke import Joke, hash_setup
+from app.services.joke_pool import JokePool
+from app.services.joke_service import JokeService
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def _enqueue_refill() -> None:
+    """Publish a refill task (runs on a thread; publishing is blocking I/O)"""
+    try:
+        from app.worker import warm_joke_cache
+        warm_joke_cache.apply_async(kwargs={"jitter": False}, retry=False)
+    except Exception as e:
+        logger.warning("Failed to enqueue joke cache refill", error=str(e))
+
+
+class JokeWarmer:
+    """Keeps the fresh joke list and the random joke pool filled"""
+
+    REQUEST_KEY = "jokes:warmer:requested"
+
+    @staticmethod
+    async def warm(
+        db: AsyncSession,
+        redis: aioredis.Redis,
+        http_client: Optional[httpx.AsyncClient] = None
+    ) -> int:
+        """
+        Top up the fresh joke list and refill the random joke pool
+
+        Fetches at most JOKE_WARMER_MAX_FETCHES jokes, spaced to stay under
+        JOKE_API_RATE_LIMIT requests per second, and stops at the first
+        upstream error (including 429) until the next run.
+
+        Args:
+            db: Database session
+            redis: Redis client
+            http_client: HTTP client for the external API
+
+        Returns:
+            Number of jokes fetched from the external API
+        """
+        missing = settings.JOKE_WARMER_TARGET - await JokePool.fresh_count(redis)
+        fetches = min(max(missing, 0), settings.JOKE_WARMER_MAX_FETCHES)
+        delay = 1 / settings.JOKE_API_RATE_LIMIT
+
+        fetched = []
+        for i in range(fetches):
+            if i:
+                await asyncio.sleep(delay)
+            try:
+                fetched.append(await JokeService.fetch_joke_from_api(http_client))
+            except HTTPException:
+                break
+
+        if fetched:
+            await JokePool.push_fresh(redis, fetched)
+
+            # Keep the database cache free of repeats (the upstream set is small)
+            hashes = {hash_setup(joke.setup) for joke in fetched}
+            known = set((await db.execute(
+                select(Joke.setup).where(Joke.setup_hash.in_(hashes))
+            )).scalars().all())
+            new_jokes = {joke.setup: joke for joke in fetched if joke.setup not in known}
+            db.add_all([
+                Joke(
+                    setup=joke.setup,
+                    punchline=joke.punchline,
+                    joke_type=joke.type,
+                    source="official-joke-api",
+                )
+                for joke in new_jokes.values()
+            ])
+            await db.commit()
+
+        jokes = await JokeService.get_random_cached_jokes(db, settings.JOKE_POOL_SIZE)
+        await JokePool.refill(redis, jokes)
+        await redis.delete(JokeWarmer.REQUEST_KEY)
+
+        logger.info("Joke cache warmed", fetched=len(fetched), pool_size=len(jokes))
+        return len(fetched)
+
+    @staticmethod
+    async def request_refill(redis: Optional[aioredis.Redis]) -> None:
+        """
+        Ask the worker for a refill without waiting for it
+
+        Requests are deduplicated through Redis, so a burst of cache misses
+        enqueues at most one task per JOKE_WARMER_INTERVAL.
+
+        Args:
+            redis: Redis client (no request is made without Redis)
+        """
+        if redis is None:
+            return
+        try:
+            requested = await redis.set(
+                JokeWarmer.REQUEST_KEY, 1, nx=True, ex=max(1, int(settings.JOKE_WARMER_INTERVAL))
+            )
+        except RedisError as e:
+            logger.warning("Failed to request joke cache refill", error=str(e))
+            return
+
+        if requested:
+            asyncio.get_running_loop().run_in_executor(None, _enqueue_refill)
@@ -0,0 +1,95 @@
+"""
+Keyset (cursor) pagination helpers
+Pages are ordered by (created_at, id) descending and addressed by an opaque cursor
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple, Type, TypeVar
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, tuple_
+from fastapi import HTTPException, status
+
+ModelT = TypeVar("ModelT")
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Encode a row position as an opaque cursor
+
+    Args:
+        created_at: Creation time of the last row on the page
+        row_id: ID of the last row on the page
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps([created_at.isoformat(), row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    """
+    Decode an opaque cursor
+
+    Args:
+        cursor: Cursor string; an empty string means the first page
+
+    Returns:
+        Tuple of (created_at, id), or None for the first page
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+async def paginate_keyset(
+    db: AsyncSession,
+    model: Type[ModelT],
+    cursor: str,
+    limit: int
+) -> Tuple[List[ModelT], Optional[str]]:
+    """
+    Fetch one page of rows after the given cursor
+
+    Uses a (created_at, id) row-value comparison so each page is an index
+    range scan, regardless of how deep it is.
+
+    Args:
+        db: Database session
+        model: Model class with created_at and id columns
+        cursor: Cursor from the previous page ("" for the first page)
+        limit: Maximum number of rows to return
+
+    Returns:
+        Tuple of (rows, next_cursor); next_cursor is None on the last page
+    """
+    query = select(model).order_by(model.created_at.desc(), model.id.desc())
+
+    position = decode_cursor(cursor)
+    if position is not None:
+        query = query.where(tuple_(model.created_at, model.id) < tuple_(*position))
+
+    # Fetch one extra row to know whether another page exists
+    result = await db.execute(query.limit(limit + 1))
+    rows = result.scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return rows, next_cursor
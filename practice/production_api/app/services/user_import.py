@@ -0,0 +1,255 @@
+"""
+Bulk user import
+Streams NDJSON or CSV rows, hashes passwords on a worker pool and inserts
+users in batches, skipping rows whose email or username already exists
+
+Memory use is bounded by the batch size and the number of errors kept in
+the report, not by the size of the upload.
+"""
+import asyncio
+import csv
+import json
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, List, Optional, Set, Tuple
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+from app.schemas.user import UserImportError, UserImportReport, UserImportRow
+from app.core.config import settings
+from app.core.security import PasswordHasher, get_password_hashes, import_password_hasher
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+
+class InvalidRow(Exception):
+    """A row that could not be parsed"""
+
+
+class UserImportService:
+    """Service for bulk user imports"""
+
+    @staticmethod
+    async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+        """
+        Split a byte stream into lines
+
+        Args:
+            chunks: Byte chunks (e.g. from Request.stream())
+
+        Yields:
+            Decoded lines without line endings
+        """
+        buffer = b""
+        async for chunk in chunks:
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                yield line.rstrip(b"\r").decode("utf-8-sig", errors="replace")
+        if buffer:
+            yield buffer.rstrip(b"\r").decode("utf-8-sig", errors="replace")
+
+    @staticmethod
+    async def iter_rows(
+        lines: AsyncIterator[str],
+        fmt: str
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        Parse lines into raw rows
+
+        CSV input needs a header line; quoted fields spanning several lines
+        are not supported. Blank lines are ignored.
+
+        Args:
+            lines: Input lines
+            fmt: "ndjson" or "csv"
+
+        Yields:
+            Tuple of (row number, dict or InvalidRow); rows are numbered from 1,
+            not counting the CSV header
+        """
+        header = None
+        row_number = 0
+        async for line in lines:
+            if not line.strip():
+                continue
+            if fmt == "csv" and header is None:
+                header = next(csv.reader([line]))
+                continue
+
+            row_number += 1
+            if fmt == "csv":
+                values = next(csv.reader([line]))
+                if len(values) != len(header):
+                    yield row_number, InvalidRow(f"Expected {len(header)} columns, got {len(values)}")
+                    continue
+                # Empty CSV cells mean "not given"
+                yield row_number, {k: v for k, v in zip(header, values) if v != ""}
+            else:
+                try:
+                    data = json.loads(line)
+                except ValueError as e:
+                    yield row_number, InvalidRow(f"Invalid JSON: {e}")
+                    continue
+                if not isinstance(data, dict):
+                    yield row_number, InvalidRow("Expected a JSON object")
+                    continue
+                yield row_number, data
+
+    @staticmethod
+    async def hash_passwords(
+        rows: List[UserImportRow],
+        hasher: PasswordHasher
+    ) -> None:
+        """
+        Fill in hashed_password for rows that carry a plain password
+
+        The passwords are split into one chunk per worker so the whole batch
+        is hashed in parallel with a handful of executor calls.
+        """
+        pending = [row for row in rows if row.hashed_password is None]
+        if not pending:
+            return
+
+        chunk_size = -(-len(pending) // hasher.workers)
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        results = await asyncio.gather(*(
+            hasher.run("import_hash", get_password_hashes, [row.password for row in chunk])
+            for chunk in chunks
+        ))
+        for chunk, hashes in zip(chunks, results):
+            for row, hashed in zip(chunk, hashes):
+                row.hashed_password = hashed
+
+    @staticmethod
+    async def insert_batch(
+        db: AsyncSession,
+        batch: List[Tuple[int, UserImportRow]]
+    ) -> List[int]:
+        """
+        Insert a batch of users with INSERT ... ON CONFLICT DO NOTHING
+
+        Args:
+            db: Database session
+            batch: Tuples of (row number, row with hashed_password set);
+                usernames must be unique within the batch
+
+        Returns:
+            Row numbers that were skipped because the email or username exists
+        """
+        dialect = db.get_bind().dialect.name
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        now = datetime.now(timezone.utc)
+        stmt = (
+            dialect_insert(User)
+            .values([
+                {
+                    "email": row.email,
+                    "username": row.username,
+                    "full_name": row.full_name,
+                    "hashed_password": row.hashed_password,
+                    "is_active": True,
+                    "is_superuser": False,
+                    "created_at": now,
+                }
+                for _, row in batch
+            ])
+            .on_conflict_do_nothing()
+            .returning(User.username)
+        )
+        inserted = set((await db.execute(stmt)).scalars().all())
+        await db.commit()
+        return [row_number for row_number, row in batch if row.username not in inserted]
+
+    @staticmethod
+    async def import_users(
+        db: AsyncSession,
+        rows: AsyncIterator[Tuple[int, Any]],
+        hasher: Optional[PasswordHasher] = None,
+        batch_size: Optional[int] = None,
+        max_errors: Optional[int] = None
+    ) -> UserImportReport:
+        """
+        Import users from parsed rows
+
+        Each batch is committed on its own, so a failure part way through
+        keeps the batches already imported.
+
+        Args:
+            db: Database session
+            rows: Rows from iter_rows
+            hasher: Executor for password hashing (defaults to the import pool)
+            batch_size: Users per INSERT statement (defaults to USER_IMPORT_BATCH_SIZE)
+            max_errors: Maximum number of per-row errors kept in the report
+                (defaults to USER_IMPORT_MAX_ERRORS)
+
+        Returns:
+            Import report with counts and per-row errors
+        """
+        hasher = hasher or import_password_hasher
+        batch_size = batch_size or settings.USER_IMPORT_BATCH_SIZE
+        max_errors = settings.USER_IMPORT_MAX_ERRORS if max_errors is None else max_errors
+        report = UserImportReport()
+
+        def add_error(row_number: int, error: str) -> None:
+            if len(report.errors) < max_errors:
+                report.errors.append(UserImportError(row=row_number, error=error))
+            else:
+                report.errors_truncated = True
+
+        async def flush(batch: List[Tuple[int, UserImportRow]]) -> None:
+            await UserImportService.hash_passwords([row for _, row in batch], hasher)
+            skipped = await UserImportService.insert_batch(db, batch)
+            report.created += len(batch) - len(skipped)
+            report.skipped += len(skipped)
+            for row_number in skipped:
+                add_error(row_number, "Email or username already exists")
+
+        batch: List[Tuple[int, UserImportRow]] = []
+        batch_keys: Set[str] = set()
+        async for row_number, data in rows:
+            if isinstance(data, InvalidRow):
+                report.failed += 1
+                add_error(row_number, str(data))
+                continue
+            try:
+                row = UserImportRow.model_validate(data)
+            except ValidationError as e:
+                report.failed += 1
+                add_error(row_number, "; ".join(
+                    f"{'.'.join(str(loc) for loc in err['loc']) or 'row'}: {err['msg']}"
+                    for err in e.errors()
+                ))
+                continue
+
+            # Duplicates inside a batch would not be caught by ON CONFLICT reporting
+            keys = {f"email:{row.email}", f"username:{row.username}"}
+            if keys & batch_keys:
+                report.skipped += 1
+                add_error(row_number, "Email or username already exists")
+                continue
+            batch_keys |= keys
+
+            batch.append((row_number, row))
+            if len(batch) >= batch_size:
+                await flush(batch)
+                batch = []
+                batch_keys = set()
+
+        if batch:
+            await flush(batch)
+
+        # Conflicts are found when a batch is flushed; report rows in input order
+        report.errors.sort(key=lambda error: error.row)
+
+        logger.info(
+            "Users imported",
+            created=report.created,
+            skipped=report.skipped,
+            failed=report.failed,
+        )
+        return report
@@ -2,27 +2,65 @@
 Business logic services
 Separates business logic from API endpoints for better testability and maintainability
 """
-from typing import Optional, List
+from typing import Optional, List, Sequence, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, or_
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash, verify_password
+from app.schemas.user import UserCreate, UserInDB, UserUpdate
+from app.core.security import get_password_hash_async, verify_password_async
 from app.core.logging import get_logger
+from app.db.loader import get_by_ids, session_loader
+from app.services.cache import TwoTierCache
+from app.services.pagination import paginate_keyset
 
 logger = get_logger(__name__)
 
+# Read-only user profiles by ID, invalidated by update_user and delete_user
+user_cache: TwoTierCache[UserInDB] = TwoTierCache("user", UserInDB)
+
 
 class UserService:
     """Service for user-related operations"""
     
     @staticmethod
     async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
-        """Get user by ID"""
-        result = await db.execute(select(User).where(User.id == user_id))
-        return result.scalar_one_or_none()
+        """Get user by ID (batched with other lookups on the session in the same tick)"""
+        return await session_loader(db, "user", UserService.get_users_by_ids).load(user_id)
+    
+    @staticmethod
+    @user_cache.cached
+    async def get_user_profile(db: AsyncSession, user_id: int) -> Optional[UserInDB]:
+        """
+        Get a user's profile by ID through the two-tier cache
+        
+        For read-only endpoints; use get_user_by_id to modify the user.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            
+        Returns:
+            Profile without credentials, or None if not found
+        """
+        user = await UserService.get_user_by_id(db, user_id)
+        return UserInDB.model_validate(user) if user else None
+    
+    @staticmethod
+    async def get_users_by_ids(db: AsyncSession, user_ids: Sequence[int]) -> List[Optional[User]]:
+        """
+        Get several users by ID with at most one IN query
+        
+        Args:
+            db: Database session
+            user_ids: User IDs (duplicates allowed)
+            
+        Returns:
+            The user for each ID, in the same order, None where not found
+        """
+        return await get_by_ids(db, User, user_ids)
     
     @staticmethod
     async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
@@ -48,6 +86,69 @@ class UserService:
         )
         return result.scalars().all()
     
+    @staticmethod
+    async def get_users_page(
+        db: AsyncSession,
+        cursor: str = "",
+        limit: int = 100
+    ) -> Tuple[List[User], Optional[str]]:
+        """Get a page of users using keyset pagination"""
+        return await paginate_keyset(db, User, cursor, limit)
+    
+    @staticmethod
+    async def raise_for_conflict(
+        db: AsyncSession,
+        exc: IntegrityError,
+        email: Optional[str] = None,
+        username: Optional[str] = None,
+        exclude_user_id: Optional[int] = None
+    ) -> None:
+        """
+        Map a unique constraint violation on users to a 400 response
+        
+        Only runs on the failure path. Looks up which value is taken so that
+        a duplicate email is reported first, regardless of which unique
+        index the database checked first.
+        
+        Args:
+            db: Database session (already rolled back)
+            exc: The IntegrityError raised on commit
+            email: Email that was being written
+            username: Username that was being written
+            exclude_user_id: ID of the user being updated, if any
+            
+        Raises:
+            HTTPException: Describing which field is already in use
+        """
+        conditions = []
+        if email is not None:
+            conditions.append(User.email == email)
+        if username is not None:
+            conditions.append(User.username == username)
+        
+        taken_emails = set()
+        taken_usernames = set()
+        if conditions:
+            query = select(User.email, User.username).where(or_(*conditions))
+            if exclude_user_id is not None:
+                query = query.where(User.id != exclude_user_id)
+            for taken_email, taken_username in (await db.execute(query)).all():
+                taken_emails.add(taken_email)
+                taken_usernames.add(taken_username)
+        
+        if email is not None and email in taken_emails:
+            detail = "Email already registered"
+        elif username is not None and username in taken_usernames:
+            detail = "Username already taken"
+        else:
+            raise exc
+        
+        logger.info("User conflict", detail=detail)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail
+        )
+    
     @staticmethod
     async def create_user(db: AsyncSession, user_data: UserCreate) -> User:
         """
@@ -63,23 +164,8 @@ class UserService:
         Raises:
             HTTPException: If user already exists
         """
-        # Check if user already exists
-        existing_user = await UserService.get_user_by_email(db, user_data.email)
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-        
-        existing_username = await UserService.get_user_by_username(db, user_data.username)
-        if existing_username:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already taken"
-            )
-        
-        # Create user
-        hashed_password = get_password_hash(user_data.password)
+        # Create user; uniqueness is enforced by the email/username indexes
+        hashed_password = await get_password_hash_async(user_data.password)
         db_user = User(
             email=user_data.email,
             username=user_data.username,
@@ -88,8 +174,13 @@ class UserService:
         )
         
         db.add(db_user)
-        await db.commit()
-        await db.refresh(db_user)
+        try:
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            await UserService.raise_for_conflict(
+                db, e, email=user_data.email, username=user_data.username
+            )
         
         logger.info("User created", user_id=db_user.id, username=db_user.username)
         return db_user
@@ -112,7 +203,7 @@ class UserService:
             Updated user
             
         Raises:
-            HTTPException: If user not found
+            HTTPException: If user not found or email/username is taken
         """
         user = await UserService.get_user_by_id(db, user_id)
         if not user:
@@ -125,13 +216,26 @@ class UserService:
         update_data = user_data.model_dump(exclude_unset=True)
         
         if "password" in update_data:
-            update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+            update_data["hashed_password"] = await get_password_hash_async(
+                update_data.pop("password")
+            )
         
         for field, value in update_data.items():
             setattr(user, field, value)
         
-        await db.commit()
+        try:
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            await UserService.raise_for_conflict(
+                db,
+                e,
+                email=update_data.get("email"),
+                username=update_data.get("username"),
+                exclude_user_id=user_id,
+            )
         await db.refresh(user)
+        await user_cache.invalidate(user_id)
         
         logger.info("User updated", user_id=user.id)
         return user
@@ -153,15 +257,21 @@ class UserService:
         Returns:
             User if authentication successful, None otherwise
         """
-        # Try to find user by username or email
-        user = await UserService.get_user_by_username(db, username)
-        if not user:
-            user = await UserService.get_user_by_email(db, username)
+        # Find user by username or email in one query; username wins on ambiguity
+        result = await db.execute(
+            select(User)
+            .where(or_(User.username == username, User.email == username))
+            .limit(2)
+        )
+        users = result.scalars().all()
+        user = next((u for u in users if u.username == username), None)
+        if not user and users:
+            user = users[0]
         
         if not user:
             return None
         
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return None
         
         if not user.is_active:
@@ -194,6 +304,7 @@ class UserService:
         
         await db.delete(user)
         await db.commit()
+        await user_cache.invalidate(user_id)
         
         logger.info("User deleted", user_id=user_id)
         return True
@@ -0,0 +1,98 @@
+"""
+Celery worker for background tasks
+Uses CELERY_BROKER_URL / CELERY_RESULT_BACKEND; set CELERY_TASK_ALWAYS_EAGER
+to run tasks inline without a broker (tests)
+
+Run with: celery -A app.worker worker -B --loglevel=info
+"""
+import asyncio
+import random
+from typing import Optional
+from celery import Celery, signals
+from redis import asyncio as aioredis
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.http_client import create_http_client
+from app.core.logging import setup_logging, get_logger
+from app.services.joke_warmer import JokeWarmer
+
+logger = get_logger(__name__)
+
+celery_app = Celery(
+    "production_api",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+)
+celery_app.conf.update(
+    task_always_eager=settings.CELERY_TASK_ALWAYS_EAGER,
+    task_ignore_result=True,
+    beat_schedule={
+        "warm-joke-cache": {
+            "task": "app.worker.warm_joke_cache",
+            "schedule": settings.JOKE_WARMER_INTERVAL,
+            # A run that has not started by the next tick is redundant
+            "options": {"expires": settings.JOKE_WARMER_INTERVAL},
+        },
+    },
+)
+
+
+@signals.setup_logging.connect
+def configure_logging(**kwargs) -> None:
+    """Use the application's structured logging in worker processes"""
+    # Runs once in the parent; prefork children restart the log writer
+    # thread themselves (see app.core.logging)
+    setup_logging()
+
+
+async def run_warmer() -> int:
+    """
+    Run the joke cache warmer with its own connections
+
+    Each task runs in a fresh event loop, so the database engine, Redis
+    client and HTTP client are created and closed per run.
+
+    Returns:
+        Number of jokes fetched from the external API
+    """
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    redis = aioredis.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    )
+    http_client = create_http_client()
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            return await JokeWarmer.warm(db, redis, http_client)
+    finally:
+        await http_client.aclose()
+        await redis.aclose()
+        await engine.dispose()
+
+
+@celery_app.task(name="app.worker.warm_joke_cache")
+def warm_joke_cache(jitter: bool = True) -> Optional[int]:
+    """
+    Keep the joke cache warm
+
+    Scheduled runs first re-enqueue themselves after a random delay of up to
+    JOKE_WARMER_JITTER seconds, so refills from several deployments or
+    restarted beats do not line up on the upstream API.
+
+    Args:
+        jitter: Delay the refill by a random amount first
+
+    Returns:
+        Number of jokes fetched, or None if the run was deferred
+    """
+    if jitter and settings.JOKE_WARMER_JITTER > 0 and not celery_app.conf.task_always_eager:
+        countdown = random.uniform(0, settings.JOKE_WARMER_JITTER)
+        warm_joke_cache.apply_async(kwargs={"jitter": False}, countdown=countdown)
+        return None
+
+    fetched = asyncio.run(run_warmer())
+    logger.info("Joke cache warmer finished", fetched=fetched)
+    return fetched
@@ -0,0 +1 @@
+"""Benchmarks initialization"""
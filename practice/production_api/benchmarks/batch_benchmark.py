@@ -0,0 +1,67 @@
+"""
+Benchmark resolving a list of joke IDs: one request per ID vs /jokes/batch
+
+Resolves the same random IDs with concurrent GET /jokes/{id} requests (as a
+frontend loop with limited parallelism would) and with a single
+GET /jokes/batch request, against the application running in-process.
+The service cache is disabled so every lookup reaches the database.
+
+Run with: python -m benchmarks.batch_benchmark [--sizes 10 100 500] [--rounds 5]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from app.core.config import settings
+from benchmarks.load_test import inprocess_client
+from benchmarks.utils import BENCH_DATABASE_URL, quiet_logging
+
+JOKES = 10000
+
+
+async def one_per_id(client, ids, parallelism: int) -> None:
+    slots = asyncio.Semaphore(parallelism)
+
+    async def fetch(joke_id: int) -> None:
+        async with slots:
+            response = await client.get(f"/jokes/{joke_id}")
+            response.raise_for_status()
+
+    await asyncio.gather(*(fetch(joke_id) for joke_id in ids))
+
+
+async def batch(client, ids, parallelism: int) -> None:
+    response = await client.get("/jokes/batch", params={"ids": ",".join(map(str, ids))})
+    response.raise_for_status()
+
+
+async def main(sizes, rounds: int, parallelism: int, database_url: str) -> None:
+    quiet_logging()
+    settings.SERVICE_CACHE_ENABLED = False
+    async with inprocess_client(database_url, JOKES) as client:
+        for size in sizes:
+            timings = {}
+            for name, resolve in (("one per id", one_per_id), ("batch", batch)):
+                samples = []
+                for _ in range(rounds):
+                    ids = random.sample(range(1, JOKES + 1), size)
+                    start = time.perf_counter()
+                    await resolve(client, ids, parallelism)
+                    samples.append((time.perf_counter() - start) * 1000)
+                timings[name] = statistics.median(samples)
+            print(
+                f"{size:>4} ids  one_per_id={timings['one per id']:9.1f} ms  "
+                f"batch={timings['batch']:7.1f} ms  ({timings['one per id'] / timings['batch']:5.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--parallelism", type=int, default=6, help="Concurrent per-ID requests")
+    parser.add_argument("--database-url", default=BENCH_DATABASE_URL)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.rounds, args.parallelism, args.database_url))
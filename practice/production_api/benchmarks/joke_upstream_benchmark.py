@@ -0,0 +1,113 @@
+"""
+Upstream joke API behaviour under a burst of uncached requests
+
+Sends bursts of concurrent JokeService.get_joke(use_cache=False) calls to a
+fake upstream that takes --latency-ms per request and serves at most
+--upstream-concurrency requests at once, and reports upstream calls and
+p50/p99 latency per burst, with and without single-flight coalescing.
+
+Then simulates an outage (upstream slower than JOKE_API_TIMEOUT) and
+reports request latency with the circuit breaker disabled and enabled; with
+the breaker open, requests get a stale cached joke instead of waiting.
+
+Run with: python -m benchmarks.joke_upstream_benchmark [--burst 50] [--bursts 20]
+"""
+import argparse
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import httpx
+
+from fastapi import HTTPException
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.config import settings
+from app.core.http_client import create_http_client
+from app.models.joke import Joke
+from app.services import joke_service
+from app.services.joke_service import JokeService
+from benchmarks.load_test import percentile
+from benchmarks.utils import quiet_logging
+
+
+class Uncoalesced:
+    """Stand-in for SingleFlight that always makes its own call"""
+
+    async def do(self, key, fn):
+        return await fn(), False
+
+
+def fake_upstream(calls: list, latency: float, concurrency: int) -> httpx.AsyncClient:
+    slots = asyncio.Semaphore(concurrency)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        async with slots:
+            await asyncio.sleep(latency)
+        return httpx.Response(200, json={"id": 1, "type": "general", "setup": "Setup", "punchline": "Punchline"})
+
+    return create_http_client(transport=httpx.MockTransport(handler))
+
+
+async def run(label: str, flights, burst: int, bursts: int, latency: float, concurrency: int) -> None:
+    calls = []
+    http_client = fake_upstream(calls, latency, concurrency)
+    latencies = []
+
+    async def request() -> None:
+        start = time.perf_counter()
+        try:
+            await JokeService.get_joke(None, use_cache=False, http_client=http_client)
+        except HTTPException:
+            pass
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    with patch.object(joke_service, "joke_api_flights", flights), \
+            patch.object(JokeService, "save_joke", new=AsyncMock()):
+        for _ in range(bursts):
+            await asyncio.gather(*(request() for _ in range(burst)))
+
+    await asyncio.gather(*joke_service._refresh_tasks)
+    await http_client.aclose()
+    latencies.sort()
+    print(
+        f"  {label:14} upstream calls={len(calls):6}  "
+        f"p50={percentile(latencies, 50):8.1f} ms  p99={percentile(latencies, 99):8.1f} ms"
+    )
+
+
+async def run_outage(label: str, breaker: CircuitBreaker, burst: int, bursts: int, latency: float) -> None:
+    stale = Joke(id=1, setup="Stale", punchline="Punchline", joke_type="general")
+    with patch.object(joke_service, "joke_api_breaker", breaker), \
+            patch.object(JokeService, "get_random_cached_joke", new=AsyncMock(return_value=stale)):
+        await run(label, joke_service.joke_api_flights, burst, bursts, latency, burst)
+
+
+async def main(burst: int, bursts: int, latency_ms: float, concurrency: int, timeout_ms: float) -> None:
+    # Every failed upstream call logs an error, which would swamp the outage numbers
+    quiet_logging("CRITICAL")
+    latency = latency_ms / 1000
+    print(f"healthy upstream ({latency_ms:.0f} ms, {concurrency} concurrent requests at most)")
+    await run("uncoalesced", Uncoalesced(), burst, bursts, latency, concurrency)
+    await run("single-flight", joke_service.joke_api_flights, burst, bursts, latency, concurrency)
+
+    settings.JOKE_API_TIMEOUT = timeout_ms / 1000
+    print(f"\nupstream outage (answers after {10 * timeout_ms:.0f} ms, timeout {timeout_ms:.0f} ms)")
+    for name, threshold in (("breaker off", bursts + 1), ("breaker on", settings.JOKE_API_BREAKER_FAILURES)):
+        breaker = CircuitBreaker(
+            "joke_api", threshold, settings.JOKE_API_BREAKER_RESET,
+            failure_exceptions=(HTTPException,),
+        )
+        await run_outage(name, breaker, burst, bursts, 10 * settings.JOKE_API_TIMEOUT)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--burst", type=int, default=50)
+    parser.add_argument("--bursts", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--upstream-concurrency", type=int, default=4)
+    parser.add_argument("--timeout-ms", type=float, default=100.0, help="JOKE_API_TIMEOUT during the outage")
+    args = parser.parse_args()
+    asyncio.run(main(args.burst, args.bursts, args.latency_ms, args.upstream_concurrency, args.timeout_ms))
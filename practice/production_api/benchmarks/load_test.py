@@ -0,0 +1,325 @@
+"""
+Load test with latency budgets
+
+Drives a weighted mix of requests (login, /users/me, /jokes/random and the
+list endpoints) from concurrent clients and reports RPS and p50/p95/p99
+latency per scenario. By default the full application runs in-process
+through the ASGI transport against an in-memory SQLite database, with Redis
+disabled and the external joke API stubbed; --database-url selects another
+database (SQLite file or Postgres) and --base-url drives a running server
+instead (start it with RATE_LIMIT_ENABLED=False).
+
+Results are checked against benchmarks/load_budgets.json, and the run exits
+with status 1 when a budget is exceeded. The budgets are for the default
+in-process run; record a new baseline with --update-budgets, which takes the
+worst of --baseline-runs runs and applies --headroom.
+
+Run with: python -m benchmarks.load_test [--requests 2000] [--concurrency 20]
+    [--mix login=1,me=20,random_joke=15,list_jokes=15,list_users=10]
+    [--database-url sqlite+aiosqlite:///./load.db] [--base-url http://127.0.0.1:8000]
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, List
+
+import httpx
+from httpx import AsyncClient
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.http_client import create_http_client, get_http_client
+from app.db.redis import get_redis
+from app.db.session import get_db, get_read_db
+from app.main import app
+from app.models.joke import Joke
+from benchmarks.utils import BENCH_DATABASE_URL, create_bench_sessionmaker, create_schema, quiet_logging
+
+BUDGETS_PATH = Path(__file__).with_name("load_budgets.json")
+DEFAULT_MIX = "login=1,me=20,random_joke=15,list_jokes=15,list_users=10"
+USER_PASSWORD = "loadtest-password"
+
+
+@dataclass
+class LoadUser:
+    """Registered user the load is generated as"""
+    username: str
+    headers: Dict[str, str]
+
+
+Scenario = Callable[[AsyncClient, LoadUser], Awaitable[httpx.Response]]
+
+SCENARIOS: Dict[str, Scenario] = {
+    "login": lambda client, user: client.post(
+        "/auth/login", json={"username": user.username, "password": USER_PASSWORD}
+    ),
+    "me": lambda client, user: client.get("/users/me", headers=user.headers),
+    "random_joke": lambda client, user: client.get("/jokes/random"),
+    "list_jokes": lambda client, user: client.get("/jokes/", params={"limit": 20}),
+    "list_users": lambda client, user: client.get("/users/", params={"limit": 20}, headers=user.headers),
+}
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """Parse "name=weight,..." into scenario weights"""
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(
+                f"unknown scenario {name!r} (choose from {', '.join(SCENARIOS)})"
+            )
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(q / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+@asynccontextmanager
+async def inprocess_client(database_url: str, jokes: int) -> AsyncIterator[AsyncClient]:
+    """Run the application in-process against a benchmark database"""
+    engine, session_maker = create_bench_sessionmaker(database_url)
+    await create_schema(engine)
+    async with session_maker() as session:
+        await session.execute(insert(Joke), [
+            {"setup": f"Setup {i}", "punchline": "Punchline", "joke_type": "general"}
+            for i in range(jokes)
+        ])
+        await session.commit()
+
+    async def override_get_db():
+        async with session_maker() as session:
+            yield session
+            await session.commit()
+
+    async def override_get_read_db():
+        async with session_maker() as session:
+            yield session
+
+    def stub_joke_api(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={
+            "id": 1, "type": "general", "setup": "Stub setup", "punchline": "Stub punchline",
+        })
+
+    http_client = create_http_client(transport=httpx.MockTransport(stub_joke_api))
+    app.dependency_overrides.update({
+        get_db: override_get_db,
+        get_read_db: override_get_read_db,
+        get_redis: lambda: None,
+        get_http_client: lambda: http_client,
+    })
+    rate_limit_enabled = settings.RATE_LIMIT_ENABLED
+    settings.RATE_LIMIT_ENABLED = False
+    try:
+        async with AsyncClient(app=app, base_url="http://load") as client:
+            yield client
+    finally:
+        settings.RATE_LIMIT_ENABLED = rate_limit_enabled
+        app.dependency_overrides.clear()
+        await http_client.aclose()
+        await engine.dispose()
+
+
+async def create_users(client: AsyncClient, count: int) -> List[LoadUser]:
+    """Register (if needed) and log in the users the load runs as"""
+    users = []
+    for i in range(count):
+        username = f"loaduser{i}"
+        response = await client.post("/auth/register", json={
+            "email": f"{username}@example.com",
+            "username": username,
+            "password": USER_PASSWORD,
+        })
+        if response.status_code not in (201, 400):
+            response.raise_for_status()
+        response = await client.post("/auth/login", json={"username": username, "password": USER_PASSWORD})
+        response.raise_for_status()
+        users.append(LoadUser(username, {"Authorization": f"Bearer {response.json()['access_token']}"}))
+    return users
+
+
+async def run_load(
+    client: AsyncClient,
+    users: List[LoadUser],
+    mix: Dict[str, int],
+    requests: int,
+    concurrency: int,
+    seed: int = 0,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Send ``requests`` requests drawn from ``mix`` with ``concurrency`` workers
+
+    Returns:
+        Summary per scenario and "overall": count, errors, rps, p50/p95/p99 in ms
+    """
+    rng = random.Random(seed)
+    plan = rng.choices(list(mix), weights=list(mix.values()), k=requests)
+    latencies: Dict[str, List[float]] = {name: [] for name in mix}
+    errors: Dict[str, int] = {name: 0 for name in mix}
+    next_index = 0
+
+    async def worker(worker_id: int) -> None:
+        nonlocal next_index
+        user = users[worker_id % len(users)]
+        while next_index < len(plan):
+            name = plan[next_index]
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                response = await SCENARIOS[name](client, user)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies[name].append((time.perf_counter() - start) * 1000)
+            errors[name] += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    def summarize(values: List[float], error_count: int) -> Dict[str, float]:
+        values = sorted(values)
+        return {
+            "count": len(values),
+            "errors": error_count,
+            "rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(values, 50), 2),
+            "p95_ms": round(percentile(values, 95), 2),
+            "p99_ms": round(percentile(values, 99), 2),
+        }
+
+    summary = {name: summarize(latencies[name], errors[name]) for name in mix}
+    summary["overall"] = summarize(
+        [value for values in latencies.values() for value in values],
+        sum(errors.values()),
+    )
+    return summary
+
+
+def check_budgets(summary: Dict[str, Dict[str, float]], budgets: Dict[str, Dict[str, float]]) -> List[str]:
+    """
+    Compare a run against latency/throughput budgets
+
+    Budget keys are p50_ms/p95_ms/p99_ms (maximums), min_rps and
+    max_error_rate. Scenarios missing from the run are skipped.
+
+    Returns:
+        Human-readable budget violations (empty if the run is within budget)
+    """
+    violations = []
+    for name, budget in budgets.items():
+        result = summary.get(name)
+        if result is None or not result["count"]:
+            continue
+        for key, limit in budget.items():
+            if key.endswith("_ms") and result[key] > limit:
+                violations.append(f"{name}: {key} {result[key]:.2f} > {limit}")
+            elif key == "min_rps" and result["rps"] < limit:
+                violations.append(f"{name}: rps {result['rps']:.1f} < {limit}")
+            elif key == "max_error_rate" and result["errors"] / result["count"] > limit:
+                violations.append(f"{name}: error rate {result['errors'] / result['count']:.2%} > {limit:.2%}")
+    return violations
+
+
+def budgets_from(summaries: List[Dict[str, Dict[str, float]]], headroom: float) -> Dict[str, Dict[str, float]]:
+    """
+    Derive budgets from baseline runs
+
+    Each budget starts from the worst result across the runs, so run-to-run
+    noise is measured rather than guessed, and ``headroom`` only has to
+    cover what the runs did not see.
+    """
+    budgets = {}
+    for name in summaries[0]:
+        budgets[name] = {
+            key: round(max(summary[name][key] for summary in summaries) * headroom, 1)
+            for key in ("p50_ms", "p95_ms", "p99_ms")
+        }
+        budgets[name]["max_error_rate"] = 0.0
+    slowest = min(summary["overall"]["rps"] for summary in summaries)
+    budgets["overall"]["min_rps"] = round(slowest / headroom, 1)
+    return budgets
+
+
+def print_summary(summary: Dict[str, Dict[str, float]]) -> None:
+    print(f"{'scenario':12} {'count':>7} {'errors':>7} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, result in summary.items():
+        print(
+            f"{name:12} {result['count']:7} {result['errors']:7} {result['rps']:9.1f} "
+            f"{result['p50_ms']:9.2f} {result['p95_ms']:9.2f} {result['p99_ms']:9.2f}"
+        )
+
+
+async def main(args: argparse.Namespace) -> int:
+    quiet_logging()
+
+    if args.base_url:
+        client_context = AsyncClient(base_url=args.base_url, timeout=30)
+    else:
+        client_context = inprocess_client(args.database_url, args.jokes)
+
+    async with client_context as client:
+        users = await create_users(client, args.users)
+        if args.warmup:
+            await run_load(client, users, args.mix, args.warmup, args.concurrency, seed=args.seed + 1)
+        summaries = []
+        for _ in range(args.baseline_runs if args.update_budgets else 1):
+            summaries.append(
+                await run_load(client, users, args.mix, args.requests, args.concurrency, seed=args.seed)
+            )
+
+    target = args.base_url or f"in-process ({args.database_url})"
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {target}")
+    for summary in summaries:
+        print_summary(summary)
+
+    if args.update_budgets:
+        args.budgets.write_text(json.dumps(budgets_from(summaries, args.headroom), indent=2) + "\n")
+        print(f"Budgets written to {args.budgets}")
+        return 0
+    if args.no_budgets:
+        return 0
+
+    violations = check_budgets(summary, json.loads(args.budgets.read_text()))
+    for violation in violations:
+        print(f"BUDGET EXCEEDED  {violation}")
+    if not violations:
+        print(f"Within budgets ({args.budgets.name})")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"Scenario weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--jokes", type=int, default=1000, help="Jokes to seed (in-process only)")
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", default=BENCH_DATABASE_URL)
+    parser.add_argument("--base-url", help="Drive a running server instead of the in-process app")
+    parser.add_argument("--budgets", type=Path, default=BUDGETS_PATH)
+    parser.add_argument("--no-budgets", action="store_true", help="Only report, never fail")
+    parser.add_argument("--update-budgets", action="store_true",
+                        help="Write budgets from this run instead of checking them")
+    parser.add_argument("--baseline-runs", type=int, default=3,
+                        help="Runs recorded by --update-budgets; budgets start from the worst")
+    parser.add_argument("--headroom", type=float, default=1.4,
+                        help="Factor applied to the worst baseline run when writing budgets")
+    sys.exit(asyncio.run(main(parser.parse_args())))
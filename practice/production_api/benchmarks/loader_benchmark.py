@@ -0,0 +1,77 @@
+"""
+Benchmark user lookups by ID with and without DataLoader batching
+
+Compares the previous one-query-per-call UserService.get_user_by_id with the
+batched version, for a single lookup and for N lookups made concurrently on
+one session (as independent code paths in a request would). Each round uses
+a fresh session so rows are never served from its identity map.
+
+Run with: python -m benchmarks.loader_benchmark [--fanout 1 10 50] [--rounds 200]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import insert, select
+
+from app.models.user import User
+from app.services.user_service import UserService
+from benchmarks.utils import create_bench_sessionmaker, create_schema, quiet_logging
+
+USERS = 1000
+
+
+async def get_user_by_id_unbatched(db, user_id: int):
+    """Previous implementation, kept for comparison"""
+    result = await db.execute(select(User).where(User.id == user_id))
+    return result.scalar_one_or_none()
+
+
+async def unbatched(db, user_ids) -> None:
+    # One session cannot run queries concurrently, so these go one by one
+    for user_id in user_ids:
+        await get_user_by_id_unbatched(db, user_id)
+
+
+async def batched(db, user_ids) -> None:
+    await asyncio.gather(*(UserService.get_user_by_id(db, user_id) for user_id in user_ids))
+
+
+async def time_per_round(session_maker, resolve, fanout: int, rounds: int) -> float:
+    """Average milliseconds to resolve ``fanout`` random users"""
+    elapsed = 0.0
+    for _ in range(rounds):
+        user_ids = random.sample(range(1, USERS + 1), fanout)
+        async with session_maker() as db:
+            start = time.perf_counter()
+            await resolve(db, user_ids)
+            elapsed += time.perf_counter() - start
+    return elapsed * 1000 / rounds
+
+
+async def main(fanouts, rounds: int) -> None:
+    quiet_logging()
+    engine, session_maker = create_bench_sessionmaker()
+    await create_schema(engine)
+    async with session_maker() as db:
+        await db.execute(insert(User), [
+            {"email": f"user{i}@example.com", "username": f"user{i}", "hashed_password": "x"}
+            for i in range(USERS)
+        ])
+        await db.commit()
+
+    for fanout in fanouts:
+        before = await time_per_round(session_maker, unbatched, fanout, rounds)
+        after = await time_per_round(session_maker, batched, fanout, rounds)
+        print(f"{fanout:>4} lookups  one_query_each={before:8.3f} ms  dataloader={after:8.3f} ms")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fanout", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.fanout, args.rounds))
@@ -0,0 +1,76 @@
+"""
+Throughput comparison of synchronous vs queued logging
+
+Emits request-style log lines and reports how long the calling thread
+(the event loop in the app) spends per line, and the end-to-end
+throughput once everything has been written. Output goes to a stream whose
+flush() sleeps for --flush-latency-ms, standing in for a stdout pipe that
+is slow to drain.
+
+Run with: python -m benchmarks.logging_benchmark [--lines 20000] [--flush-latency-ms 0.05]
+"""
+import argparse
+import os
+import time
+from unittest.mock import patch
+
+from app.core.config import settings
+from app.core.logging import get_logger, setup_logging, stop_logging
+
+
+class SlowStream:
+    """devnull writer whose flush() blocks for a fixed time"""
+
+    def __init__(self, stream, flush_latency: float):
+        self.stream = stream
+        self.flush_latency = flush_latency
+
+    def write(self, data: str) -> int:
+        return self.stream.write(data)
+
+    def flush(self) -> None:
+        if self.flush_latency:
+            time.sleep(self.flush_latency)
+
+
+def run(lines: int, log_async: bool, stream) -> None:
+    with patch.object(settings, "LOG_ASYNC", log_async):
+        setup_logging(stream)
+        logger = get_logger("benchmark")
+
+        start = time.perf_counter()
+        for i in range(lines):
+            logger.info(
+                "Request completed",
+                method="GET",
+                path="/jokes/1",
+                status_code=200,
+                duration="0.001s",
+            )
+        caller_seconds = time.perf_counter() - start
+
+        stop_logging()
+        total_seconds = time.perf_counter() - start
+
+    mode = "queued" if log_async else "sync"
+    print(
+        f"{mode:7} caller={caller_seconds * 1e6 / lines:7.2f} us/line  "
+        f"end-to-end={lines / total_seconds:10.0f} lines/s"
+    )
+
+
+def main(lines: int, flush_latency_ms: float) -> None:
+    with open(os.devnull, "w") as devnull:
+        stream = SlowStream(devnull, flush_latency_ms / 1000)
+        run(lines, log_async=False, stream=stream)
+        # Large enough queue that nothing is dropped during the burst
+        with patch.object(settings, "LOG_QUEUE_SIZE", lines + 1):
+            run(lines, log_async=True, stream=stream)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=20000)
+    parser.add_argument("--flush-latency-ms", type=float, default=0.05)
+    args = parser.parse_args()
+    main(args.lines, args.flush_latency_ms)
@@ -0,0 +1,110 @@
+"""
+Before/after benchmark for the request logging middleware
+
+Compares the legacy pair of BaseHTTPMiddleware subclasses against the pure
+ASGI RequestLoggingMiddleware on /health and /jokes/{id}.
+
+Run with: python -m benchmarks.middleware_benchmark [--requests N] [--concurrency N]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Callable
+
+import structlog
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.api import api_router
+from app.core.health import HealthProber, get_prober
+from app.core.logging import get_logger
+from app.db.session import get_db, get_read_db
+from app.middleware import RequestLoggingMiddleware
+from app.models.joke import Joke
+from benchmarks.utils import create_bench_sessionmaker, create_schema, make_client, measure_rps, quiet_logging
+
+logger = get_logger(__name__)
+
+
+class LegacyRequestLoggingMiddleware(BaseHTTPMiddleware):
+    """Previous BaseHTTPMiddleware implementation, kept for comparison"""
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        request_id = str(uuid.uuid4())
+        structlog.contextvars.clear_contextvars()
+        structlog.contextvars.bind_contextvars(request_id=request_id)
+        start_time = time.time()
+        request.state.request_id = request_id
+        response = await call_next(request)
+        duration = time.time() - start_time
+        logger.info(
+            "Request completed", status_code=response.status_code, duration=f"{duration:.3f}s"
+        )
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+class LegacyErrorHandlingMiddleware(BaseHTTPMiddleware):
+    """Previous BaseHTTPMiddleware implementation, kept for comparison"""
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        try:
+            return await call_next(request)
+        except Exception:
+            return JSONResponse(status_code=500, content={"detail": "Internal server error"})
+
+
+def build_app(*middleware) -> FastAPI:
+    """Build an app with the API routes and the given middleware stack"""
+    app = FastAPI()
+    for middleware_class in middleware:
+        app.add_middleware(middleware_class)
+    app.include_router(api_router)
+    return app
+
+
+async def main(requests: int, concurrency: int) -> None:
+    quiet_logging()
+
+    engine, session_maker = create_bench_sessionmaker()
+    await create_schema(engine)
+    async with session_maker() as session:
+        session.add(Joke(id=1, setup="setup", punchline="punchline", joke_type="general"))
+        await session.commit()
+
+    async def override_get_db():
+        async with session_maker() as session:
+            yield session
+
+    variants = {
+        "before (BaseHTTPMiddleware x2)": build_app(
+            LegacyRequestLoggingMiddleware, LegacyErrorHandlingMiddleware
+        ),
+        "after (pure ASGI)": build_app(RequestLoggingMiddleware),
+    }
+
+    # /health serves cached checks of the benchmark database
+    health_prober = HealthProber(engine, lambda: None)
+
+    for name, app in variants.items():
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_read_db] = override_get_db
+        app.dependency_overrides[get_prober] = lambda: health_prober
+        async with make_client(app) as client:
+            for path in ("/health", "/jokes/1"):
+                # Warm up
+                await client.get(path)
+                result = await measure_rps(lambda: client.get(path), requests, concurrency)
+                print(f"{name:32} {path:10} {result['rps']:10.1f} req/s")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
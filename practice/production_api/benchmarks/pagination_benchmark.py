@@ -0,0 +1,83 @@
+"""
+Benchmark offset vs keyset pagination for the jokes list
+
+Measures the latency of fetching page N (100 rows per page) with
+OFFSET/LIMIT and with the (created_at, id) keyset cursor.
+
+Run with: python -m benchmarks.pagination_benchmark [--rows 1000100]
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, select
+
+from app.models.joke import Joke
+from app.services.joke_service import JokeService
+from app.services.pagination import encode_cursor
+from benchmarks.utils import create_bench_sessionmaker, create_schema
+
+PAGE_SIZE = 100
+BATCH_SIZE = 10000
+PAGES = (1, 100, 1000, 10000)
+
+
+async def time_ms(coro_factory, iterations: int) -> float:
+    """Average milliseconds per call"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await coro_factory()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+async def main(rows: int, iterations: int) -> None:
+    engine, session_maker = create_bench_sessionmaker()
+    await create_schema(engine)
+
+    base_time = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    async with session_maker() as db:
+        for offset in range(0, rows, BATCH_SIZE):
+            await db.execute(insert(Joke), [
+                {
+                    "setup": f"Setup {i}",
+                    "punchline": "Punchline",
+                    "created_at": base_time + timedelta(seconds=i),
+                }
+                for i in range(offset, min(offset + BATCH_SIZE, rows))
+            ])
+        await db.commit()
+
+        for page in PAGES:
+            skip = (page - 1) * PAGE_SIZE
+            if skip >= rows:
+                continue
+
+            # Cursor pointing at the last row of the previous page (setup, not timed)
+            cursor = ""
+            if skip:
+                result = await db.execute(
+                    select(Joke.created_at, Joke.id)
+                    .order_by(Joke.created_at.desc(), Joke.id.desc())
+                    .offset(skip - 1)
+                    .limit(1)
+                )
+                cursor = encode_cursor(*result.one())
+
+            offset_ms = await time_ms(
+                lambda: JokeService.get_jokes(db, skip=skip, limit=PAGE_SIZE), iterations
+            )
+            keyset_ms = await time_ms(
+                lambda: JokeService.get_jokes_page(db, cursor=cursor, limit=PAGE_SIZE), iterations
+            )
+            print(f"page {page:>6}  offset={offset_ms:9.3f} ms  keyset={keyset_ms:9.3f} ms")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=PAGES[-1] * PAGE_SIZE + PAGE_SIZE)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.iterations))
@@ -0,0 +1,67 @@
+"""
+Benchmark random joke selection as the jokes table grows
+
+Compares ORDER BY random() against the ID-range sampling used by
+JokeService.get_random_cached_joke at 10k, 100k and 1M rows.
+
+Run with: python -m benchmarks.random_joke_benchmark [--sizes 10000 100000 1000000]
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import func, insert, select
+
+from app.models.joke import Joke
+from app.services.joke_service import JokeService
+from benchmarks.utils import create_bench_sessionmaker, create_schema
+
+BATCH_SIZE = 10000
+
+
+async def order_by_random(db):
+    """Previous implementation, kept for comparison"""
+    result = await db.execute(select(Joke).order_by(func.random()).limit(1))
+    return result.scalar_one_or_none()
+
+
+async def time_per_call(func_, db, iterations: int) -> float:
+    """Average milliseconds per call"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await func_(db)
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+async def main(sizes, iterations: int) -> None:
+    engine, session_maker = create_bench_sessionmaker()
+    await create_schema(engine)
+
+    rows = 0
+    async with session_maker() as db:
+        for size in sorted(sizes):
+            while rows < size:
+                batch = min(BATCH_SIZE, size - rows)
+                await db.execute(insert(Joke), [
+                    {"setup": f"Setup {rows + i}", "punchline": "Punchline", "joke_type": "general"}
+                    for i in range(batch)
+                ])
+                rows += batch
+            await db.commit()
+
+            before = await time_per_call(order_by_random, db, iterations)
+            after = await time_per_call(JokeService.get_random_cached_joke, db, iterations)
+            print(
+                f"{size:>9} rows  order_by_random={before:8.3f} ms  "
+                f"id_range_sampling={after:8.3f} ms"
+            )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.iterations))
@@ -0,0 +1,122 @@
+"""
+Benchmark full-text joke search at a million jokes
+
+Fills a database with synthetic jokes drawn from a Zipf-like vocabulary
+(so some words are rare and some appear in a large share of jokes), then
+times JokeService.search_jokes for first pages of single words at several
+match rates and for two-word queries. For comparison, it also times the
+substring scan (``LIKE '%word%'``) that searching without an index needs.
+
+On SQLite this exercises the jokes_fts FTS5 table; pass a Postgres
+--database-url (migrated to head) to exercise the GIN index instead.
+
+Run with: python -m benchmarks.search_benchmark [--jokes 1000000] [--rounds 50]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import insert, or_, select
+
+from app.models.joke import Joke
+from app.services.joke_service import JokeService
+from benchmarks.load_test import percentile
+from benchmarks.utils import BENCH_DATABASE_URL, create_bench_sessionmaker, create_schema, quiet_logging
+
+VOCABULARY = 20000
+WORDS_PER_JOKE = 12
+CHUNK = 10000
+# Target share of jokes containing the word for each query class
+MATCH_RATES = {"rare": 0.0001, "uncommon": 0.001, "medium": 0.01, "common": 0.1}
+
+
+def make_vocabulary(rng: random.Random) -> list:
+    syllables = ["ka", "lo", "mi", "ne", "po", "ru", "sa", "ti", "vu", "ze", "bo", "da", "fi", "gu"]
+    words = set()
+    while len(words) < VOCABULARY:
+        words.add("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def match_rate(weight: float) -> float:
+    """Share of jokes expected to contain a word drawn with this weight"""
+    return 1 - (1 - weight) ** WORDS_PER_JOKE
+
+
+def pick_words(vocabulary: list, weights: list) -> dict:
+    total = sum(weights)
+    rates = [match_rate(weight / total) for weight in weights]
+    return {
+        name: vocabulary[min(range(len(rates)), key=lambda i: abs(rates[i] - target))]
+        for name, target in MATCH_RATES.items()
+    }
+
+
+async def fill(session_maker, jokes: int, vocabulary: list, weights: list, rng: random.Random) -> None:
+    async with session_maker() as db:
+        for start in range(0, jokes, CHUNK):
+            words = rng.choices(vocabulary, weights, k=min(CHUNK, jokes - start) * WORDS_PER_JOKE)
+            await db.execute(insert(Joke), [
+                {
+                    "setup": " ".join(words[i:i + WORDS_PER_JOKE // 2]),
+                    "punchline": " ".join(words[i + WORDS_PER_JOKE // 2:i + WORDS_PER_JOKE]),
+                }
+                for i in range(0, len(words), WORDS_PER_JOKE)
+            ])
+        await db.commit()
+
+
+async def like_scan(db, query: str, skip: int = 0, limit: int = 20):
+    """Unindexed substring search, kept for comparison"""
+    conditions = [or_(Joke.setup.like(f"%{word}%"), Joke.punchline.like(f"%{word}%")) for word in query.split()]
+    result = await db.execute(select(Joke).where(*conditions).offset(skip).limit(limit))
+    return result.scalars().all()
+
+
+async def latencies(session_maker, search, query: str, rounds: int) -> list:
+    samples = []
+    async with session_maker() as db:
+        await search(db, query)  # warm up
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await search(db, query)
+            samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)
+
+
+async def main(jokes: int, rounds: int, database_url: str) -> None:
+    quiet_logging()
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(rng)
+    weights = [1 / rank for rank in range(1, VOCABULARY + 1)]
+    words = pick_words(vocabulary, weights)
+
+    engine, session_maker = create_bench_sessionmaker(database_url)
+    await create_schema(engine)
+    start = time.perf_counter()
+    await fill(session_maker, jokes, vocabulary, weights, rng)
+    print(f"Loaded {jokes} jokes in {time.perf_counter() - start:.1f} s")
+
+    queries = [(f"{name} ({MATCH_RATES[name]:.2%})", word) for name, word in words.items()]
+    queries.append(("medium + medium", f"{words['medium']} {vocabulary[vocabulary.index(words['medium']) + 1]}"))
+    queries.append(("common + rare", f"{words['common']} {words['rare']}"))
+
+    for label, query in queries:
+        indexed = await latencies(session_maker, JokeService.search_jokes, query, rounds)
+        scan = await latencies(session_maker, like_scan, query, max(1, rounds // 10))
+        print(
+            f"{label:<18} full_text p50={percentile(indexed, 50):7.2f} ms p95={percentile(indexed, 95):7.2f} ms"
+            f"   like_scan p50={percentile(scan, 50):8.2f} ms"
+        )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jokes", type=int, default=1_000_000)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--database-url", default=BENCH_DATABASE_URL)
+    args = parser.parse_args()
+    asyncio.run(main(args.jokes, args.rounds, args.database_url))
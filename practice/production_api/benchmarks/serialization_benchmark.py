@@ -0,0 +1,110 @@
+"""
+Before/after benchmark for list endpoint serialization
+
+Compares the previous list endpoints (ORM rows returned through
+response_model and encoded by the stdlib JSON response) with the current
+ones (trusted rows encoded once by orjson) on /jokes/ and /users/ with
+limit=100.
+
+Run with: python -m benchmarks.serialization_benchmark [--requests N] [--concurrency N]
+"""
+import argparse
+import asyncio
+from typing import List, Union
+
+from fastapi import APIRouter, Depends, FastAPI, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import api_router
+from app.core.responses import DefaultResponse
+from app.core.security import get_current_user
+from app.db.session import get_db, get_read_db
+from app.models.joke import Joke
+from app.models.user import User
+from app.schemas.common import PaginatedResponse
+from app.schemas.joke import JokeResponse
+from app.schemas.user import UserResponse
+from app.services.joke_service import JokeService
+from app.services.user_service import UserService
+from benchmarks.utils import create_bench_sessionmaker, create_schema, make_client, measure_rps, quiet_logging
+
+ROWS = 100
+
+legacy_router = APIRouter()
+
+
+@legacy_router.get("/jokes/", response_model=Union[List[JokeResponse], PaginatedResponse])
+async def legacy_list_jokes(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+):
+    """Previous implementation, kept for comparison"""
+    return await JokeService.get_jokes(db, skip=skip, limit=limit)
+
+
+@legacy_router.get("/users/", response_model=Union[List[UserResponse], PaginatedResponse])
+async def legacy_list_users(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """Previous implementation, kept for comparison"""
+    return await UserService.get_users(db, skip=skip, limit=limit)
+
+
+async def main(requests: int, concurrency: int) -> None:
+    quiet_logging()
+
+    engine, session_maker = create_bench_sessionmaker()
+    await create_schema(engine)
+    async with session_maker() as session:
+        await session.execute(insert(Joke), [
+            {"setup": f"Setup {i}", "punchline": "Punchline", "joke_type": "general"}
+            for i in range(ROWS)
+        ])
+        await session.execute(insert(User), [
+            {
+                "email": f"user{i}@example.com",
+                "username": f"user{i}",
+                "hashed_password": "hash",
+                "full_name": f"User {i}",
+            }
+            for i in range(ROWS)
+        ])
+        await session.commit()
+
+    async def override_get_db():
+        async with session_maker() as session:
+            yield session
+
+    variants = {
+        "before (response_model + json)": FastAPI(default_response_class=JSONResponse),
+        "after (trusted rows + orjson)": FastAPI(default_response_class=DefaultResponse),
+    }
+    variants["before (response_model + json)"].include_router(legacy_router)
+    variants["after (trusted rows + orjson)"].include_router(api_router)
+
+    for name, app in variants.items():
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_read_db] = override_get_db
+        app.dependency_overrides[get_current_user] = lambda: {"sub": "bench", "user_id": 1}
+        async with make_client(app) as client:
+            for path in ("/jokes/?limit=100", "/users/?limit=100"):
+                # Warm up
+                await client.get(path)
+                result = await measure_rps(lambda: client.get(path), requests, concurrency)
+                print(f"{name:32} {path:18} {result['rps']:10.1f} req/s")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,79 @@
+"""
+Benchmark user lookups through the two-tier service cache
+
+Times UserService.get_user_profile against the database alone (cache
+disabled), against the Redis tier (in-process tier disabled, fakeredis by
+default) and against the in-process tier, for a set of users looked up at
+random.
+
+Run with: python -m benchmarks.service_cache_benchmark [--users 1000] [--lookups 5000]
+"""
+import argparse
+import asyncio
+import random
+import time
+from unittest.mock import patch
+
+import fakeredis
+from redis import asyncio as aioredis
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.models.user import User
+from app.services import user_service
+from app.services.user_service import UserService
+from benchmarks.utils import create_bench_sessionmaker, create_schema, quiet_logging
+
+
+async def time_per_lookup(db, user_ids, lookups: int) -> float:
+    """Average microseconds per lookup"""
+    start = time.perf_counter()
+    for _ in range(lookups):
+        await UserService.get_user_profile(db, random.choice(user_ids))
+    return (time.perf_counter() - start) * 1_000_000 / lookups
+
+
+async def main(users: int, lookups: int, redis_url: str) -> None:
+    quiet_logging()
+    engine, session_maker = create_bench_sessionmaker()
+    await create_schema(engine)
+    redis = aioredis.from_url(redis_url, decode_responses=True) if redis_url \
+        else fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    async with session_maker() as db:
+        await db.execute(insert(User), [
+            {"email": f"user{i}@example.com", "username": f"user{i}", "hashed_password": "x", "is_active": True}
+            for i in range(users)
+        ])
+        await db.commit()
+        user_ids = list(range(1, users + 1))
+
+        tiers = (
+            ("database only", False, 0),
+            ("redis tier", True, 0),
+            ("in-process tier", True, users),
+        )
+        cache = user_service.user_cache
+        for name, enabled, local_size in tiers:
+            cache.clear()
+            await redis.flushdb()
+            with patch.object(settings, "SERVICE_CACHE_ENABLED", enabled), \
+                    patch.object(cache, "local_max_size", local_size), \
+                    patch.object(cache, "redis_getter", lambda: redis):
+                # Warm the tiers so every timed lookup is a hit
+                for user_id in user_ids:
+                    await UserService.get_user_profile(db, user_id)
+                per_lookup = await time_per_lookup(db, user_ids, lookups)
+            print(f"{name:16} {per_lookup:9.1f} us/lookup")
+
+    await redis.aclose()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--redis-url", default="", help="Use a real Redis instead of fakeredis")
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.lookups, args.redis_url))
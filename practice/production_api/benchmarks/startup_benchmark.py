@@ -0,0 +1,124 @@
+"""
+Worker cold start: import time and time-to-first-request
+
+Reports the import time of app.main (from ``python -X importtime``) with the
+slowest packages it pulls in, then starts a uvicorn worker repeatedly and
+measures the time from process start until /livez first answers, with
+DB_CREATE_ALL on (schema created on every boot) and off (migrations only).
+
+Uses a throwaway SQLite file by default; pass --database-url to measure
+against Postgres.
+
+Run with: python -m benchmarks.startup_benchmark [--runs 5] [--top 12]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| +(\S+)")
+
+
+def import_times(module: str, env: Dict[str, str]) -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    Import ``module`` in a fresh interpreter with -X importtime
+
+    Returns:
+        Total milliseconds and, for each third-party package imported along
+        the way, its slowest (cumulative) import in ms, slowest first
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    total = 0.0
+    packages: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative_ms = int(match.group(2)) / 1000
+        name = match.group(3)
+        if name == module:
+            total = cumulative_ms
+        else:
+            package = name.partition(".")[0]
+            if package not in sys.stdlib_module_names and package != module.partition(".")[0] \
+                    and not package.startswith("_"):
+                packages[package] = max(packages.get(package, 0.0), cumulative_ms)
+    return total, sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+
+def time_to_first_request(env: Dict[str, str], port: int, timeout: float = 60.0) -> float:
+    """
+    Start one uvicorn worker and wait until /livez answers
+
+    Returns:
+        Milliseconds from process start to the first successful response
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(timeout=1.0) as client:
+            while time.perf_counter() - start < timeout:
+                if process.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with status {process.returncode}")
+                try:
+                    if client.get(f"http://127.0.0.1:{port}/livez").status_code == 200:
+                        return (time.perf_counter() - start) * 1000
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.005)
+        raise TimeoutError("worker did not become ready")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main(runs: int, top: int, port: int, database_url: str) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DATABASE_URL": database_url or f"sqlite+aiosqlite:///{tmp}/startup.db",
+            "SECRET_KEY": os.environ.get("SECRET_KEY", "startup-benchmark"),
+            "LOG_LEVEL": "WARNING",
+        }
+
+        total, packages = import_times("app.main", env)
+        print(f"import app.main: {total:8.1f} ms (slowest packages, including what they import)")
+        for name, cumulative_ms in packages[:top]:
+            print(f"  {name:24} {cumulative_ms:8.1f} ms")
+
+        # Create the schema once, as a migration would
+        time_to_first_request({**env, "DB_CREATE_ALL": "True"}, port)
+
+        print(f"\ntime to first request (one worker, {runs} runs)")
+        for name, create_all in (("DB_CREATE_ALL=True", "True"), ("DB_CREATE_ALL=False", "False")):
+            samples = [
+                time_to_first_request({**env, "DB_CREATE_ALL": create_all}, port)
+                for _ in range(runs)
+            ]
+            print(
+                f"  {name:20} median={statistics.median(samples):8.1f} ms  "
+                f"min={min(samples):8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--database-url", default="")
+    args = parser.parse_args()
+    main(args.runs, args.top, args.port, args.database_url)
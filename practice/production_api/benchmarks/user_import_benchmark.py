@@ -0,0 +1,60 @@
+"""
+Throughput of the bulk user import pipeline
+
+Imports NDJSON users into an in-memory SQLite database, once with
+pre-hashed passwords (database-bound) and once with plain passwords
+(bcrypt-bound, scales with USER_IMPORT_HASH_WORKERS and CPU cores).
+
+Run with: python -m benchmarks.user_import_benchmark [--rows 20000] [--hashed-rows 40]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app.core.security import get_password_hash, import_password_hasher
+from app.services.user_import import UserImportService
+from benchmarks.utils import create_bench_sessionmaker, create_schema, quiet_logging
+
+
+async def ndjson_chunks(rows: int, start: int, row_fields: dict):
+    """Generate the upload lazily, 1000 lines per chunk"""
+    for offset in range(start, start + rows, 1000):
+        yield "".join(
+            json.dumps({"email": f"user{i}@example.com", "username": f"user{i}", **row_fields}) + "\n"
+            for i in range(offset, min(offset + 1000, start + rows))
+        ).encode()
+
+
+async def run(session_maker, name: str, rows: int, start: int, row_fields: dict) -> None:
+    async with session_maker() as db:
+        lines = UserImportService.iter_lines(ndjson_chunks(rows, start, row_fields))
+        begin = time.perf_counter()
+        report = await UserImportService.import_users(db, UserImportService.iter_rows(lines, "ndjson"))
+        elapsed = time.perf_counter() - begin
+
+    print(
+        f"{name:18} {report.created:7} users in {elapsed:6.2f}s  "
+        f"{report.created / elapsed * 60:10.0f} users/min"
+    )
+
+
+async def main(rows: int, hashed_rows: int) -> None:
+    quiet_logging()
+
+    engine, session_maker = create_bench_sessionmaker()
+    await create_schema(engine)
+
+    await run(session_maker, "pre-hashed", rows, 0, {"hashed_password": get_password_hash("password123")})
+    await run(session_maker, "plain passwords", hashed_rows, rows, {"password": "password123"})
+
+    import_password_hasher.shutdown()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--hashed-rows", type=int, default=40)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.hashed_rows))
@@ -0,0 +1,67 @@
+"""
+Shared helpers for in-process benchmarks
+Drives the ASGI app through httpx without a network hop and reports throughput
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict
+
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.logging import setup_logging
+from app.db.session import Base
+
+BENCH_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+
+def quiet_logging(level: str = "WARNING") -> None:
+    """Configure logging at ``level`` so log output does not dominate a measurement"""
+    settings.LOG_LEVEL = level
+    setup_logging()
+
+
+def create_bench_sessionmaker(url: str = BENCH_DATABASE_URL):
+    """Create an engine and session maker for benchmark data"""
+    # An in-memory SQLite database only exists on a single shared connection
+    poolclass = StaticPool if ":memory:" in url else None
+    engine = create_async_engine(url, echo=False, poolclass=poolclass)
+    return engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def create_schema(engine) -> None:
+    """Create all tables on the benchmark engine"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def measure_rps(
+    request: Callable[[], Awaitable[object]],
+    requests: int = 2000,
+    concurrency: int = 20,
+) -> Dict[str, float]:
+    """
+    Run ``request`` ``requests`` times with ``concurrency`` workers
+
+    Returns:
+        Dictionary with total seconds and requests per second
+    """
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await request()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "rps": requests / elapsed}
+
+
+def make_client(app) -> AsyncClient:
+    """Create an in-process HTTP client for the given ASGI app"""
+    return AsyncClient(app=app, base_url="http://bench")
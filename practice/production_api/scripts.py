@@ -45,6 +45,36 @@ def migrate_create(message):
     return run_command(f'alembic revision --autogenerate -m "{message}"')
 
 
+def import_users(path, fmt=None):
+    """Bulk import users from an NDJSON or CSV file"""
+    import asyncio
+    from app.db.session import AsyncSessionLocal, close_db
+    from app.core.security import import_password_hasher
+    from app.services.user_import import UserImportService
+
+    fmt = fmt or ("csv" if path.endswith(".csv") else "ndjson")
+
+    async def read_chunks():
+        with open(path, "rb") as f:
+            while chunk := f.read(64 * 1024):
+                yield chunk
+
+    async def run():
+        try:
+            async with AsyncSessionLocal() as db:
+                lines = UserImportService.iter_lines(read_chunks())
+                return await UserImportService.import_users(
+                    db, UserImportService.iter_rows(lines, fmt)
+                )
+        finally:
+            import_password_hasher.shutdown()
+            await close_db()
+
+    report = asyncio.run(run())
+    print(report.model_dump_json(indent=2))
+    return 0 if not report.failed else 1
+
+
 def docker_up():
     """Start Docker containers"""
     return run_command("docker-compose up -d")
@@ -69,6 +99,7 @@ def help_text():
         "dev": "Start development server",
         "migrate": "Run database migrations",
         "migrate-create <msg>": "Create new migration",
+        "import-users <file>": "Bulk import users (NDJSON or .csv)",
         "docker-up": "Start Docker containers",
         "docker-down": "Stop Docker containers",
         "docker-logs": "View Docker logs",
@@ -100,6 +131,8 @@ if __name__ == "__main__":
     
     if command == "migrate-create" and len(sys.argv) > 2:
         sys.exit(migrate_create(sys.argv[2]))
+    elif command == "import-users" and len(sys.argv) > 2:
+        sys.exit(import_users(*sys.argv[2:4]))
     elif command in commands:
         sys.exit(commands[command]())
     else:
@@ -4,13 +4,23 @@ Test configuration and fixtures
 import pytest
 import asyncio
 from typing import AsyncGenerator
+import fakeredis
+import httpx
 from httpx import AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.db.session import Base, get_db
+from app.db.session import Base, get_db, get_read_db
+from app.db.redis import get_redis
+from app.core.http_client import create_http_client, get_http_client
 from app.core.config import settings
+from app.core.rate_limit import reset_rate_limiter
+from app.core.health import HealthProber, get_prober
+from app.api.jokes import joke_validators
+from app.services.joke_service import joke_api_breaker, joke_cache
+from app.services.user_service import user_cache
 
 # Test database URL (use in-memory SQLite for tests)
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -19,7 +29,7 @@ TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 test_engine = create_async_engine(
     TEST_DATABASE_URL,
     echo=False,
-    poolclass=NullPool,
+    poolclass=StaticPool,
 )
 
 # Create test session maker
@@ -58,6 +68,16 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
         yield db_session
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    # Health endpoints check the test database; Redis is reported as disabled
+    health_prober = HealthProber(test_engine, lambda: None)
+    app.dependency_overrides[get_prober] = lambda: health_prober
+    reset_rate_limiter()
+    # Tables are recreated per test, so IDs get reused
+    joke_validators.clear()
+    joke_cache.clear()
+    user_cache.clear()
+    joke_api_breaker.reset()
     
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
@@ -65,6 +85,55 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def statements():
+    """Collects the SQL statements run on the test engine"""
+    executed = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", before_execute)
+    yield executed
+    event.remove(test_engine.sync_engine, "before_cursor_execute", before_execute)
+
+
+@pytest.fixture
+async def fake_redis() -> AsyncGenerator[fakeredis.FakeAsyncRedis, None]:
+    """Create in-memory Redis client and use it for requests"""
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    app.dependency_overrides[get_redis] = lambda: redis
+    
+    yield redis
+    
+    await redis.aclose()
+
+
+@pytest.fixture
+async def joke_api() -> AsyncGenerator[list, None]:
+    """
+    Stand-in for the external joke API served through the shared HTTP client
+    Yields the list of requests it received
+    """
+    requests = []
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={
+            "id": 1,
+            "type": "general",
+            "setup": "Why did the chicken cross the road?",
+            "punchline": "To get to the other side!",
+        })
+    
+    http_client = create_http_client(transport=httpx.MockTransport(handler))
+    app.dependency_overrides[get_http_client] = lambda: http_client
+    
+    yield requests
+    
+    await http_client.aclose()
+
+
 @pytest.fixture
 def test_user_data():
     """Sample user data for testing"""
@@ -3,8 +3,11 @@ Test authentication endpoints
 """
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from tests.conftest import test_engine
+
 
 @pytest.mark.asyncio
 async def test_register_user(client: AsyncClient, test_user_data: dict):
@@ -72,3 +75,37 @@ async def test_login_nonexistent_user(client: AsyncClient):
     }
     response = await client.post("/auth/login", json=login_data)
     assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_register_duplicate_username(client: AsyncClient, test_user_data: dict):
+    """Test registering with duplicate username"""
+    await client.post("/auth/register", json=test_user_data)
+    
+    duplicate = {**test_user_data, "email": "other@example.com"}
+    response = await client.post("/auth/register", json=duplicate)
+    assert response.status_code == 400
+    assert "already taken" in response.json()["detail"].lower()
+
+
+@pytest.mark.asyncio
+async def test_login_with_email_single_query(client: AsyncClient, test_user_data: dict):
+    """Test that login by email resolves the user with one query"""
+    await client.post("/auth/register", json=test_user_data)
+    
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = await client.post("/auth/login", json={
+            "username": test_user_data["email"],
+            "password": test_user_data["password"]
+        })
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", record)
+    
+    assert response.status_code == 200
+    assert len([s for s in statements if "FROM users" in s]) == 1
@@ -0,0 +1,85 @@
+"""
+Test batch lookup endpoints
+"""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from unittest.mock import patch
+
+from app.core.config import settings
+from app.models.joke import Joke
+
+
+async def create_jokes(db_session: AsyncSession, count: int) -> list:
+    jokes = [Joke(setup=f"Setup {i}", punchline=f"Punchline {i}") for i in range(count)]
+    db_session.add_all(jokes)
+    await db_session.commit()
+    return [joke.id for joke in jokes]
+
+
+@pytest.mark.asyncio
+async def test_jokes_batch_in_input_order(client: AsyncClient, db_session: AsyncSession, statements: list):
+    """Test that jokes come back in request order with one query and null for missing IDs"""
+    first, second, third = await create_jokes(db_session, 3)
+    statements.clear()
+
+    response = await client.get("/jokes/batch", params={"ids": f"{third},99999,{first},{third}"})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] if item else None for item in data["items"]] == [third, None, first, third]
+    assert data["items"][0]["setup"] == "Setup 2"
+    assert data["missing"] == [99999]
+    assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 1
+
+
+@pytest.mark.asyncio
+async def test_jokes_batch_accepts_repeated_ids(client: AsyncClient, db_session: AsyncSession):
+    """Test that ids may also be given as repeated parameters"""
+    first, second = await create_jokes(db_session, 2)
+
+    response = await client.get(f"/jokes/batch?ids={second}&ids={first}")
+
+    assert [item["id"] for item in response.json()["items"]] == [second, first]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("query", ["", "?ids=", "?ids=1,abc"])
+async def test_jokes_batch_rejects_bad_ids(client: AsyncClient, query: str):
+    """Test that missing or non-integer IDs are rejected"""
+    response = await client.get(f"/jokes/batch{query}")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_jokes_batch_limits_ids(client: AsyncClient):
+    """Test that at most BATCH_MAX_IDS IDs are accepted"""
+    with patch.object(settings, "BATCH_MAX_IDS", 3):
+        assert (await client.get("/jokes/batch", params={"ids": "1,2,3"})).status_code == 200
+        assert (await client.get("/jokes/batch", params={"ids": "1,2,3,4"})).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_users_batch(client: AsyncClient, test_user_data: dict):
+    """Test that the user batch requires auth and omits credentials"""
+    await client.post("/auth/register", json=test_user_data)
+    other = await client.post("/auth/register", json={
+        **test_user_data, "email": "other@example.com", "username": "otheruser",
+    })
+    response = await client.post("/auth/login", json={
+        "username": test_user_data["username"],
+        "password": test_user_data["password"],
+    })
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    me = (await client.get("/users/me", headers=headers)).json()["id"]
+    other_id = other.json()["id"]
+
+    assert (await client.get("/users/batch", params={"ids": str(me)})).status_code == 403
+
+    response = await client.get("/users/batch", params={"ids": f"{other_id},{me},12345"}, headers=headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["username"] if item else None for item in data["items"]] == ["otheruser", "testuser", None]
+    assert data["missing"] == [12345]
+    assert "hashed_password" not in data["items"][0]
@@ -0,0 +1,175 @@
+"""
+Test the joke API circuit breaker and stale-while-revalidate fallback
+"""
+import asyncio
+import time
+import pytest
+import httpx
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from unittest.mock import patch
+
+from app.main import app
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from app.core.config import settings
+from app.core.http_client import create_http_client, get_http_client
+from app.models.joke import Joke
+from app.services import joke_service
+from tests.conftest import TestSessionLocal
+
+
+class FakeUpstream:
+    """Joke API stand-in with adjustable latency and status code"""
+
+    def __init__(self):
+        self.latency = 0.0
+        self.status_code = 200
+        self.calls = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return httpx.Response(self.status_code, json={
+            "id": self.calls, "type": "general", "setup": f"Fresh {self.calls}", "punchline": "Punchline",
+        })
+
+
+@pytest.fixture
+async def upstream(client: AsyncClient):
+    """Slow-capable fake joke API with a fast-tripping breaker"""
+    fake = FakeUpstream()
+    http_client = create_http_client(transport=httpx.MockTransport(fake.handler))
+    app.dependency_overrides[get_http_client] = lambda: http_client
+    breaker = CircuitBreaker("joke_api", failure_threshold=2, reset_timeout=0.2,
+                             failure_exceptions=joke_service.joke_api_breaker.failure_exceptions)
+
+    with patch.object(joke_service, "joke_api_breaker", breaker), \
+            patch.object(joke_service, "AsyncSessionLocal", TestSessionLocal), \
+            patch.object(settings, "JOKE_API_TIMEOUT", 0.05):
+        yield fake
+        await asyncio.gather(*joke_service._refresh_tasks)
+
+    await http_client.aclose()
+
+
+async def refreshes_done() -> None:
+    await asyncio.gather(*joke_service._refresh_tasks)
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_and_half_open_probe_closes_it():
+    """Test closed -> open -> half-open -> closed, with a single probe at a time"""
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=0.05, failure_exceptions=(ValueError,))
+
+    async def fail():
+        raise ValueError("down")
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await breaker.call(fail)
+    assert breaker.state == OPEN
+
+    with pytest.raises(CircuitOpenError) as exc_info:
+        await breaker.call(fail)
+    assert 0 < exc_info.value.retry_after <= 0.05
+
+    await asyncio.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+
+    probe_started = asyncio.Event()
+
+    async def probe():
+        probe_started.set()
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    probe_task = asyncio.ensure_future(breaker.call(probe))
+    await probe_started.wait()
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(probe)
+
+    assert await probe_task == "ok"
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_failed_probe_reopens_breaker():
+    """Test that a failing probe opens the breaker for another reset_timeout"""
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05, failure_exceptions=(ValueError,))
+
+    async def fail():
+        raise ValueError("down")
+
+    with pytest.raises(ValueError):
+        await breaker.call(fail)
+    await asyncio.sleep(0.06)
+    with pytest.raises(ValueError):
+        await breaker.call(fail)
+
+    assert breaker.state == OPEN
+    assert breaker.retry_after() > 0
+
+
+@pytest.mark.asyncio
+async def test_slow_upstream_opens_breaker_and_serves_stale(client: AsyncClient, db_session, upstream: FakeUpstream):
+    """Test that timeouts trip the breaker and later requests get a cached joke right away"""
+    db_session.add(Joke(setup="Stale setup", punchline="Stale punchline", joke_type="general"))
+    await db_session.commit()
+    upstream.latency = 1.0
+
+    for _ in range(2):
+        response = await client.get("/jokes/random", params={"use_cache": False})
+        assert response.status_code == 503
+    assert joke_service.joke_api_breaker.state == OPEN
+    assert upstream.calls == 2
+
+    start = time.perf_counter()
+    response = await client.get("/jokes/random", params={"use_cache": False})
+    elapsed = time.perf_counter() - start
+
+    assert response.status_code == 200
+    assert response.json()["setup"] == "Stale setup"
+    assert elapsed < settings.JOKE_API_TIMEOUT
+    await refreshes_done()
+    assert upstream.calls == 2  # Still open: the background refresh failed fast
+
+
+@pytest.mark.asyncio
+async def test_background_probe_closes_breaker(client: AsyncClient, db_session, upstream: FakeUpstream):
+    """Test that once the upstream recovers the background probe closes the breaker and saves a joke"""
+    db_session.add(Joke(setup="Stale setup", punchline="Stale punchline", joke_type="general"))
+    await db_session.commit()
+    upstream.status_code = 500
+
+    for _ in range(2):
+        await client.get("/jokes/random", params={"use_cache": False})
+    assert joke_service.joke_api_breaker.state == OPEN
+
+    upstream.status_code = 200
+    await asyncio.sleep(0.25)
+
+    response = await client.get("/jokes/random", params={"use_cache": False})
+    assert response.json()["setup"] == "Stale setup"
+    await refreshes_done()
+
+    assert joke_service.joke_api_breaker.state == CLOSED
+    assert upstream.calls == 3
+    async with TestSessionLocal() as session:
+        assert await session.scalar(select(func.count()).select_from(Joke)) == 2
+
+    response = await client.get("/jokes/random", params={"use_cache": False})
+    assert response.json()["setup"] == "Fresh 4"
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_without_cached_jokes(client: AsyncClient, upstream: FakeUpstream):
+    """Test that an open breaker with an empty cache returns 503 with Retry-After"""
+    upstream.status_code = 500
+    for _ in range(2):
+        await client.get("/jokes/random", params={"use_cache": False})
+
+    response = await client.get("/jokes/random")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert upstream.calls == 2
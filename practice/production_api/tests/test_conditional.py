@@ -0,0 +1,149 @@
+"""
+Test conditional GET support
+"""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from unittest.mock import patch
+
+from app.models.joke import Joke
+from app.services.joke_service import JokeService
+
+
+async def create_joke(db_session: AsyncSession) -> Joke:
+    joke = Joke(setup="Setup", punchline="Punchline", joke_type="general", source="test")
+    db_session.add(joke)
+    await db_session.commit()
+    return joke
+
+
+async def login(client: AsyncClient, test_user_data: dict) -> dict:
+    await client.post("/auth/register", json=test_user_data)
+    response = await client.post("/auth/login", json={
+        "username": test_user_data["username"],
+        "password": test_user_data["password"],
+    })
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_joke_etag_round_trip(client: AsyncClient, db_session: AsyncSession):
+    """Test that a matching If-None-Match gets an empty 304"""
+    joke = await create_joke(db_session)
+
+    response = await client.get(f"/jokes/{joke.id}")
+    assert response.status_code == 200
+    assert response.json()["setup"] == "Setup"
+    etag = response.headers["etag"]
+    assert "immutable" in response.headers["cache-control"]
+
+    response = await client.get(f"/jokes/{joke.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    response = await client.get(f"/jokes/{joke.id}", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_joke_if_modified_since(client: AsyncClient, db_session: AsyncSession):
+    """Test that If-Modified-Since is honoured when no ETag is sent"""
+    joke = await create_joke(db_session)
+
+    last_modified = (await client.get(f"/jokes/{joke.id}")).headers["last-modified"]
+    response = await client.get(f"/jokes/{joke.id}", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+    response = await client.get(
+        f"/jokes/{joke.id}", headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_joke_revalidation_skips_database(client: AsyncClient, db_session: AsyncSession):
+    """Test that revalidating a seen joke does not query the database"""
+    joke = await create_joke(db_session)
+    etag = (await client.get(f"/jokes/{joke.id}")).headers["etag"]
+
+    with patch.object(JokeService, "get_joke_created_at") as created_at, \
+            patch.object(JokeService, "get_joke_by_id") as get_joke:
+        response = await client.get(f"/jokes/{joke.id}", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    created_at.assert_not_called()
+    get_joke.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_missing_joke(client: AsyncClient):
+    """Test that validators for a missing joke still give 404"""
+    response = await client.get("/jokes/99999", headers={"If-None-Match": "*"})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_joke_list_etag_changes_on_insert(client: AsyncClient, db_session: AsyncSession):
+    """Test that the list ETag changes when a joke is added"""
+    await create_joke(db_session)
+    etag = (await client.get("/jokes/")).headers["etag"]
+
+    response = await client.get("/jokes/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    await create_joke(db_session)
+    response = await client.get("/jokes/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+@pytest.mark.asyncio
+async def test_joke_list_etag_sees_late_commit_below_max_id(
+    client: AsyncClient, db_session: AsyncSession, statements: list
+):
+    """Test that a joke committed after a higher ID changes the ETag, with one query per request"""
+    db_session.add(Joke(id=5, setup="Five", punchline="Punchline"))
+    await db_session.commit()
+    statements.clear()
+    etag = (await client.get("/jokes/")).headers["etag"]
+    assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 1
+
+    # ID 3 was allocated before 5 but committed after it: the ID range is unchanged
+    db_session.add(Joke(id=3, setup="Three", punchline="Punchline"))
+    await db_session.commit()
+    response = await client.get("/jokes/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert {joke["id"] for joke in response.json()} == {3, 5}
+
+
+@pytest.mark.asyncio
+async def test_user_etag_changes_after_update(client: AsyncClient, test_user_data: dict):
+    """Test that updating a user invalidates its ETag"""
+    headers = await login(client, test_user_data)
+    user_id = (await client.get("/users/me", headers=headers)).json()["id"]
+
+    response = await client.get(f"/users/{user_id}", headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    response = await client.get(f"/users/{user_id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    await client.put("/users/me", headers=headers, json={"full_name": "Renamed"})
+    response = await client.get(f"/users/{user_id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Renamed"
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_user_conditional_get_requires_auth(client: AsyncClient, test_user_data: dict):
+    """Test that a 304 is never sent to unauthenticated clients"""
+    headers = await login(client, test_user_data)
+    user_id = (await client.get("/users/me", headers=headers)).json()["id"]
+    etag = (await client.get(f"/users/{user_id}", headers=headers)).headers["etag"]
+
+    response = await client.get(f"/users/{user_id}", headers={"If-None-Match": etag})
+    assert response.status_code in (401, 403)
@@ -0,0 +1,119 @@
+"""
+Test read-only sessions and read replica routing
+"""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from unittest.mock import patch
+
+from app.main import app
+from app.core.config import settings
+from app.db import session as session_module
+from app.db.redis import get_redis
+from app.db.session import ReadOnlySession, get_db, get_read_db
+from app.models.joke import Joke
+from tests.conftest import test_engine
+
+
+def read_session_maker():
+    return async_sessionmaker(
+        test_engine,
+        class_=AsyncSession,
+        sync_session_class=ReadOnlySession,
+        expire_on_commit=False,
+    )
+
+
+@pytest.fixture
+async def routed(client: AsyncClient, fake_redis):
+    """
+    Use the real session dependencies against the test database, with a
+    stand-in replica engine
+    Yields the list of read session targets ("replica" or "primary")
+    """
+    targets = []
+
+    def recording(target):
+        session_maker = read_session_maker()
+
+        def factory():
+            targets.append(target)
+            return session_maker()
+        return factory
+
+    app.dependency_overrides.pop(get_db)
+    app.dependency_overrides.pop(get_read_db)
+    with patch.multiple(
+        session_module,
+        read_engine=object(),
+        AsyncSessionLocal=async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False),
+        AsyncReadSessionLocal=recording("replica"),
+        AsyncPrimaryReadSessionLocal=recording("primary"),
+    ):
+        yield targets
+
+
+@pytest.mark.asyncio
+async def test_read_only_session_refuses_writes(db_session):
+    """Test that read-only sessions cannot flush"""
+    async with read_session_maker()() as session:
+        session.add(Joke(setup="s", punchline="p", joke_type="general"))
+        with pytest.raises(InvalidRequestError):
+            await session.flush()
+
+
+@pytest.mark.asyncio
+async def test_reads_follow_own_writes(client: AsyncClient, routed: list, fake_redis, test_user_data: dict):
+    """Test that reads go to the primary only shortly after the client's writes"""
+    await client.post("/auth/register", json=test_user_data)
+    response = await client.post("/auth/login", json={
+        "username": test_user_data["username"],
+        "password": test_user_data["password"],
+    })
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    # Anonymous writes mark the client address
+    assert (await client.get("/users/me", headers=headers)).status_code == 200
+    assert routed == ["primary"]
+
+    await fake_redis.flushall()
+    assert (await client.get("/users/me", headers=headers)).status_code == 200
+    assert routed[-1] == "replica"
+
+    # Authenticated writes mark the user
+    await client.put("/users/me", headers=headers, json={"full_name": "Renamed"})
+    user_keys = await fake_redis.keys("db:recent-write:user:*")
+    assert len(user_keys) == 1
+    assert 0 < await fake_redis.pttl(user_keys[0]) <= 5000
+
+    response = await client.get("/users/me", headers=headers)
+    assert response.json()["full_name"] == "Renamed"
+    assert routed[-1] == "primary"
+
+
+@pytest.mark.asyncio
+async def test_reads_use_primary_without_redis(client: AsyncClient, routed: list):
+    """Test that recent writes cannot be ruled out without Redis"""
+    app.dependency_overrides[get_redis] = lambda: None
+
+    assert (await client.get("/jokes/")).status_code == 200
+    assert routed == ["primary"]
+
+
+@pytest.mark.asyncio
+async def test_anonymous_writes_mark_forwarded_client(
+    client: AsyncClient, routed: list, fake_redis, test_user_data: dict
+):
+    """Test that behind a proxy one client's registration does not send everyone to the primary"""
+    def through_proxy(address: str) -> dict:
+        return {"X-Forwarded-For": address}
+
+    with patch.object(settings, "TRUSTED_PROXIES", ["127.0.0.1"]):
+        await client.post("/auth/register", json=test_user_data, headers=through_proxy("203.0.113.7"))
+        assert await fake_redis.keys("db:recent-write:*") == ["db:recent-write:ip:203.0.113.7"]
+
+        await client.get("/jokes/", headers=through_proxy("203.0.113.8"))
+        await client.get("/jokes/", headers=through_proxy("203.0.113.7"))
+
+    assert routed == ["replica", "primary"]
@@ -1,8 +1,16 @@
 """
 Test health check endpoints
 """
+import asyncio
 import pytest
+import fakeredis
 from httpx import AsyncClient
+from unittest.mock import patch
+
+from app.main import app
+from app.core.config import settings
+from app.core.health import HealthProber, get_prober
+from tests.conftest import test_engine
 
 
 @pytest.mark.asyncio
@@ -26,3 +34,111 @@ async def test_root_endpoint(client: AsyncClient):
     assert "message" in data
     assert "version" in data
     assert "docs" in data
+
+
+@pytest.mark.asyncio
+async def test_metrics_labelled_by_route_template(client: AsyncClient):
+    """Test that request metrics use the route template, not the raw path"""
+    await client.get("/jokes/12345")
+    
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    body = response.text
+    assert 'endpoint="/jokes/{joke_id}"' in body
+    assert 'endpoint="/jokes/12345"' not in body
+
+
+@pytest.mark.asyncio
+async def test_liveness(client: AsyncClient):
+    """Test that liveness does not depend on anything"""
+    response = await client.get("/livez")
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
+
+
+@pytest.mark.asyncio
+async def test_readiness_reports_checks_and_pool(client: AsyncClient):
+    """Test readiness payload"""
+    response = await client.get("/readyz")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ready"
+    assert data["checks"]["database"]["status"] == "ok"
+    assert data["checks"]["redis"]["status"] == "disabled"
+    assert data["pool"]["pool"] == "StaticPool"
+
+
+@pytest.mark.asyncio
+async def test_readiness_served_from_cache(client: AsyncClient):
+    """Test that repeated probes reuse the last check"""
+    prober = app.dependency_overrides[get_prober]()
+    
+    with patch.object(prober, "check_database", wraps=prober.check_database) as check:
+        for _ in range(5):
+            assert (await client.get("/readyz")).status_code == 200
+            assert (await client.get("/health")).status_code == 200
+    
+    assert check.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_readiness_fails_when_database_down(client: AsyncClient):
+    """Test that a failed database check makes the service unready"""
+    prober = app.dependency_overrides[get_prober]()
+    
+    with patch.object(prober, "check_database", side_effect=OSError("connection refused")):
+        await prober.probe()
+    
+    response = await client.get("/readyz")
+    assert response.status_code == 503
+    data = response.json()
+    assert data["status"] == "unavailable"
+    assert data["checks"]["database"]["error"] == "connection refused"
+    assert (await client.get("/health")).json()["status"] == "unhealthy"
+    assert (await client.get("/livez")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_prober_checks_redis(db_session):
+    """Test Redis check, timeout and draining"""
+    redis = fakeredis.FakeAsyncRedis()
+    prober = HealthProber(test_engine, lambda: redis, interval=60, timeout=0.05)
+    
+    results = await prober.probe()
+    assert results["redis"].status == "ok"
+    assert prober.is_ready(results)
+    
+    async def hang():
+        await asyncio.sleep(1)
+    
+    with patch.object(redis, "ping", hang):
+        results = await prober.probe()
+    assert results["redis"].status == "error"
+    # Redis is optional unless HEALTH_REQUIRE_REDIS is set
+    assert prober.is_ready(results)
+    with patch.object(settings, "HEALTH_REQUIRE_REDIS", True):
+        assert not prober.is_ready(results)
+    
+    prober.start()
+    await prober.stop()
+    assert not prober.is_ready(await prober.results())
+    await redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_readiness_requires_replica(db_session):
+    """Test that a configured read replica is checked and required for readiness"""
+    prober = HealthProber(test_engine, lambda: None, interval=60, replica_engine=test_engine)
+    
+    results = await prober.probe()
+    assert results["replica"].status == "ok"
+    assert prober.is_ready(results)
+    
+    with patch.object(prober, "check_replica", side_effect=OSError("replica down")):
+        results = await prober.probe()
+    assert results["database"].healthy
+    assert results["replica"].error == "replica down"
+    assert not prober.is_ready(results)
+    
+    # Without a replica there is nothing to check
+    assert "replica" not in await HealthProber(test_engine, lambda: None).probe()
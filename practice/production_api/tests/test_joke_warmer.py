@@ -0,0 +1,108 @@
+"""
+Test the background joke cache warmer
+"""
+from unittest.mock import patch
+
+import httpx
+import pytest
+from httpx import AsyncClient
+from pydantic import ValidationError
+from sqlalchemy import func, select
+
+from app.main import app
+from app.core.config import Settings, settings
+from app.core.http_client import create_http_client, get_http_client
+from app.models.joke import Joke, hash_setup
+from app.schemas.joke import JokeSimpleResponse
+from app.services.joke_pool import JokePool
+from app.services.joke_warmer import JokeWarmer
+from app.worker import celery_app, warm_joke_cache
+
+
+@pytest.mark.asyncio
+async def test_warm_tops_up_fresh_jokes(db_session, fake_redis, joke_api, statements):
+    """Test that the warmer fills the fresh list, the database and the pool"""
+    http_client = app.dependency_overrides[get_http_client]()
+    with patch.object(settings, "JOKE_WARMER_TARGET", 3), \
+            patch.object(settings, "JOKE_API_RATE_LIMIT", 1000):
+        assert await JokeWarmer.warm(db_session, fake_redis, http_client) == 3
+        # Already at target: nothing more to fetch
+        assert await JokeWarmer.warm(db_session, fake_redis, http_client) == 0
+    
+    assert len(joke_api) == 3
+    assert await JokePool.fresh_count(fake_redis) == 3
+    assert await fake_redis.scard(JokePool.KEY) == 1
+    # The stand-in API always returns the same joke; it is stored once
+    assert await db_session.scalar(select(func.count()).select_from(Joke)) == 1
+    joke = await db_session.scalar(select(Joke))
+    assert joke.setup_hash == hash_setup(joke.setup)
+    # Repeats are found through the indexed hash, not by comparing setups
+    assert any("jokes.setup_hash IN" in statement for statement in statements)
+
+
+def test_rate_limit_must_be_positive():
+    """Test that a zero upstream rate limit is rejected at startup"""
+    with pytest.raises(ValidationError):
+        Settings(JOKE_API_RATE_LIMIT=0)
+
+
+@pytest.mark.asyncio
+async def test_warm_stops_on_upstream_rate_limit(db_session, fake_redis):
+    """Test that the warmer backs off when the upstream API rejects requests"""
+    requests = []
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(429)
+    
+    http_client = create_http_client(transport=httpx.MockTransport(handler))
+    with patch.object(settings, "JOKE_API_RATE_LIMIT", 1000):
+        assert await JokeWarmer.warm(db_session, fake_redis, http_client) == 0
+    await http_client.aclose()
+    
+    assert len(requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_random_joke_never_calls_upstream(client: AsyncClient, fake_redis, joke_api):
+    """Test that handlers use the fresh list and only request refills when the warmer is on"""
+    with patch.object(settings, "JOKE_WARMER_ENABLED", True), \
+            patch("app.services.joke_warmer._enqueue_refill") as enqueue:
+        empty = await client.get("/jokes/random?use_cache=false")
+        await JokePool.push_fresh(fake_redis, [
+            JokeSimpleResponse(setup="Fresh setup", punchline="Fresh punchline")
+        ])
+        fresh = await client.get("/jokes/random?use_cache=false")
+    
+    assert empty.status_code == 503
+    assert "retry-after" in empty.headers
+    assert fresh.status_code == 200
+    assert fresh.json()["setup"] == "Fresh setup"
+    assert joke_api == []
+    assert enqueue.call_count == 1
+    assert await fake_redis.exists(JokeWarmer.REQUEST_KEY)
+
+
+def test_warm_task_runs_eagerly():
+    """Test the Celery task in eager mode without a broker"""
+    # asyncio.run is patched so the test session's event loop is left alone
+    celery_app.conf.task_always_eager = True
+    try:
+        with patch("app.worker.asyncio.run", return_value=2) as run:
+            assert warm_joke_cache.delay().get() == 2
+    finally:
+        celery_app.conf.task_always_eager = settings.CELERY_TASK_ALWAYS_EAGER
+    
+    run.call_args.args[0].close()
+
+
+def test_scheduled_warm_is_jittered():
+    """Test that scheduled runs re-enqueue themselves with a random delay"""
+    with patch.object(warm_joke_cache, "apply_async") as apply_async, \
+            patch("app.worker.asyncio.run") as run:
+        assert warm_joke_cache.run() is None
+    
+    countdown = apply_async.call_args.kwargs["countdown"]
+    assert 0 <= countdown <= settings.JOKE_WARMER_JITTER
+    assert apply_async.call_args.kwargs["kwargs"] == {"jitter": False}
+    run.assert_not_called()
@@ -2,31 +2,39 @@
 Test joke endpoints
 """
 import pytest
+import fakeredis
+from datetime import datetime, timezone
 from httpx import AsyncClient
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch
+
+from app.main import app
+from app.core.config import settings
+from app.db.redis import get_redis
+from app.models.joke import Joke
+from app.services.joke_pool import JokePool
+from app.services.joke_service import JokeService
 
 
 @pytest.mark.asyncio
-async def test_get_random_joke(client: AsyncClient):
+async def test_get_random_joke(client: AsyncClient, joke_api: list):
     """Test getting a random joke"""
-    # Mock the external API
-    mock_joke = {
-        "setup": "Why did the chicken cross the road?",
-        "punchline": "To get to the other side!",
-        "type": "general"
-    }
-    
-    with patch("app.services.joke_service.httpx.AsyncClient") as mock_client:
-        mock_response = AsyncMock()
-        mock_response.json.return_value = mock_joke
-        mock_response.raise_for_status = AsyncMock()
-        mock_client.return_value.__aenter__.return_value.get.return_value = mock_response
-        
-        response = await client.get("/jokes/random")
+    response = await client.get("/jokes/random")
+    assert response.status_code == 200
+    data = response.json()
+    assert "setup" in data
+    assert "punchline" in data
+    assert len(joke_api) == 1
+
+
+@pytest.mark.asyncio
+async def test_random_joke_uses_shared_http_client(client: AsyncClient, joke_api: list):
+    """Test that uncached requests go through the injected HTTP client"""
+    for _ in range(3):
+        response = await client.get("/jokes/random", params={"use_cache": False})
         assert response.status_code == 200
-        data = response.json()
-        assert "setup" in data
-        assert "punchline" in data
+    
+    assert len(joke_api) == 3
+    assert all(request.url.path == "/random_joke" for request in joke_api)
 
 
 @pytest.mark.asyncio
@@ -43,3 +51,106 @@ async def test_get_joke_by_id_not_found(client: AsyncClient):
     """Test getting non-existent joke"""
     response = await client.get("/jokes/99999")
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_random_joke_served_from_pool(client: AsyncClient, fake_redis):
+    """Test that a pooled joke is served without touching the database"""
+    pooled = '{"setup": "Pooled setup", "punchline": "Pooled punchline", "type": "general"}'
+    await fake_redis.sadd(JokePool.KEY, pooled)
+    
+    with patch.object(JokeService, "get_random_cached_jokes") as mock_db:
+        response = await client.get("/jokes/random")
+    
+    assert response.status_code == 200
+    assert response.json()["setup"] == "Pooled setup"
+    mock_db.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_random_joke_refills_pool(client: AsyncClient, db_session, fake_redis):
+    """Test that an empty pool is refilled from the database with a TTL"""
+    db_session.add_all([
+        Joke(setup=f"Setup {i}", punchline=f"Punchline {i}", joke_type="general")
+        for i in range(3)
+    ])
+    await db_session.commit()
+    
+    response = await client.get("/jokes/random")
+    
+    assert response.status_code == 200
+    assert await fake_redis.scard(JokePool.KEY) == 3
+    assert 0 < await fake_redis.ttl(JokePool.KEY) <= settings.REDIS_CACHE_TTL
+
+
+@pytest.mark.asyncio
+async def test_random_joke_falls_back_when_redis_down(client: AsyncClient, db_session):
+    """Test that the database cache is used when Redis is unavailable"""
+    db_session.add(Joke(setup="DB setup", punchline="DB punchline", joke_type="general"))
+    await db_session.commit()
+    
+    server = fakeredis.FakeServer()
+    server.connected = False
+    app.dependency_overrides[get_redis] = lambda: fakeredis.FakeAsyncRedis(server=server)
+    
+    response = await client.get("/jokes/random")
+    
+    assert response.status_code == 200
+    assert response.json()["setup"] == "DB setup"
+
+
+@pytest.mark.asyncio
+async def test_random_cached_joke_handles_id_gaps(db_session):
+    """Test that random sampling always finds a joke when IDs have gaps"""
+    db_session.add_all([
+        Joke(id=joke_id, setup=f"Setup {joke_id}", punchline="Punchline")
+        for joke_id in (1, 50, 100)
+    ])
+    await db_session.commit()
+    
+    for _ in range(20):
+        joke = await JokeService.get_random_cached_joke(db_session)
+        assert joke.id in (1, 50, 100)
+    
+    jokes = await JokeService.get_random_cached_jokes(db_session, limit=2)
+    assert 1 <= len(jokes) <= 2
+    assert {joke.id for joke in jokes} <= {1, 50, 100}
+
+
+@pytest.mark.asyncio
+async def test_random_cached_joke_empty(db_session):
+    """Test random sampling on an empty cache"""
+    assert await JokeService.get_random_cached_joke(db_session) is None
+    assert await JokeService.get_random_cached_jokes(db_session, limit=10) == []
+
+
+@pytest.mark.asyncio
+async def test_list_jokes_cursor_pagination(client: AsyncClient, db_session):
+    """Test walking all jokes with keyset cursors"""
+    created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    db_session.add_all([
+        Joke(setup=f"Setup {i}", punchline="Punchline", created_at=created_at)
+        for i in range(5)
+    ])
+    await db_session.commit()
+    
+    seen = []
+    cursor = ""
+    while True:
+        response = await client.get("/jokes/", params={"cursor": cursor, "limit": 2})
+        assert response.status_code == 200
+        page = response.json()
+        seen.extend(item["id"] for item in page["items"])
+        if not page["has_more"]:
+            assert page["next_cursor"] is None
+            break
+        cursor = page["next_cursor"]
+    
+    assert seen == [5, 4, 3, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_list_jokes_invalid_cursor(client: AsyncClient):
+    """Test that a malformed cursor is rejected"""
+    response = await client.get("/jokes/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
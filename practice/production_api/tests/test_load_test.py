@@ -0,0 +1,70 @@
+"""
+Test the load test harness
+"""
+import argparse
+import pytest
+
+from benchmarks.load_test import (
+    budgets_from,
+    check_budgets,
+    create_users,
+    inprocess_client,
+    parse_mix,
+    percentile,
+    run_load,
+)
+
+
+def test_percentile_nearest_rank():
+    """Test nearest-rank percentiles"""
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([7.0], 95) == 7.0
+    assert percentile([], 95) == 0.0
+
+
+def test_parse_mix():
+    """Test scenario weight parsing"""
+    assert parse_mix("me=3, list_jokes") == {"me": 3, "list_jokes": 1}
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("unknown=1")
+
+
+def test_check_budgets():
+    """Test that budgets flag slow, slow-throughput and failing runs"""
+    summary = {
+        "me": {"count": 100, "errors": 0, "rps": 50.0, "p50_ms": 10.0, "p95_ms": 40.0, "p99_ms": 80.0},
+        "overall": {"count": 100, "errors": 2, "rps": 50.0, "p50_ms": 10.0, "p95_ms": 40.0, "p99_ms": 80.0},
+    }
+    assert check_budgets(summary, {"me": {"p95_ms": 50, "max_error_rate": 0.0}}) == []
+    assert check_budgets(summary, {"login": {"p95_ms": 1}}) == []
+
+    violations = check_budgets(summary, {
+        "me": {"p99_ms": 50},
+        "overall": {"min_rps": 100, "max_error_rate": 0.0},
+    })
+    assert len(violations) == 3
+    assert violations[0].startswith("me: p99_ms")
+
+
+def test_budgets_from_worst_run():
+    """Test that budgets start from the worst baseline run"""
+    fast = {"overall": {"rps": 100.0, "p50_ms": 10.0, "p95_ms": 50.0, "p99_ms": 90.0}}
+    slow = {"overall": {"rps": 80.0, "p50_ms": 20.0, "p95_ms": 40.0, "p99_ms": 100.0}}
+
+    assert budgets_from([fast, slow], headroom=1.5) == {
+        "overall": {"p50_ms": 30.0, "p95_ms": 75.0, "p99_ms": 150.0, "max_error_rate": 0.0, "min_rps": 53.3},
+    }
+
+
+@pytest.mark.asyncio
+async def test_inprocess_load_run():
+    """Smoke test the in-process run against the whole application"""
+    async with inprocess_client("sqlite+aiosqlite:///:memory:", jokes=10) as client:
+        users = await create_users(client, 1)
+        summary = await run_load(client, users, {"me": 1, "list_jokes": 1, "random_joke": 1}, 30, 3)
+
+    assert summary["overall"]["count"] == 30
+    assert summary["overall"]["errors"] == 0
+    assert summary["overall"]["p99_ms"] >= summary["overall"]["p50_ms"] > 0
@@ -0,0 +1,116 @@
+"""
+Test request-scoped DataLoader batching
+"""
+import asyncio
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.loader import DataLoader, session_loader
+from app.models.joke import Joke
+from app.models.user import User
+from app.services.joke_service import JokeService
+from app.services.user_service import UserService
+from tests.conftest import TestSessionLocal
+
+
+def selects(statements: list) -> int:
+    return len([s for s in statements if s.lstrip().upper().startswith("SELECT")])
+
+
+async def create_users(db_session: AsyncSession, count: int) -> list:
+    users = [
+        User(email=f"user{i}@example.com", username=f"user{i}", hashed_password="x")
+        for i in range(count)
+    ]
+    db_session.add_all(users)
+    await db_session.commit()
+    return [user.id for user in users]
+
+
+@pytest.mark.asyncio
+async def test_same_tick_lookups_share_one_query(db_session: AsyncSession, statements: list):
+    """Test that concurrent lookups, including repeats, are resolved with one query"""
+    user_ids = await create_users(db_session, 3)
+
+    async with TestSessionLocal() as session:
+        statements.clear()
+        users = await asyncio.gather(
+            UserService.get_user_by_id(session, user_ids[0]),
+            UserService.get_user_by_id(session, user_ids[2]),
+            UserService.get_user_by_id(session, user_ids[0]),
+            UserService.get_user_by_id(session, 99999),
+        )
+
+    assert [user.username if user else None for user in users] == ["user0", "user2", "user0", None]
+    assert users[0] is users[2]
+    assert selects(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_loaded_rows_are_not_queried_again(db_session: AsyncSession, statements: list):
+    """Test that a row the session already holds is served from its identity map"""
+    user_id, = await create_users(db_session, 1)
+
+    async with TestSessionLocal() as session:
+        statements.clear()
+        first = await UserService.get_user_by_id(session, user_id)
+        second = await UserService.get_user_by_id(session, user_id)
+
+    assert first is second
+    assert selects(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_jokes_are_batched(db_session: AsyncSession, statements: list):
+    """Test that joke lookups use their own loader"""
+    jokes = [Joke(setup=f"Setup {i}", punchline="Punchline") for i in range(2)]
+    db_session.add_all(jokes)
+    await db_session.commit()
+
+    async with TestSessionLocal() as session:
+        statements.clear()
+        loaded = await asyncio.gather(*(JokeService.get_joke_by_id(session, joke.id) for joke in jokes))
+
+    assert [joke.setup for joke in loaded] == ["Setup 0", "Setup 1"]
+    assert selects(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_loaders_are_per_session(db_session: AsyncSession):
+    """Test that each session gets its own loaders"""
+    async with TestSessionLocal() as first, TestSessionLocal() as second:
+        loader = session_loader(first, "user", UserService.get_users_by_ids)
+        assert session_loader(first, "user", UserService.get_users_by_ids) is loader
+        assert session_loader(second, "user", UserService.get_users_by_ids) is not loader
+
+
+@pytest.mark.asyncio
+async def test_batch_error_reaches_every_caller():
+    """Test that a failing batch raises in every waiting caller"""
+    async def fail(keys):
+        raise RuntimeError("database down")
+
+    loader = DataLoader("test", fail)
+    results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_others():
+    """Test that other callers still get the key's value when one is cancelled"""
+    batches = []
+
+    async def batch(keys):
+        batches.append(keys)
+        await asyncio.sleep(0.01)
+        return [key * 10 for key in keys]
+
+    loader = DataLoader("test", batch)
+    cancelled = asyncio.ensure_future(loader.load(1))
+    other = asyncio.ensure_future(loader.load(1))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    assert await other == 10
+    assert batches == [[1]]
@@ -0,0 +1,142 @@
+"""
+Test logging pipeline
+"""
+import io
+import json
+import logging
+import os
+import queue
+import pytest
+from unittest.mock import patch
+
+from app.core.config import settings
+from app.core.logging import (
+    BatchLogWriter,
+    DroppingQueueHandler,
+    setup_logging,
+    should_log_request,
+    stop_logging,
+    get_logger,
+)
+
+
+def test_queue_handler_drops_when_full():
+    """Test that records are dropped instead of blocking when the queue is full"""
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "message", None, None)
+    
+    handler.emit(record)
+    handler.emit(record)
+    
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+
+
+def test_batch_writer_renders_json_lines():
+    """Test that queued structlog events are rendered as JSON by the writer thread"""
+    stream = io.StringIO()
+    with patch.object(settings, "LOG_ASYNC", True), patch.object(settings, "LOG_FORMAT", "json"):
+        setup_logging(stream)
+        get_logger("test").info("Hello", answer=42)
+        setup_logging()  # Flushes and replaces the test writer
+    
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    event = next(line for line in lines if line["event"] == "Hello")
+    assert event["answer"] == 42
+    assert event["level"] == "info"
+
+
+@pytest.mark.parametrize("log_async", [True, False])
+def test_stdlib_exception_keeps_traceback(log_async):
+    """Test that logger.exception() from a plain stdlib logger renders the traceback text"""
+    stream = io.StringIO()
+    with patch.object(settings, "LOG_ASYNC", log_async), patch.object(settings, "LOG_FORMAT", "json"):
+        setup_logging(stream)
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            logging.getLogger("uvicorn.error").exception("Request failed")
+        setup_logging()
+    
+    event = next(
+        event for event in map(json.loads, stream.getvalue().splitlines())
+        if event["event"] == "Request failed"
+    )
+    assert "Traceback (most recent call last)" in event["exception"]
+    assert "RuntimeError: boom" in event["exception"]
+    assert "exc_info" not in event
+
+
+def test_batch_writer_stops_after_flush():
+    """Test that stopping the writer flushes everything queued before it"""
+    stream = io.StringIO()
+    record_queue = queue.Queue()
+    writer = BatchLogWriter(record_queue, logging.Formatter("%(message)s"), stream, batch_size=2)
+    writer.start()
+    for i in range(5):
+        record_queue.put(logging.LogRecord("test", logging.INFO, __file__, 1, f"line {i}", None, None))
+    writer.stop()
+    
+    assert stream.getvalue().splitlines() == [f"line {i}" for i in range(5)]
+    assert not writer.is_alive()
+
+
+def test_request_log_sampling():
+    """Test that only configured paths are sampled"""
+    with patch.object(settings, "LOG_REQUEST_SAMPLE_RATE", 0.0), \
+            patch.object(settings, "LOG_SAMPLED_PATHS", ["/health"]):
+        assert not should_log_request("/health")
+        assert should_log_request("/jokes/random")
+    
+    assert should_log_request("/health")
+
+
+def test_sync_logging_writes_inline():
+    """Test that events are written before the log call returns when LOG_ASYNC is off"""
+    stream = io.StringIO()
+    with patch.object(settings, "LOG_ASYNC", False), patch.object(settings, "LOG_FORMAT", "json"):
+        setup_logging(stream)
+        get_logger("test").warning("Inline", answer=42)
+        output = stream.getvalue()
+        setup_logging()
+    
+    event = json.loads(output.splitlines()[-1])
+    assert event["event"] == "Inline"
+    assert event["level"] == "warning"
+
+
+def test_logging_after_stop_is_written_inline():
+    """Test that events logged after shutdown are written synchronously, not dropped"""
+    stream = io.StringIO()
+    with patch.object(settings, "LOG_ASYNC", True), patch.object(settings, "LOG_FORMAT", "json"):
+        setup_logging(stream)
+        get_logger("test").info("Before stop")
+        stop_logging()
+        get_logger("test").info("After stop")
+        logging.getLogger("uvicorn.error").warning("Late stdlib warning")
+        output = stream.getvalue()
+        setup_logging()
+    
+    events = [json.loads(line)["event"] for line in output.splitlines()]
+    assert events[-3:] == ["Before stop", "After stop", "Late stdlib warning"]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_forked_child_writes_logs(tmp_path):
+    """Test that a process forked after setup (e.g. a prefork worker) still writes its logs"""
+    path = tmp_path / "log.jsonl"
+    with open(path, "w") as stream, patch.object(settings, "LOG_ASYNC", True), \
+            patch.object(settings, "LOG_FORMAT", "json"):
+        setup_logging(stream)
+        pid = os.fork()
+        if pid == 0:
+            try:
+                get_logger("test").info("From child")
+                stop_logging()
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        setup_logging()
+    
+    events = [json.loads(line)["event"] for line in path.read_text().splitlines()]
+    assert "From child" in events
@@ -0,0 +1,61 @@
+"""
+Test Prometheus metrics aggregated across worker processes
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+prometheus_client = pytest.importorskip("prometheus_client")
+from prometheus_client.parser import text_string_to_metric_families
+
+ROOT = Path(__file__).resolve().parent.parent
+
+WORKER = """
+from app.core.metrics import DB_POOL_CHECKED_OUT, REQUEST_COUNT, mark_process_dead
+REQUEST_COUNT.labels(method="GET", endpoint="/jokes/", status="200").inc()
+DB_POOL_CHECKED_OUT.set(3)
+if {shutdown}:
+    mark_process_dead()
+"""
+
+RENDER = """
+from app.core.metrics import mark_dead_workers, render_metrics
+if {reap}:
+    print("dead", mark_dead_workers())
+print(render_metrics()[0].decode())
+"""
+
+
+def run(tmp_path: Path, code: str) -> str:
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return result.stdout
+
+
+def samples(output: str) -> dict:
+    text = "\n".join(line for line in output.splitlines() if not line.startswith("dead"))
+    return {
+        sample.name: sample.value
+        for family in text_string_to_metric_families(text)
+        for sample in family.samples
+        if sample.name in ("http_requests_total", "db_pool_checked_out")
+    }
+
+
+def test_metrics_from_two_workers(tmp_path: Path):
+    """Test that counters add up across workers and dead workers' live gauges are dropped"""
+    run(tmp_path, WORKER.format(shutdown=True))
+    run(tmp_path, WORKER.format(shutdown=False))  # exits without the shutdown hook
+
+    before = samples(run(tmp_path, RENDER.format(reap=False)))
+    assert before == {"http_requests_total": 2.0, "db_pool_checked_out": 3.0}
+
+    after = run(tmp_path, RENDER.format(reap=True))
+    assert "dead [" in after and "dead []" not in after
+    # The rendering process itself reports a live gauge of 0
+    assert samples(after) == {"http_requests_total": 2.0, "db_pool_checked_out": 0.0}
@@ -0,0 +1,36 @@
+"""
+Test request logging middleware
+"""
+import pytest
+from fastapi import FastAPI, Request
+from httpx import AsyncClient
+
+from app.middleware import RequestLoggingMiddleware
+
+
+@pytest.mark.asyncio
+async def test_request_id_header(client: AsyncClient):
+    """Test that every response carries an X-Request-ID header"""
+    response = await client.get("/")
+    assert response.status_code == 200
+    assert response.headers.get("X-Request-ID")
+
+
+@pytest.mark.asyncio
+async def test_unhandled_exception_returns_500():
+    """Test that unhandled exceptions are turned into a JSON 500 response"""
+    app = FastAPI()
+    app.add_middleware(RequestLoggingMiddleware)
+
+    @app.get("/boom")
+    async def boom(request: Request):
+        assert request.state.request_id
+        raise RuntimeError("boom")
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/boom")
+
+    assert response.status_code == 500
+    data = response.json()
+    assert data["detail"] == "Internal server error"
+    assert data["request_id"] == response.headers["X-Request-ID"]
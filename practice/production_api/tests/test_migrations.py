@@ -0,0 +1,26 @@
+"""
+Test that the migrations match the models
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def alembic(tmp_path: Path, *args: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "DATABASE_URL": f"sqlite+aiosqlite:///{tmp_path / 'migrated.db'}"}
+    return subprocess.run(
+        [sys.executable, "-m", "alembic", *args], cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+
+
+def test_migrated_database_matches_models(tmp_path: Path):
+    """Test that autogenerate finds nothing to do after upgrading, FTS tables included"""
+    upgrade = alembic(tmp_path, "upgrade", "head")
+    assert upgrade.returncode == 0, upgrade.stderr
+
+    check = alembic(tmp_path, "check")
+    assert check.returncode == 0, check.stderr
+    assert "No new upgrade operations detected" in check.stdout + check.stderr
@@ -0,0 +1,155 @@
+"""
+Test rate limiting
+"""
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.db.session import get_read_db
+from app.core.config import settings
+from app.core.rate_limit import MemoryRateLimiter, RedisRateLimiter, reset_rate_limiter
+from app.core.security import create_access_token
+from app.middleware import RateLimitMiddleware
+
+
+@pytest.mark.asyncio
+async def test_memory_limiter_rejects_over_limit():
+    """Test that a key is rejected once it exceeds the limit"""
+    limiter = MemoryRateLimiter(limit=3)
+    with patch("app.core.rate_limit.time.time", return_value=600.0):
+        results = [await limiter.hit("ip:1.2.3.4") for _ in range(4)]
+        other = await limiter.hit("ip:5.6.7.8")
+
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert results[2].remaining == 0
+    assert results[3].retry_after == 60
+    assert other.allowed
+
+
+@pytest.mark.asyncio
+async def test_memory_limiter_weighs_previous_window():
+    """Test that the previous window still counts early in the next one"""
+    limiter = MemoryRateLimiter(limit=4)
+    with patch("app.core.rate_limit.time.time", return_value=630.0):
+        for _ in range(4):
+            await limiter.hit("key")
+
+    # A quarter into the next window, 3 of the previous 4 hits still count
+    with patch("app.core.rate_limit.time.time", return_value=675.0):
+        assert (await limiter.hit("key")).allowed
+        assert not (await limiter.hit("key")).allowed
+
+    # Two windows later the key starts fresh
+    with patch("app.core.rate_limit.time.time", return_value=800.0):
+        assert (await limiter.hit("key")).remaining == 3
+
+
+@pytest.mark.asyncio
+async def test_redis_limiter_shared_between_workers():
+    """Test that limiters in different workers share counters through Redis"""
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    worker_a = RedisRateLimiter(limit=2, get_client=lambda: redis)
+    worker_b = RedisRateLimiter(limit=2, get_client=lambda: redis)
+
+    assert (await worker_a.hit("user:1")).allowed
+    assert (await worker_b.hit("user:1")).allowed
+    assert not (await worker_a.hit("user:1")).allowed
+
+    await redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_redis_limiter_allows_when_redis_down():
+    """Test that requests are allowed when Redis is unavailable"""
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True, connected=False)
+    limiter = RedisRateLimiter(limit=1, get_client=lambda: redis)
+
+    assert all([(await limiter.hit("key")).allowed for _ in range(3)])
+    assert (await RedisRateLimiter(limit=1, get_client=lambda: None).hit("key")).allowed
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_rejects_before_db(client: AsyncClient, db_session):
+    """Test that rejected requests get 429 without opening a DB session"""
+    sessions = []
+
+    async def counting_get_db():
+        sessions.append(1)
+        yield db_session
+
+    with patch.object(settings, "RATE_LIMIT_PER_MINUTE", 1):
+        reset_rate_limiter()
+        app.dependency_overrides[get_read_db] = counting_get_db
+        await client.get("/jokes/1")
+        response = await client.get("/jokes/1")
+        reset_rate_limiter()
+
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+    assert response.headers["x-ratelimit-remaining"] == "0"
+    assert "x-request-id" in response.headers
+    assert len(sessions) == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_keyed_by_user(client: AsyncClient):
+    """Test that authenticated users get their own budget and health is exempt"""
+    alice = create_access_token({"sub": "alice", "user_id": 1})
+    bob = create_access_token({"sub": "bob", "user_id": 2})
+
+    with patch.object(settings, "RATE_LIMIT_PER_MINUTE", 1):
+        reset_rate_limiter()
+        statuses = [
+            (await client.get("/health", headers={"Authorization": f"Bearer {token}"})).status_code
+            for token in (alice, alice)
+        ]
+        first = await client.get("/users/me", headers={"Authorization": f"Bearer {alice}"})
+        second = await client.get("/users/me", headers={"Authorization": f"Bearer {alice}"})
+        other = await client.get("/users/me", headers={"Authorization": f"Bearer {bob}"})
+        reset_rate_limiter()
+
+    assert statuses == [200, 200]
+    assert first.status_code != 429
+    assert second.status_code == 429
+    assert other.status_code != 429
+
+
+def scope_from(peer: str, *headers) -> dict:
+    return {"client": (peer, 51000), "headers": [(name, value) for name, value in headers]}
+
+
+def test_client_key_behind_trusted_proxy():
+    """Test that forwarded addresses are used only when the peer is a trusted proxy"""
+    forwarded = (b"x-forwarded-for", b"203.0.113.7, 10.0.0.2")
+    with patch.object(settings, "TRUSTED_PROXIES", ["10.0.0.0/24"]):
+        assert RateLimitMiddleware.client_key(scope_from("10.0.0.1", forwarded)) == "ip:203.0.113.7"
+        # A client cannot pose as someone else by sending the header itself
+        assert RateLimitMiddleware.client_key(scope_from("198.51.100.1", forwarded)) == "ip:198.51.100.1"
+        assert RateLimitMiddleware.client_key(
+            scope_from("10.0.0.1", (b"x-real-ip", b"203.0.113.9"))
+        ) == "ip:203.0.113.9"
+
+    assert RateLimitMiddleware.client_key(scope_from("10.0.0.1", forwarded)) == "ip:10.0.0.1"
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_per_client_through_proxy(client: AsyncClient):
+    """Test that anonymous clients behind the proxy do not share one budget"""
+    def through_proxy(address: str) -> dict:
+        return {"X-Forwarded-For": address, "X-Real-IP": address}
+
+    # The test client connects from 127.0.0.1, standing in for nginx
+    with patch.object(settings, "TRUSTED_PROXIES", ["127.0.0.1"]), \
+            patch.object(settings, "RATE_LIMIT_PER_MINUTE", 1):
+        reset_rate_limiter()
+        first = await client.get("/jokes/1", headers=through_proxy("203.0.113.7"))
+        second = await client.get("/jokes/1", headers=through_proxy("203.0.113.7"))
+        other = await client.get("/jokes/1", headers=through_proxy("203.0.113.8"))
+        reset_rate_limiter()
+
+    assert first.status_code != 429
+    assert second.status_code == 429
+    assert other.status_code != 429
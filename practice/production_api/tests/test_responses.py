@@ -0,0 +1,49 @@
+"""
+Test response serialization
+"""
+import json
+from datetime import datetime, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app.core.responses import dump_rows
+from app.models.joke import Joke
+from app.models.user import User
+from app.schemas.joke import JokeResponse
+from app.schemas.user import UserResponse
+
+
+def test_dump_rows_matches_response_model():
+    """Test that trusted serialization produces the same JSON as response_model"""
+    jokes = [
+        Joke(id=1, setup="Setup", punchline="Punchline", joke_type="general",
+             source="official-joke-api", created_at=datetime(2024, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc)),
+        Joke(id=2, setup="Setup", punchline="Punchline", joke_type=None,
+             source="official-joke-api", created_at=datetime(2024, 1, 2, 3, 4, 5)),
+    ]
+    users = [
+        User(id=1, email="test@example.com", username="testuser", full_name=None,
+             hashed_password="hash", is_active=True, created_at=datetime(2024, 1, 2, tzinfo=timezone.utc)),
+    ]
+    
+    for schema, rows in ((JokeResponse, jokes), (UserResponse, users)):
+        expected = TypeAdapter(List[schema]).dump_json(
+            [schema.model_validate(row) for row in rows]
+        )
+        assert json.loads(dump_rows(schema, rows)) == json.loads(expected)
+    
+    # Hidden columns are never emitted
+    assert "hashed_password" not in json.loads(dump_rows(UserResponse, users))[0]
+
+
+def test_dump_rows_page():
+    """Test that pagination fields wrap the items"""
+    joke = Joke(id=1, setup="Setup", punchline="Punchline", source="api",
+                created_at=datetime(2024, 1, 1))
+    
+    page = json.loads(dump_rows(JokeResponse, [joke], limit=1, has_more=False))
+    
+    assert page["items"][0]["id"] == 1
+    assert page["limit"] == 1
+    assert page["has_more"] is False
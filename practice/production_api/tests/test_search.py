@@ -0,0 +1,128 @@
+"""
+Test full-text joke search
+"""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from unittest.mock import patch
+
+from app.core.config import settings
+from app.models.joke import Joke
+
+
+async def create_jokes(db_session: AsyncSession, *jokes) -> list:
+    rows = [Joke(setup=setup, punchline=punchline) for setup, punchline in jokes]
+    db_session.add_all(rows)
+    await db_session.commit()
+    return [row.id for row in rows]
+
+
+async def search(client: AsyncClient, q: str, **params) -> dict:
+    response = await client.get("/jokes/search", params={"q": q, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_matches(client: AsyncClient, db_session: AsyncSession):
+    """Test that only jokes with every word match, the closest match first, with stemming"""
+    chicken_twice, chicken, _ = await create_jokes(
+        db_session,
+        ("Why did the chicken cross the road?", "The chickens were waiting on the other side"),
+        ("What do you call a cold dog?", "A chili dog, said the chicken"),
+        ("Why don't skeletons fight?", "They don't have the guts"),
+    )
+
+    data = await search(client, "Chicken")
+
+    assert [item["id"] for item in data["items"]] == [chicken_twice, chicken]
+    assert data["items"][0]["rank"] > data["items"][1]["rank"]
+    assert data["items"][0]["setup"] == "Why did the chicken cross the road?"
+    assert [item["id"] for item in (await search(client, "chicken dogs"))["items"]] == [chicken]
+
+
+@pytest.mark.asyncio
+async def test_search_pagination(client: AsyncClient, db_session: AsyncSession):
+    """Test that skip and limit page through the matches"""
+    ids = await create_jokes(db_session, *[(f"Pun number {i}", "Knock knock") for i in range(5)])
+
+    first = await search(client, "knock", limit=3)
+    second = await search(client, "knock", skip=3, limit=3)
+
+    assert first["has_more"] is True and second["has_more"] is False
+    assert first["truncated"] is False and second["truncated"] is False
+    assert first["limit"] == 3 and second["skip"] == 3
+    assert sorted(item["id"] for item in first["items"] + second["items"]) == ids
+
+
+@pytest.mark.asyncio
+async def test_search_follows_updates_and_deletes(client: AsyncClient, db_session: AsyncSession):
+    """Test that the search index is kept in step with the jokes table"""
+    kept, removed = await create_jokes(db_session, ("Setup", "Punchline"), ("Other", "Punchline"))
+
+    await db_session.execute(update(Joke).where(Joke.id == kept).values(setup="Penguin"))
+    await db_session.execute(delete(Joke).where(Joke.id == removed))
+    await db_session.commit()
+
+    assert [item["id"] for item in (await search(client, "penguin"))["items"]] == [kept]
+    assert (await search(client, "setup"))["items"] == []
+    assert [item["id"] for item in (await search(client, "punchline"))["items"]] == [kept]
+
+
+@pytest.mark.asyncio
+async def test_search_ignores_query_syntax(client: AsyncClient, db_session: AsyncSession):
+    """Test that FTS operators and punctuation in the query are treated as plain text"""
+    joke_id, = await create_jokes(db_session, ("Near the bar", "OR not"))
+
+    assert [item["id"] for item in (await search(client, 'near* "bar" OR'))["items"]] == [joke_id]
+    assert (await search(client, "?!"))["items"] == []
+
+
+@pytest.mark.asyncio
+async def test_search_skips_stopwords(client: AsyncClient, db_session: AsyncSession):
+    """Test that stopwords neither have to match nor match on their own"""
+    joke_id, = await create_jokes(db_session, ("A dog walks into a bar", "Ouch"))
+
+    assert [item["id"] for item in (await search(client, "the dog"))["items"]] == [joke_id]
+    assert (await search(client, "the"))["items"] == []
+
+
+@pytest.mark.asyncio
+async def test_search_pages_past_rank_window(client: AsyncClient, db_session: AsyncSession):
+    """Test that paging stops at SEARCH_RANK_WINDOW and every page says the result is truncated"""
+    ids = await create_jokes(db_session, *[(f"Owl joke {i}", "Hoot") for i in range(4)])
+
+    with patch.object(settings, "SEARCH_RANK_WINDOW", 2):
+        first = await search(client, "owl", limit=1)
+        last = await search(client, "owl", skip=1, limit=1)
+        past = await search(client, "owl", skip=2, limit=1)
+        rare = await search(client, "owl 3")
+
+    assert [first["has_more"], last["has_more"], past["has_more"]] == [True, False, False]
+    assert first["truncated"] and last["truncated"] and past["truncated"]
+    assert sorted(item["id"] for item in first["items"] + last["items"]) == ids[2:]
+    assert past["items"] == []
+    # A narrower query fits in the window
+    assert [item["id"] for item in rare["items"]] == [ids[3]]
+    assert rare["truncated"] is False
+
+
+@pytest.mark.asyncio
+async def test_search_window_not_truncated_at_exact_fit(client: AsyncClient, db_session: AsyncSession):
+    """Test that a query with exactly SEARCH_RANK_WINDOW matches is complete"""
+    ids = await create_jokes(db_session, *[(f"Owl joke {i}", "Hoot") for i in range(2)])
+
+    with patch.object(settings, "SEARCH_RANK_WINDOW", 2):
+        data = await search(client, "owl")
+
+    assert sorted(item["id"] for item in data["items"]) == ids
+    assert data["has_more"] is False and data["truncated"] is False
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("query", ["", "?q=", f"?q={'a' * 201}", "?q=x&limit=101"])
+async def test_search_rejects_bad_input(client: AsyncClient, query: str):
+    """Test that a missing, empty or overlong query is rejected"""
+    response = await client.get(f"/jokes/search{query}")
+    assert response.status_code == 422
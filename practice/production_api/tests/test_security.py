@@ -0,0 +1,119 @@
+"""
+Test security utilities
+"""
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core.security import (
+    PasswordHasher,
+    TokenCache,
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+    get_current_user,
+    get_password_hash_async,
+    token_cache,
+    verify_password_async,
+)
+
+
+@pytest.mark.asyncio
+async def test_password_hash_async_roundtrip():
+    """Test hashing and verifying passwords on the executor"""
+    hashed = await get_password_hash_async("testpassword123")
+    assert await verify_password_async("testpassword123", hashed)
+    assert not await verify_password_async("wrongpassword", hashed)
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_rejects_when_full():
+    """Test that work beyond the queue limit is rejected with 503"""
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    try:
+        slow = asyncio.create_task(hasher.run("hash", time.sleep, 0.2))
+        await asyncio.sleep(0.01)
+        
+        with pytest.raises(HTTPException) as exc_info:
+            await hasher.run("hash", time.sleep, 0)
+        assert exc_info.value.status_code == 503
+        
+        await slow
+        assert hasher.pending == 0
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_keeps_event_loop_free():
+    """Test that the event loop keeps running while hashing"""
+    hasher = PasswordHasher(workers=1, max_pending=4)
+    ticks = 0
+    
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+    
+    task = asyncio.create_task(ticker())
+    try:
+        await hasher.run("hash", time.sleep, 0.2)
+    finally:
+        task.cancel()
+        hasher.shutdown()
+    
+    assert ticks >= 5
+
+
+def test_token_cache_hit_after_verification():
+    """Test that a verified token is served from the cache"""
+    token_cache.clear()
+    token = create_access_token({"sub": "testuser", "user_id": 1})
+    
+    first = decode_token(token)
+    with patch("jose.jwt.decode") as mock_decode:
+        second = decode_token(token)
+    
+    mock_decode.assert_not_called()
+    assert first == second
+    assert token_cache.hits == 1
+    assert token_cache.hit_rate == 0.5
+
+
+def test_token_cache_expires_entries():
+    """Test that cached payloads are not served past the token's exp"""
+    cache = TokenCache(max_size=10)
+    cache.set("token", {"sub": "testuser", "exp": time.time() - 1})
+    assert cache.get("token") is None
+    assert len(cache) == 0
+
+
+def test_token_cache_evicts_least_recently_used():
+    """Test that the cache stays bounded"""
+    cache = TokenCache(max_size=2)
+    expires_at = time.time() + 60
+    cache.set("a", {"exp": expires_at})
+    cache.set("b", {"exp": expires_at})
+    cache.get("a")
+    cache.set("c", {"exp": expires_at})
+    
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+@pytest.mark.asyncio
+async def test_cached_refresh_token_rejected_as_access_token():
+    """Test that the token type is still checked for cached payloads"""
+    token = create_refresh_token({"sub": "testuser", "user_id": 1})
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user(credentials)
+        assert exc_info.value.status_code == 401
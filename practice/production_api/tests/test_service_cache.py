@@ -0,0 +1,206 @@
+"""
+Test the two-tier service cache
+"""
+import asyncio
+import time
+import pytest
+import fakeredis
+from httpx import AsyncClient
+from pydantic import BaseModel
+from unittest.mock import patch
+
+from app.models.joke import Joke
+from app.services.cache import TwoTierCache, should_refresh_early
+from app.services.user_service import UserService
+from tests.conftest import TestSessionLocal
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+
+
+class Loader:
+    """Counts loads and returns a fresh Item each time"""
+
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self) -> Item:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return Item(id=1, name=f"load {self.calls}")
+
+
+def make_cache(redis=None, **kwargs) -> TwoTierCache[Item]:
+    options = {"ttl": 60, "local_ttl": 5, "local_max_size": 100, "beta": 0}
+    options.update(kwargs)
+    return TwoTierCache("test", Item, redis_getter=lambda: redis, **options)
+
+
+@pytest.mark.asyncio
+async def test_local_tier_serves_repeat_lookups():
+    """Test that a second lookup is served in-process without loading"""
+    cache = make_cache()
+    loader = Loader()
+
+    assert (await cache.get("1", loader)).name == "load 1"
+    assert (await cache.get("1", loader)).name == "load 1"
+    assert loader.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_is_shared_between_workers():
+    """Test that a second worker's cache finds the entry in Redis"""
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    worker_a, worker_b = make_cache(redis), make_cache(redis)
+    loader = Loader()
+
+    await worker_a.get("1", loader)
+    item = await worker_b.get("1", loader)
+
+    assert item == Item(id=1, name="load 1")
+    assert loader.calls == 1
+    assert 0 < await redis.ttl(worker_a.redis_key("1")) <= 60
+    await redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_redis_errors_fall_back_to_loader():
+    """Test that an unavailable Redis only costs a load"""
+    server = fakeredis.FakeServer()
+    server.connected = False
+    redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    loader = Loader()
+
+    assert (await make_cache(redis).get("1", loader)).name == "load 1"
+    assert loader.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    """Test stampede protection for a cold key"""
+    cache = make_cache()
+    loader = Loader(delay=0.02)
+
+    items = await asyncio.gather(*(cache.get("1", loader) for _ in range(10)))
+
+    assert loader.calls == 1
+    assert {item.name for item in items} == {"load 1"}
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_both_tiers():
+    """Test that an invalidated key is loaded again"""
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    cache = make_cache(redis)
+    loader = Loader()
+
+    await cache.get("1", loader)
+    await cache.invalidate(1)
+
+    assert await redis.exists(cache.redis_key("1")) == 0
+    assert (await cache.get("1", loader)).name == "load 2"
+    await redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_load_racing_an_invalidation_is_not_cached():
+    """Test that a value loaded before an invalidation is not stored"""
+    cache = make_cache()
+    loader = Loader(delay=0.02)
+
+    pending = asyncio.ensure_future(cache.get("1", loader))
+    await asyncio.sleep(0.01)
+    await cache.invalidate(1)
+    await pending
+
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_entry_from_old_model_is_a_miss():
+    """Test that an entry the current model cannot read is reloaded and replaced"""
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    cache = make_cache(redis)
+    await redis.hset(cache.redis_key("1"), mapping={
+        "value": '{"id": 1, "title": "renamed field"}', "delta": 0.01, "expires_at": time.time() + 60,
+    })
+
+    assert (await cache.get("1", Loader())).name == "load 1"
+    assert await make_cache(redis).get("1", Loader()) == Item(id=1, name="load 1")
+    await redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_shared_load_does_not_use_callers_session(db_session):
+    """Test that a load shared between callers runs on its own session"""
+    joke = Joke(setup="Setup", punchline="Punchline")
+    db_session.add(joke)
+    await db_session.commit()
+    cache = make_cache()
+    sessions = []
+
+    @cache.cached
+    async def lookup(db, joke_id: int):
+        sessions.append(db)
+        await asyncio.sleep(0.01)
+        row = await db.get(Joke, joke_id)
+        return Item(id=row.id, name=row.setup)
+
+    async with TestSessionLocal() as leader_db, TestSessionLocal() as follower_db:
+        leader = asyncio.ensure_future(lookup(leader_db, joke.id))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(lookup(follower_db, joke.id))
+        await asyncio.sleep(0)
+        # The leader's client disconnects and its session is closed mid-load
+        leader.cancel()
+        await leader_db.close()
+
+        assert (await follower).name == "Setup"
+    assert len(sessions) == 1
+    assert sessions[0] not in (leader_db, follower_db)
+
+
+@pytest.mark.asyncio
+async def test_early_refresh_reloads_before_expiry():
+    """Test that a very eager cache refreshes an entry that has not expired"""
+    cache = make_cache(beta=1e9)
+    loader = Loader(delay=0.001)
+
+    await cache.get("1", loader)
+    assert (await cache.get("1", loader)).name == "load 2"
+
+
+def test_should_refresh_early():
+    """Test the XFetch decision at its edges"""
+    now = time.time()
+    assert not should_refresh_early(delta=0.0, expires_at=now + 1, beta=1.0)
+    assert not should_refresh_early(delta=1.0, expires_at=now + 60, beta=0.0)
+    assert should_refresh_early(delta=0.0, expires_at=now - 1, beta=1.0)
+    # A slow entry close to expiry is almost always refreshed
+    assert sum(should_refresh_early(10.0, now + 0.1, 1.0) for _ in range(100)) > 90
+
+
+@pytest.mark.asyncio
+async def test_user_lookups_cached_and_invalidated(client: AsyncClient, test_user_data: dict):
+    """Test that /users/me is cached and that update and delete invalidate it"""
+    await client.post("/auth/register", json=test_user_data)
+    response = await client.post("/auth/login", json={
+        "username": test_user_data["username"],
+        "password": test_user_data["password"],
+    })
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    user_id = (await client.get("/users/me", headers=headers)).json()["id"]
+
+    with patch.object(UserService, "get_user_by_id") as get_user:
+        assert (await client.get("/users/me", headers=headers)).status_code == 200
+        assert (await client.get(f"/users/{user_id}", headers=headers)).status_code == 200
+    get_user.assert_not_called()
+
+    await client.put("/users/me", headers=headers, json={"full_name": "Renamed"})
+    assert (await client.get(f"/users/{user_id}", headers=headers)).json()["full_name"] == "Renamed"
+
+    await client.delete("/users/me", headers=headers)
+    assert (await client.get(f"/users/{user_id}", headers=headers)).status_code == 404
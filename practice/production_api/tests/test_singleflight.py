@@ -0,0 +1,82 @@
+"""
+Test single-flight coalescing of upstream joke fetches
+"""
+import asyncio
+import pytest
+import httpx
+from fastapi import HTTPException
+from unittest.mock import AsyncMock, patch
+
+from app.core.http_client import create_http_client
+from app.core.singleflight import SingleFlight
+from app.services.joke_service import JokeService, joke_api_flights
+
+
+def slow_joke_api(calls: list, status_code: int = 200, delay: float = 0.05) -> httpx.AsyncClient:
+    """HTTP client for a joke API that answers after ``delay`` seconds"""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(delay)
+        return httpx.Response(status_code, json={
+            "id": len(calls), "type": "general", "setup": f"Setup {len(calls)}", "punchline": "Punchline",
+        })
+    return create_http_client(transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_upstream_call():
+    """Test that concurrent uncached requests make one upstream call and save once"""
+    calls = []
+    http_client = slow_joke_api(calls)
+
+    with patch.object(JokeService, "save_joke", new=AsyncMock()) as save_joke:
+        jokes = await asyncio.gather(*(
+            JokeService.get_joke(None, use_cache=False, http_client=http_client) for _ in range(10)
+        ))
+
+    assert len(calls) == 1
+    assert {joke.setup for joke in jokes} == {"Setup 1"}
+    save_joke.assert_awaited_once()
+    assert not joke_api_flights.in_flight("random_joke")
+
+    # Later requests start a new flight
+    with patch.object(JokeService, "save_joke", new=AsyncMock()):
+        await JokeService.get_joke(None, use_cache=False, http_client=http_client)
+    assert len(calls) == 2
+    await http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_upstream_error_fans_out():
+    """Test that every waiter gets the shared call's error"""
+    calls = []
+    http_client = slow_joke_api(calls, status_code=500)
+
+    results = await asyncio.gather(*(
+        JokeService.get_joke(None, use_cache=False, http_client=http_client) for _ in range(5)
+    ), return_exceptions=True)
+
+    assert len(calls) == 1
+    assert all(isinstance(result, HTTPException) and result.status_code == 503 for result in results)
+    await http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_cancel_followers():
+    """Test that followers still get the result when the leader goes away"""
+    flights: SingleFlight[int] = SingleFlight("test")
+    started = asyncio.Event()
+
+    async def call() -> int:
+        started.set()
+        await asyncio.sleep(0.05)
+        return 42
+
+    leader = asyncio.ensure_future(flights.do("key", call))
+    await started.wait()
+    follower = asyncio.ensure_future(flights.do("key", call))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == (42, True)
+    assert not flights.in_flight("key")
@@ -0,0 +1,123 @@
+"""
+Test bulk user import
+"""
+import json
+import re
+
+import pytest
+from httpx import AsyncClient
+from pydantic import ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import MAX_BIND_PARAMETERS, USER_IMPORT_COLUMNS, Settings
+from app.core.security import create_access_token, get_password_hash, verify_password
+from app.models.user import User
+from app.services.user_import import UserImportService
+
+PASSWORD_HASH = get_password_hash("importedpassword")
+
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def import_rows(db: AsyncSession, body: bytes, fmt: str = "ndjson", **kwargs):
+    # Split mid-line to exercise the line buffering
+    middle = len(body) // 2
+    lines = UserImportService.iter_lines(chunks(body[:middle], body[middle:]))
+    return await UserImportService.import_users(
+        db, UserImportService.iter_rows(lines, fmt), **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_import_ndjson_reports_failures(db_session: AsyncSession):
+    """Test that valid rows are inserted and every bad row is reported"""
+    db_session.add(User(email="taken@example.com", username="taken", hashed_password="x"))
+    await db_session.commit()
+
+    rows = [
+        {"email": "a@example.com", "username": "alice", "password": "alicepassword"},
+        {"email": "b@example.com", "username": "bobby", "hashed_password": PASSWORD_HASH},
+        {"email": "taken@example.com", "username": "someone"},
+        {"email": "taken@example.com", "username": "someone", "password": "password123"},
+        {"email": "not-an-email", "username": "carol", "password": "password123"},
+        {"email": "c@example.com", "username": "alice", "password": "password123"},
+    ]
+    body = "\n".join(json.dumps(row) for row in rows).encode() + b"\n{broken\n"
+
+    report = await import_rows(db_session, body, batch_size=2)
+
+    assert (report.created, report.skipped, report.failed) == (2, 2, 3)
+    assert [error.row for error in report.errors] == [3, 4, 5, 6, 7]
+
+    users = {
+        u.username: u for u in (await db_session.execute(select(User))).scalars().all()
+    }
+    assert set(users) == {"taken", "alice", "bobby"}
+    assert verify_password("alicepassword", users["alice"].hashed_password)
+    assert users["bobby"].hashed_password == PASSWORD_HASH
+
+
+@pytest.mark.asyncio
+async def test_import_csv_truncates_errors(db_session: AsyncSession):
+    """Test CSV parsing and the cap on reported errors"""
+    body = (
+        "email,username,full_name,hashed_password\n"
+        f"a@example.com,alice,Alice Smith,{PASSWORD_HASH}\n"
+        f"b@example.com,bobby,,{PASSWORD_HASH}\n"
+        "bad,row\n"
+        "also,bad\n"
+    ).encode()
+
+    report = await import_rows(db_session, body, fmt="csv", max_errors=1)
+
+    assert (report.created, report.failed) == (2, 2)
+    assert len(report.errors) == 1
+    assert report.errors_truncated
+    count = await db_session.scalar(select(func.count()).select_from(User))
+    assert count == 2
+
+
+@pytest.mark.asyncio
+async def test_import_endpoint_requires_superuser(client: AsyncClient, db_session: AsyncSession):
+    """Test the admin import endpoint"""
+    admin = User(email="admin@example.com", username="admin", hashed_password="x", is_superuser=True)
+    user = User(email="user@example.com", username="user", hashed_password="x")
+    db_session.add_all([admin, user])
+    await db_session.commit()
+
+    body = json.dumps({"email": "a@example.com", "username": "alice", "hashed_password": PASSWORD_HASH})
+
+    def auth(u: User) -> dict:
+        token = create_access_token({"sub": u.username, "user_id": u.id})
+        return {"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"}
+
+    forbidden = await client.post("/users/import", content=body, headers=auth(user))
+    response = await client.post("/users/import", content=body, headers=auth(admin))
+
+    assert forbidden.status_code == 403
+    assert response.status_code == 200
+    assert response.json()["created"] == 1
+
+
+@pytest.mark.parametrize("batch_size", [0, -1, MAX_BIND_PARAMETERS // USER_IMPORT_COLUMNS + 1])
+def test_batch_size_is_bounded(batch_size: int):
+    """Test that an empty batch or one over the bind parameter limit is rejected at startup"""
+    with pytest.raises(ValidationError):
+        Settings(USER_IMPORT_BATCH_SIZE=batch_size)
+
+
+@pytest.mark.asyncio
+async def test_batch_insert_column_count(db_session: AsyncSession, statements: list):
+    """Test that USER_IMPORT_COLUMNS matches the columns each imported user binds"""
+    body = json.dumps({"email": "a@example.com", "username": "alice", "hashed_password": PASSWORD_HASH}).encode()
+
+    report = await import_rows(db_session, body + b"\n")
+
+    assert report.created == 1
+    insert = next(statement for statement in statements if statement.startswith("INSERT INTO users"))
+    columns = re.search(r"INSERT INTO users \(([^)]*)\)", insert).group(1).split(",")
+    assert len(columns) == USER_IMPORT_COLUMNS